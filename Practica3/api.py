@@ -0,0 +1,448 @@
+import bd
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import datetime
+import decimal
+import functools
+import json
+import re
+import sys
+import threading
+import time
+import urllib.parse
+
+import config
+import sesion
+from codigo import crear_pool, conexion_pool, estadisticas_pool, mensaje_error
+from medicion import resumen_latencias
+from servicios import (DatosNoValidos, ServicioMesas, ServicioPedidosOnline, ServicioProveedores,
+                       ServicioReservas)
+
+#===================================================================================
+# API HTTP/JSON
+#===================================================================================
+# Servidor HTTP (asyncio, solo biblioteca estándar) con las operaciones de mesas,
+# reservas, pedidos online y proveedores, para las tablets y la app de reparto.
+#
+# - Cada petición coge una conexión, llama al servicio de servicios.py en un hilo
+#   (los servicios y el driver de la BD bloquean) y devuelve JSON.
+# - Como mucho config.api_concurrencia peticiones trabajan a la vez contra la BD; hasta
+#   config.api_cola más esperan su turno y el resto se rechazan con 503 enseguida.
+# - GET /metricas: peticiones, errores y latencias p50/p95/p99 de cada ruta,
+#   peticiones por segundo y el estado del pool.
+#
+# La conexión la da abrir_conexion, un context manager: por defecto una del pool del
+# backend de bd.py (codigo.crear_pool), pero se puede pasar otro.
+#
+# Las operaciones de JEFE llevan la cabecera X-Empleado con su DNI.
+#
+# Uso: python api.py [puerto]
+
+#-----------------------------------------------------------------------------------
+# Errores y JSON
+#-----------------------------------------------------------------------------------
+class ErrorHttp(Exception):
+
+    def __init__(self, estado, mensaje, **detalles):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.cuerpo = {"error": mensaje, **detalles}
+
+def _a_json(valor):
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()
+    if isinstance(valor, decimal.Decimal):
+        return str(valor)
+    raise TypeError(f"{type(valor).__name__} no se puede pasar a JSON")
+
+# NamedTuple -> dict (los resultados de los servicios)
+def _filas(filas):
+    return [fila._asdict() for fila in filas]
+
+def _campo(cuerpo, nombre, convertir=str):
+    if nombre not in cuerpo or cuerpo[nombre] is None:
+        raise ErrorHttp(400, f"Falta el campo {nombre}")
+    try:
+        return convertir(cuerpo[nombre])
+    except (TypeError, ValueError):
+        raise ErrorHttp(400, f"Valor no válido para {nombre}: {cuerpo[nombre]!r}")
+
+def _opcional(cuerpo, nombre, convertir=str):
+    return _campo(cuerpo, nombre, convertir) if cuerpo.get(nombre) is not None else None
+
+def _fecha(valor):
+    return datetime.datetime.fromisoformat(valor)
+
+def _lineas(cuerpo):
+    lineas = _campo(cuerpo, "lineas", list)
+    try:
+        return [(int(producto), int(cantidad)) for producto, cantidad in lineas]
+    except (TypeError, ValueError):
+        raise ErrorHttp(400, "lineas debe ser una lista de [producto, cantidad]")
+
+def _jefe(conn, cabeceras):
+    dni = cabeceras.get("x-empleado")
+    sesion_empleado = sesion.iniciar_sesion(conn, dni) if dni else None
+    if sesion_empleado is None or not sesion_empleado.es_jefe(conn):
+        raise ErrorHttp(403, "Solo un empleado con cargo JEFE puede realizar esta acción.")
+    return sesion_empleado
+
+#-----------------------------------------------------------------------------------
+# Rutas
+#-----------------------------------------------------------------------------------
+# Cada manejador recibe (conn, parámetros de la ruta, consulta, cuerpo JSON, cabeceras)
+# y devuelve (estado, respuesta). Se ejecutan en un hilo, con su conexión.
+
+# Mesas
+def activar_mesa(conn, ruta, consulta, cuerpo, cabeceras):
+    return 201, {"id_comanda": ServicioMesas(conn).activar(_campo(ruta, "mesa", int))}
+
+def aniadir_a_mesa(conn, ruta, consulta, cuerpo, cabeceras):
+    mesas = ServicioMesas(conn)
+    if "lineas" in cuerpo:
+        return 200, {"productos": mesas.aniadir_varios(_campo(ruta, "mesa", int), _lineas(cuerpo))}
+    mesas.aniadir(_campo(ruta, "mesa", int), _campo(cuerpo, "id_producto", int), _campo(cuerpo, "consumiciones", int))
+    return 200, {"productos": 1}
+
+def eliminar_de_mesa(conn, ruta, consulta, cuerpo, cabeceras):
+    ServicioMesas(conn).eliminar(_campo(ruta, "mesa", int), _campo(ruta, "producto", int), _campo(cuerpo, "consumiciones", int))
+    return 200, {}
+
+def consultar_mesa(conn, ruta, consulta, cuerpo, cabeceras):
+    todas = consulta.get("todas") in ("1", "true", "s")
+    return 200, {"lineas": _filas(ServicioMesas(conn).consultar(_campo(ruta, "mesa", int), todas))}
+
+def cuenta_mesa(conn, ruta, consulta, cuerpo, cabeceras):
+    recibo = ServicioMesas(conn).cuenta(_campo(ruta, "mesa", int))
+    if recibo is None:
+        raise ErrorHttp(404, "No hay ninguna comanda activa para esta mesa")
+    return 200, {"recibo": recibo}
+
+def pagar_mesa(conn, ruta, consulta, cuerpo, cabeceras):
+    ServicioMesas(conn).registrar_pago(_campo(ruta, "mesa", int))
+    return 200, {}
+
+# Reservas (fechas en ISO: 2030-12-24T14:30)
+def crear_reserva(conn, ruta, consulta, cuerpo, cabeceras):
+    ServicioReservas(conn).crear(_campo(cuerpo, "fecha", _fecha), _campo(cuerpo, "telefono"),
+                                 _campo(cuerpo, "nombre"), _campo(cuerpo, "apellido"),
+                                 _campo(cuerpo, "numero_personas", int), _campo(cuerpo, "lugar", int))
+    return 201, {}
+
+def modificar_reserva(conn, ruta, consulta, cuerpo, cabeceras):
+    ServicioReservas(conn).modificar(_campo(cuerpo, "telefono"), _campo(cuerpo, "fecha", _fecha),
+                                     nombre=_opcional(cuerpo, "nombre"), apellido=_opcional(cuerpo, "apellido"),
+                                     numero_personas=_opcional(cuerpo, "numero_personas", int))
+    return 200, {}
+
+def anular_reserva(conn, ruta, consulta, cuerpo, cabeceras):
+    ServicioReservas(conn).anular(_campo(cuerpo, "telefono"), _campo(cuerpo, "fecha", _fecha))
+    return 200, {}
+
+def asignar_encargado(conn, ruta, consulta, cuerpo, cabeceras):
+    _jefe(conn, cabeceras)
+    ServicioReservas(conn).asignar_empleado(_campo(cuerpo, "telefono"), _campo(cuerpo, "fecha", _fecha),
+                                            _campo(cuerpo, "dni"))
+    return 201, {}
+
+def listar_reservas(conn, ruta, consulta, cuerpo, cabeceras):
+    reservas = ServicioReservas(conn).listar(_opcional(consulta, "telefono"), _opcional(consulta, "fecha", _fecha))
+    return 200, {"reservas": _filas(reservas)}
+
+# Pedidos online
+def alta_usuario(conn, ruta, consulta, cuerpo, cabeceras):
+    ServicioPedidosOnline(conn).alta_usuario(_campo(cuerpo, "telefono"), _opcional(cuerpo, "correo"),
+                                             _opcional(cuerpo, "nombre"), _opcional(cuerpo, "apellido"))
+    return 201, {}
+
+def baja_usuario(conn, ruta, consulta, cuerpo, cabeceras):
+    ServicioPedidosOnline(conn).baja_usuario(ruta["telefono"])
+    return 200, {}
+
+def hacer_pedido_online(conn, ruta, consulta, cuerpo, cabeceras):
+    id_pedido = ServicioPedidosOnline(conn).hacer_pedido(_campo(cuerpo, "telefono"), _campo(cuerpo, "direccion"),
+                                                         _lineas(cuerpo))
+    return 201, {"id_pedido": id_pedido}
+
+def listar_pedidos_online(conn, ruta, consulta, cuerpo, cabeceras):
+    id_pedido = _opcional(ruta, "pedido", int)
+    return 200, {"lineas": _filas(ServicioPedidosOnline(conn).listar(id_pedido))}
+
+def asignar_repartidor(conn, ruta, consulta, cuerpo, cabeceras):
+    _jefe(conn, cabeceras)
+    ServicioPedidosOnline(conn).asignar_repartidor(_campo(ruta, "pedido", int), _campo(cuerpo, "dni"))
+    return 201, {}
+
+# Proveedores
+def alta_proveedor(conn, ruta, consulta, cuerpo, cabeceras):
+    ServicioProveedores(conn).alta(_campo(cuerpo, "cif"), _opcional(cuerpo, "correo"),
+                                   _opcional(cuerpo, "telefono"), _opcional(cuerpo, "nombre"))
+    return 201, {}
+
+def baja_proveedor(conn, ruta, consulta, cuerpo, cabeceras):
+    ServicioProveedores(conn).baja(ruta["cif"])
+    return 200, {}
+
+def listar_proveedores(conn, ruta, consulta, cuerpo, cabeceras):
+    return 200, {"proveedores": _filas(ServicioProveedores(conn).listar(consulta.get("cif")))}
+
+def listar_pedidos_proveedor(conn, ruta, consulta, cuerpo, cabeceras):
+    return 200, {"pedidos": _filas(ServicioProveedores(conn).listar_pedidos(consulta.get("cif")))}
+
+def pedido_a_proveedor(conn, ruta, consulta, cuerpo, cabeceras):
+    jefe = _jefe(conn, cabeceras)
+    return 201, {"id_pedido": ServicioProveedores(conn).hacer_pedido(jefe.dni, ruta["cif"], _lineas(cuerpo))}
+
+def cancelar_pedido_proveedor(conn, ruta, consulta, cuerpo, cabeceras):
+    _jefe(conn, cabeceras)
+    ServicioProveedores(conn).cancelar_pedido(_campo(ruta, "pedido", int))
+    return 200, {}
+
+# (método, ruta, manejador). {nombre} es un parámetro de la ruta
+RUTAS = [
+    ("POST", "/mesas/{mesa}/activar", activar_mesa),
+    ("POST", "/mesas/{mesa}/pedidos", aniadir_a_mesa),
+    ("DELETE", "/mesas/{mesa}/pedidos/{producto}", eliminar_de_mesa),
+    ("GET", "/mesas/{mesa}/comanda", consultar_mesa),
+    ("GET", "/mesas/{mesa}/cuenta", cuenta_mesa),
+    ("POST", "/mesas/{mesa}/pago", pagar_mesa),
+    ("POST", "/reservas", crear_reserva),
+    ("PATCH", "/reservas", modificar_reserva),
+    ("DELETE", "/reservas", anular_reserva),
+    ("POST", "/reservas/encargado", asignar_encargado),
+    ("GET", "/reservas", listar_reservas),
+    ("POST", "/usuarios", alta_usuario),
+    ("DELETE", "/usuarios/{telefono}", baja_usuario),
+    ("POST", "/pedidos", hacer_pedido_online),
+    ("GET", "/pedidos", listar_pedidos_online),
+    ("GET", "/pedidos/{pedido}", listar_pedidos_online),
+    ("POST", "/pedidos/{pedido}/repartidor", asignar_repartidor),
+    ("POST", "/proveedores", alta_proveedor),
+    ("DELETE", "/proveedores/{cif}", baja_proveedor),
+    ("GET", "/proveedores", listar_proveedores),
+    ("GET", "/proveedores/pedidos", listar_pedidos_proveedor),
+    ("POST", "/proveedores/{cif}/pedidos", pedido_a_proveedor),
+    ("DELETE", "/proveedores/pedidos/{pedido}", cancelar_pedido_proveedor),
+]
+
+def _compilar_ruta(ruta):
+    return re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", ruta) + "$")
+
+_RUTAS = [(metodo, ruta, _compilar_ruta(ruta), manejador) for metodo, ruta, manejador in RUTAS]
+
+def buscar_ruta(metodo, camino):
+    encontrada = False
+    for metodo_ruta, ruta, patron, manejador in _RUTAS:
+        parametros = patron.match(camino)
+        if parametros:
+            encontrada = True
+            if metodo_ruta == metodo:
+                parametros = {clave: urllib.parse.unquote(valor) for clave, valor in parametros.groupdict().items()}
+                return ruta, manejador, parametros
+    raise ErrorHttp(405 if encontrada else 404, "Método no permitido" if encontrada else "Ruta desconocida")
+
+#-----------------------------------------------------------------------------------
+# Métricas
+#-----------------------------------------------------------------------------------
+# Por ruta: peticiones, errores (respuestas >= 400) y las últimas latencias
+MAX_LATENCIAS = 10000
+
+class Metricas:
+
+    def __init__(self):
+        self._cerrojo = threading.Lock()
+        self.inicio = time.monotonic()
+        self.rutas = {}
+        self.rechazadas = 0
+        self.en_curso = 0
+
+    def anotar(self, ruta, estado, segundos):
+        with self._cerrojo:
+            if ruta not in self.rutas:
+                self.rutas[ruta] = {"peticiones": 0, "errores": 0,
+                                    "latencias": collections.deque(maxlen=MAX_LATENCIAS)}
+            datos = self.rutas[ruta]
+            datos["peticiones"] += 1
+            if estado >= 400:
+                datos["errores"] += 1
+            datos["latencias"].append(segundos)
+
+    def resumen(self):
+        with self._cerrojo:
+            segundos = time.monotonic() - self.inicio
+            rutas = {ruta: (datos["peticiones"], datos["errores"], list(datos["latencias"]))
+                     for ruta, datos in self.rutas.items()}
+            rechazadas = self.rechazadas
+            en_curso = self.en_curso
+
+        total = sum(peticiones for peticiones, _, _ in rutas.values())
+        return {
+            "segundos": round(segundos, 3),
+            "peticiones": total,
+            "peticiones_por_segundo": round(total / segundos, 2) if segundos else 0.0,
+            "en_curso": en_curso,
+            "rechazadas": rechazadas,
+            "rutas": {ruta: {"peticiones": peticiones, "errores": errores,
+                             **{clave: round(valor, 3) for clave, valor in resumen_latencias(latencias).items()
+                                if clave != "n"}}
+                      for ruta, (peticiones, errores, latencias) in sorted(rutas.items())},
+        }
+
+#-----------------------------------------------------------------------------------
+# Servidor
+#-----------------------------------------------------------------------------------
+ESTADOS = {200: "OK", 201: "Created", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+           422: "Unprocessable Entity", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+MAX_CUERPO = 1024 * 1024
+
+def _longitud_cuerpo(cabeceras):
+    valor = cabeceras.get("content-length", "") or "0"
+    if not (valor.isascii() and valor.isdigit()):
+        raise ErrorHttp(400, f"Content-Length no válido: {valor!r}")
+    longitud = int(valor)
+    if longitud > MAX_CUERPO:
+        raise ErrorHttp(413, "Cuerpo demasiado grande")
+    return longitud
+
+class Api:
+
+    def __init__(self, abrir_conexion, concurrencia=None, cola=None, pool=None):
+        self.abrir_conexion = abrir_conexion
+        self.concurrencia = concurrencia or config.api_concurrencia
+        self.cola = config.api_cola if cola is None else cola
+        self.pool = pool
+        self.metricas = Metricas()
+        self._semaforo = None
+        self._hilos = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrencia,
+                                                            thread_name_prefix="api")
+
+    # Ejecuta el manejador en un hilo con su propia conexión
+    def _ejecutar(self, manejador, parametros, consulta, cuerpo, cabeceras):
+        with self.abrir_conexion() as conn:
+            return manejador(conn, parametros, consulta, cuerpo, cabeceras)
+
+    async def atender(self, metodo, objetivo, cabeceras, datos):
+        partes = urllib.parse.urlsplit(objetivo)
+        consulta = dict(urllib.parse.parse_qsl(partes.query))
+
+        if metodo == "GET" and partes.path == "/metricas":
+            resumen = self.metricas.resumen()
+            if self.pool is not None:
+                resumen["pool"] = estadisticas_pool(self.pool)
+            return 200, resumen
+
+        ruta, manejador, parametros = buscar_ruta(metodo, partes.path)
+        try:
+            cuerpo = json.loads(datos) if datos else {}
+        except ValueError:
+            raise ErrorHttp(400, "El cuerpo no es JSON válido")
+        if not isinstance(cuerpo, dict):
+            raise ErrorHttp(400, "El cuerpo tiene que ser un objeto JSON")
+
+        # Cola limitada: si ya hay demasiadas esperando, se rechaza sin esperar
+        if self.metricas.en_curso >= self.concurrencia + self.cola:
+            with self.metricas._cerrojo:
+                self.metricas.rechazadas += 1
+            raise ErrorHttp(503, "Servidor ocupado, inténtelo de nuevo")
+
+        inicio = time.perf_counter()
+        estado = 500
+        self.metricas.en_curso += 1
+        try:
+            async with self._semaforo:
+                bucle = asyncio.get_running_loop()
+                estado, respuesta = await bucle.run_in_executor(
+                    self._hilos, functools.partial(self._ejecutar, manejador, parametros, consulta, cuerpo, cabeceras))
+            return estado, respuesta
+        except ErrorHttp as e:
+            estado = e.estado
+            raise
+        except DatosNoValidos as e:
+            estado = 422
+            raise ErrorHttp(422, "Datos no válidos",
+                            errores=[{"codigo": codigo, "mensaje": mensaje} for codigo, mensaje in e.errores])
+        except ValueError as e:
+            estado = 409
+            raise ErrorHttp(409, str(e))
+        except bd.DatabaseError as e:
+            error, = e.args
+            estado = 409
+            raise ErrorHttp(409, mensaje_error(error))
+        finally:
+            self.metricas.en_curso -= 1
+            self.metricas.anotar(f"{metodo} {ruta}", estado, time.perf_counter() - inicio)
+
+    async def _conexion(self, lector, escritor):
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, objetivo, version = linea.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                cabeceras = {}
+                while True:
+                    linea = await lector.readline()
+                    if linea in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = linea.decode("latin-1").partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+
+                # Si no se ha podido leer el cuerpo no se sabe dónde empieza la
+                # siguiente petición: se responde y se cierra la conexión
+                cuerpo_leido = False
+                try:
+                    longitud = _longitud_cuerpo(cabeceras)
+                    datos = await lector.readexactly(longitud) if longitud else b""
+                    cuerpo_leido = True
+                    estado, respuesta = await self.atender(metodo.upper(), objetivo, cabeceras, datos)
+                except ErrorHttp as e:
+                    estado, respuesta = e.estado, e.cuerpo
+                except Exception as e:
+                    estado, respuesta = 500, {"error": str(e)}
+
+                cerrar = (cabeceras.get("connection", "").lower() == "close"
+                          or version == "HTTP/1.0" or not cuerpo_leido)
+                cuerpo = json.dumps(respuesta, default=_a_json, ensure_ascii=False).encode()
+                escritor.write(
+                    f"HTTP/1.1 {estado} {ESTADOS.get(estado, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(cuerpo)}\r\n"
+                    f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n".encode() + cuerpo)
+                await escritor.drain()
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, host, puerto):
+        self._semaforo = asyncio.Semaphore(self.concurrencia)
+        servidor = await asyncio.start_server(self._conexion, host, puerto)
+        print(f"API escuchando en http://{host}:{puerto} (concurrencia {self.concurrencia}, cola {self.cola})")
+        async with servidor:
+            await servidor.serve_forever()
+
+def api_pool():
+    pool = crear_pool()
+    if pool is None:
+        return None
+    return Api(functools.partial(conexion_pool, pool), pool=pool)
+
+if __name__ == "__main__":
+    puerto = int(sys.argv[1]) if len(sys.argv) > 1 else config.api_puerto
+    api = api_pool()
+    if api is None:
+        sys.exit(1)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(api.servir(config.api_host, puerto))
+    print(json.dumps(api.metricas.resumen(), indent=2))
+    api.pool.close()
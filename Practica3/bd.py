@@ -0,0 +1,181 @@
+import os
+
+import config
+
+#===================================================================================
+# BACKEND DE BASE DE DATOS
+#===================================================================================
+# Todo el acceso a la BD pasa por este módulo en lugar de importar oracledb:
+#   - 'oracle': python-oracledb contra el servidor de config.py
+#   - 'sqlite': la BD embebida de bd_sqlite.py, sin red, para probar y medir en un
+#     portátil o en CI
+# Se elige con config.backend; la variable de entorno PRACTICA3_BD manda sobre config.
+#
+# Las conexiones y cursores se usan igual con los dos: SQL de Oracle, binds :1 y
+# :nombre, seq.NEXTVAL, RETURNING ... INTO, callproc y los errores con el código ORA
+# (error, = e.args; error.code, error.message). El backend SQLite traduce lo necesario.
+#
+# Lo que en Oracle necesita un bloque PL/SQL o las vistas del diccionario (borrar si
+# existe, secuencias, restricciones, desplegar disparadores, planes de ejecución) son
+# métodos del backend activo:
+#
+#     bd.backend.borrar_si_existe(cursor, "TABLE", "mesa")
+#
+# Errores y tipos, igual que en oracledb: bd.DatabaseError, bd.InterfaceError,
+# bd.DB_TYPE_NUMBER y bd.DB_TYPE_DATE.
+
+BACKEND = os.environ.get("PRACTICA3_BD", config.backend)
+
+class BackendOracle:
+
+    nombre = "oracle"
+
+    def __init__(self, oracledb):
+        self.oracledb = oracledb
+
+    #-------------------------------------------------------------------------------
+    # Conexiones
+    #-------------------------------------------------------------------------------
+    def conectar(self):
+        return self.oracledb.connect(user=config.username, password=config.password, host=config.dsn,
+                                     port=config.port, service_name=config.service_name)
+
+    def crear_pool(self, minimo, maximo, incremento, espera):
+        return self.oracledb.create_pool(user=config.username, password=config.password, host=config.dsn,
+                                         port=config.port, service_name=config.service_name,
+                                         min=minimo, max=maximo, increment=incremento,
+                                         getmode=self.oracledb.POOL_GETMODE_TIMEDWAIT, wait_timeout=espera)
+
+    #-------------------------------------------------------------------------------
+    # Objetos del esquema
+    #-------------------------------------------------------------------------------
+    # tipo: TABLE, INDEX, SEQUENCE, TRIGGER o PROCEDURE
+    def borrar_si_existe(self, cursor, tipo, nombre):
+        cascada = " CASCADE CONSTRAINTS" if tipo.upper() == "TABLE" else ""
+        cursor.execute(f"""
+            BEGIN
+                EXECUTE IMMEDIATE 'DROP {tipo} {nombre}{cascada}';
+            EXCEPTION
+                WHEN OTHERS THEN
+                    NULL; -- Ignorar si no existe
+            END;
+        """)
+
+    def crear_secuencia(self, cursor, nombre, inicio):
+        self.borrar_si_existe(cursor, "SEQUENCE", nombre)
+        cursor.execute(f"CREATE SEQUENCE {nombre} START WITH {int(inicio)} INCREMENT BY 1 CACHE 20")
+
+    def crear_tabla_si_no_existe(self, cursor, ddl):
+        cursor.execute(f"""
+            BEGIN
+                EXECUTE IMMEDIATE '{ddl.replace("'", "''")}';
+            EXCEPTION
+                WHEN OTHERS THEN
+                    IF SQLCODE != -955 THEN -- ya existe
+                        RAISE;
+                    END IF;
+            END;
+        """)
+
+    # definicion: "UNIQUE (fecha, tlf)", "CHECK (salario >= 0)"... Si ya existe no hace nada
+    def aniadir_restriccion(self, cursor, tabla, nombre, definicion):
+        cursor.execute(f"""
+            BEGIN
+                EXECUTE IMMEDIATE 'ALTER TABLE {tabla} ADD CONSTRAINT {nombre} {definicion.replace("'", "''")}';
+            EXCEPTION
+                WHEN OTHERS THEN
+                    IF SQLCODE NOT IN (-2261, -2264) THEN -- ya existe
+                        RAISE;
+                    END IF;
+            END;
+        """)
+
+    def borrar_restriccion(self, cursor, tabla, nombre):
+        cursor.execute(f"""
+            BEGIN
+                EXECUTE IMMEDIATE 'ALTER TABLE {tabla} DROP CONSTRAINT {nombre}';
+            EXCEPTION
+                WHEN OTHERS THEN
+                    NULL; -- Ignorar si no existe
+            END;
+        """)
+
+    #-------------------------------------------------------------------------------
+    # Disparadores
+    #-------------------------------------------------------------------------------
+    # Crea todos los disparadores en un único bloque PL/SQL anónimo (una sola ida y vuelta).
+    # Cada CREATE va en su propio bloque: si uno falla los demás se crean igual.
+    # Los nombres de 'eliminar' son disparadores obsoletos que se borran en el mismo bloque.
+    # Devuelve el texto de los errores, o None si no hay ninguno.
+    def desplegar_disparadores(self, cursor, lista, nombres, eliminar=()):
+        bloque = ["DECLARE", "    errores VARCHAR2(32767);", "BEGIN"]
+        for nombre in eliminar:
+            bloque.append(f"    BEGIN EXECUTE IMMEDIATE 'DROP TRIGGER {nombre}'; "
+                          "EXCEPTION WHEN OTHERS THEN NULL; END;")
+        for i, nombre in enumerate(nombres):
+            # ORA-24344: creado con errores de compilación, se ven en user_errors
+            bloque.append(f"    BEGIN EXECUTE IMMEDIATE :t{i}; "
+                          "EXCEPTION WHEN OTHERS THEN IF SQLCODE != -24344 THEN "
+                          f"errores := errores || '{nombre}: ' || SQLERRM || CHR(10); END IF; END;")
+        bloque += ["    :errores := errores;", "END;"]
+
+        errores = cursor.var(str, 32767)
+        parametros = {f"t{i}": trigger_sql for i, trigger_sql in enumerate(lista)}
+        parametros["errores"] = errores
+        cursor.execute("\n".join(bloque), parametros)
+        return errores.getvalue()
+
+    # Estado de compilación de los disparadores: una consulta a user_objects + user_errors
+    def estado_disparadores(self, cursor, nombres):
+        cursor.execute("""
+            SELECT o.object_name, o.status, e.line, e.text
+            FROM user_objects o
+            LEFT JOIN user_errors e ON e.name = o.object_name AND e.type = 'TRIGGER'
+            WHERE o.object_type = 'TRIGGER'
+            ORDER BY o.object_name, e.sequence
+        """)
+        estado = {nombre: ("NO CREADO", []) for nombre in nombres}
+        for nombre, status, linea, texto in cursor:
+            if nombre in estado:
+                if estado[nombre][0] == "NO CREADO":
+                    estado[nombre] = (status, [])
+                if texto:
+                    estado[nombre][1].append(f"línea {linea}: {texto.strip()}")
+        return estado
+
+    # (nombre, tipo, evento, tabla, estado) de cada disparador del esquema
+    def listar_disparadores(self, cursor):
+        cursor.execute("""
+            SELECT trigger_name, trigger_type, triggering_event, table_name, status
+            FROM user_triggers
+        """)
+        return cursor.fetchall()
+
+    #-------------------------------------------------------------------------------
+    # Optimizador
+    #-------------------------------------------------------------------------------
+    def actualizar_estadisticas(self, cursor):
+        cursor.execute("BEGIN DBMS_STATS.GATHER_SCHEMA_STATS(ownname => USER, cascade => TRUE); END;")
+
+    # Líneas del plan de ejecución de una consulta (los binds no hacen falta en Oracle)
+    def plan_ejecucion(self, cursor, consulta, binds):
+        cursor.execute("EXPLAIN PLAN FOR " + consulta)
+        cursor.execute("SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY(NULL, NULL, 'BASIC'))")
+        return [linea for (linea,) in cursor]
+
+if BACKEND == "oracle":
+    import oracledb
+    backend = BackendOracle(oracledb)
+    DatabaseError = oracledb.DatabaseError
+    InterfaceError = oracledb.InterfaceError
+    DB_TYPE_NUMBER = oracledb.DB_TYPE_NUMBER
+    DB_TYPE_DATE = oracledb.DB_TYPE_DATE
+elif BACKEND == "sqlite":
+    import bd_sqlite
+    backend = bd_sqlite.BackendSQLite()
+    DatabaseError = bd_sqlite.DatabaseError
+    InterfaceError = bd_sqlite.InterfaceError
+    DB_TYPE_NUMBER = bd_sqlite.DB_TYPE_NUMBER
+    DB_TYPE_DATE = bd_sqlite.DB_TYPE_DATE
+else:
+    raise ImportError(f"Backend de BD desconocido: {BACKEND!r} (tiene que ser 'oracle' o 'sqlite')")
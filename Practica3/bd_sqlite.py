@@ -0,0 +1,1134 @@
+import datetime
+import decimal
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import config
+
+#===================================================================================
+# BACKEND SQLITE
+#===================================================================================
+# BD embebida para ejecutar la práctica, sus scripts y sus benchmarks sin red
+# (PRACTICA3_BD=sqlite o config.backend = 'sqlite'). Los datos van al fichero
+# config.sqlite_fichero (PRACTICA3_SQLITE manda sobre config), que comparten todas las
+# conexiones del proceso y los demás procesos.
+#
+# Las conexiones y cursores se comportan como los de oracledb con el SQL que usa la
+# práctica:
+#   - binds :1 y :nombre, '' como NULL, fechas como datetime y precios como Decimal
+#   - seq.NEXTVAL, SYSDATE, NVL, ROWNUM, FETCH FIRST, FOR UPDATE, RETURNING ... INTO,
+#     REGEXP_LIKE, TO_DATE, to_char y ORA_ROWSCN
+#   - executemany con batcherrors y arraydmlrowcounts, SAVEPOINT y callproc
+#   - la DDL confirma lo pendiente, como en Oracle
+#   - los errores llevan el código y el texto ORA de Oracle (ORA-00001, ORA-02291,
+#     ORA-12899, ORA-200xx de los disparadores...), así que mensaje_error de codigo.py
+#     y paridad_validacion.py los tratan igual
+#
+# Los disparadores y procedimientos de PL/SQL no se interpretan: cada uno tiene aquí
+# su versión (DISPARADORES y PROCEDIMIENTOS), con los mismos códigos y mensajes, y
+# CREATE OR REPLACE TRIGGER/PROCEDURE instala la versión con ese nombre. Un disparador
+# nuevo en codigo.py necesita también su versión aquí.
+#
+# Diferencias con Oracle:
+#   - Solo escribe un terminal a la vez: una transacción que escribe (o hace
+#     SELECT ... FOR UPDATE) bloquea la BD entera hasta el COMMIT, no solo sus filas.
+#     Los demás esperan hasta config.sqlite_espera segundos.
+#   - Las secuencias son transaccionales: un ROLLBACK devuelve los números.
+#   - ORA_ROWSCN es el número de COMMIT hechos sobre el fichero (por cualquier
+#     proceso), el mismo para todas las filas.
+#   - ROWNUM solo se admite como "AND ROWNUM = 1" o "<= n" y se aplica al final
+#     (LIMIT), después del ORDER BY.
+
+ESQUEMA = config.username.upper()
+DB_TYPE_NUMBER = "NUMBER"
+DB_TYPE_DATE = "DATE"
+
+#-----------------------------------------------------------------------------------
+# Errores con la forma de los de oracledb: error, = e.args; error.code, error.message
+#-----------------------------------------------------------------------------------
+class Error(Exception):
+    pass
+
+class DatabaseError(Error):
+    pass
+
+class IntegrityError(DatabaseError):
+    pass
+
+class InterfaceError(Error):
+    pass
+
+class _Error:
+
+    def __init__(self, code, message, offset=0):
+        self.code = code
+        self.message = message
+        self.offset = offset
+        self.full_code = f"ORA-{code:05d}"
+
+    def __str__(self):
+        return self.message
+
+def error_ora(codigo, texto, clase=DatabaseError):
+    return clase(_Error(codigo, f"ORA-{codigo:05d}: {texto}"))
+
+# RAISE_APPLICATION_ERROR de los procedimientos
+def error_aplicacion(codigo, mensaje):
+    return error_ora(-codigo, mensaje)
+
+# Texto de RAISE(ABORT, ...) en los disparadores
+def _rechazo(codigo, mensaje):
+    return "ORA" + str(codigo) + ": " + mensaje.replace("'", "''")
+
+_CODIGOS_INTEGRIDAD = (1, 1400, 2290, 2291, 2292, 12899)
+
+def _mensaje_sqlite(e, tipo, conexion):
+    texto = str(e)
+    if texto.startswith("ORA-"):
+        codigo = int(texto[4:9])
+        return _Error(codigo, texto), IntegrityError if codigo in _CODIGOS_INTEGRIDAD else DatabaseError
+
+    encontrado = re.match(r"UNIQUE constraint failed: (\w+)\.(.*)", texto)
+    if encontrado:
+        nombre = conexion._indice_unico(encontrado.group(1), [c.split(".")[-1] for c in encontrado.group(2).split(", ")])
+        return _Error(1, f"ORA-00001: unique constraint ({ESQUEMA}.{nombre}) violated"), IntegrityError
+
+    encontrado = re.match(r"CHECK constraint failed: (.*)", texto)
+    if encontrado:
+        longitud = re.fullmatch(r"lng__(\w+?)__(\w+?)__(\d+)", encontrado.group(1))
+        if longitud:
+            tabla, columna, maximo = longitud.groups()
+            return _Error(12899, f'ORA-12899: value too large for column "{ESQUEMA}"."{tabla.upper()}".'
+                                 f'"{columna.upper()}" (maximum: {maximo})'), IntegrityError
+        nombre = encontrado.group(1).upper() if re.fullmatch(r"\w+", encontrado.group(1)) else "SYS_C"
+        return _Error(2290, f"ORA-02290: check constraint ({ESQUEMA}.{nombre}) violated"), IntegrityError
+
+    encontrado = re.match(r"NOT NULL constraint failed: (\w+)\.(\w+)", texto)
+    if encontrado:
+        return _Error(1400, f'ORA-01400: cannot insert NULL into ("{ESQUEMA}"."{encontrado.group(1).upper()}".'
+                            f'"{encontrado.group(2).upper()}")'), IntegrityError
+
+    if texto.startswith("FOREIGN KEY constraint failed"):
+        if tipo == "DELETE":
+            return _Error(2292, "ORA-02292: integrity constraint violated - child record found"), IntegrityError
+        return _Error(2291, "ORA-02291: integrity constraint violated - parent key not found"), IntegrityError
+
+    if texto.startswith("no such table"):
+        return _Error(942, "ORA-00942: table or view does not exist"), DatabaseError
+    if "already exists" in texto:
+        return _Error(955, "ORA-00955: name is already used by an existing object"), DatabaseError
+    if "database is locked" in texto or "database table is locked" in texto:
+        return _Error(30006, "ORA-30006: resource busy; acquire with WAIT timeout expired"), DatabaseError
+    return _Error(0, f"SQLite: {texto}"), DatabaseError
+
+def _traducir_error(e, tipo, conexion):
+    if isinstance(e, sqlite3.ProgrammingError) and "closed" in str(e):
+        return InterfaceError(_Error(1001, "DPY-1001: not connected to database"))
+    error, clase = _mensaje_sqlite(e, tipo, conexion)
+    return clase(error)
+
+#-----------------------------------------------------------------------------------
+# Tipos: fechas como 'YYYY-MM-DD HH:MM:SS' (se comparan bien como texto) y DECIMAL
+# como Decimal, igual que devuelve oracledb
+#-----------------------------------------------------------------------------------
+sqlite3.register_adapter(datetime.datetime, lambda valor: valor.strftime("%Y-%m-%d %H:%M:%S"))
+sqlite3.register_adapter(datetime.date, lambda valor: valor.strftime("%Y-%m-%d 00:00:00"))
+sqlite3.register_adapter(decimal.Decimal, str)
+sqlite3.register_converter("DATE", lambda valor: datetime.datetime.fromisoformat(valor.decode()))
+sqlite3.register_converter("DECIMAL", lambda valor: decimal.Decimal(valor.decode()))
+
+def _valor(valor):
+    if isinstance(valor, Variable):
+        valor = valor.getvalue()
+    # en Oracle la cadena vacía es NULL
+    if valor == '':
+        return None
+    return valor
+
+# En REGEXP_LIKE '$' es el final de la cadena (ver validacion.py)
+@functools.lru_cache(maxsize=None)
+def _patron(patron):
+    if patron.endswith('$'):
+        patron = patron[:-1] + r'\Z'
+    return re.compile(patron, re.ASCII)
+
+def _regexp_like(valor, patron):
+    if valor is None or patron is None:
+        return None
+    return _patron(patron).search(str(valor)) is not None
+
+_FORMATO_FECHA = re.compile(r"YYYY|MON|MM|DD|HH24|MI|SS")
+_MESES = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+def _to_char(valor, formato=None):
+    if valor is None:
+        return None
+    try:
+        fecha = datetime.datetime.fromisoformat(str(valor))
+    except ValueError:
+        return str(valor)
+    if formato is None:
+        return fecha.strftime("%d/%m/%y")
+    partes = {"YYYY": f"{fecha.year:04d}", "MON": _MESES[fecha.month - 1], "MM": f"{fecha.month:02d}",
+              "DD": f"{fecha.day:02d}", "HH24": f"{fecha.hour:02d}", "MI": f"{fecha.minute:02d}",
+              "SS": f"{fecha.second:02d}"}
+    return _FORMATO_FECHA.sub(lambda m: partes[m.group(0)], formato.upper())
+
+_FORMATOS_FECHA = {"YYYY": "%Y", "MM": "%m", "DD": "%d", "HH24": "%H", "MI": "%M", "SS": "%S"}
+
+def _to_date(valor, formato="YYYY-MM-DD HH24:MI:SS"):
+    if valor is None:
+        return None
+    patron = re.sub(r"YYYY|MM|DD|HH24|MI|SS", lambda m: _FORMATOS_FECHA[m.group(0)], formato.upper())
+    return datetime.datetime.strptime(str(valor), patron).strftime("%Y-%m-%d %H:%M:%S")
+
+#-----------------------------------------------------------------------------------
+# Traducción de las sentencias
+#-----------------------------------------------------------------------------------
+_TROZOS = re.compile(r"'(?:[^']|'')*'|--[^\n]*|[^'-]+|-")
+_BIND = re.compile(r"(?<![:\w]):(\w+)")
+
+# Aplica funcion a las partes del SQL que no son literales ni comentarios
+def _fuera_de_literales(sql, funcion):
+    trozos = []
+    for trozo in _TROZOS.findall(sql):
+        trozos.append(trozo if trozo.startswith("'") or trozo.startswith("--") else funcion(trozo))
+    return "".join(trozos)
+
+def _binds(sql):
+    nombres = []
+    _fuera_de_literales(sql, lambda trozo: nombres.extend(n.lower() for n in _BIND.findall(trozo)) or trozo)
+    return nombres
+
+_SUSTITUCIONES = [
+    (re.compile(r"\b(\w+)\.NEXTVAL\b", re.I), r":__seq__\1"),
+    (re.compile(r"\bSYS(?:DATE|TIMESTAMP)\b", re.I), "datetime('now', 'localtime')"),
+    (re.compile(r"\bNVL\s*\(", re.I), "IFNULL("),
+    (re.compile(r"\bORA_ROWSCN\b", re.I), "(SELECT valor FROM scn_)"),
+    (re.compile(r"\s+FROM\s+dual\b", re.I), ""),
+]
+_RETURNING = re.compile(r"\bRETURNING\s+(.*?)\s+INTO\s+(:\w+(?:\s*,\s*:\w+)*)\s*$", re.I | re.S)
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE(?:\s+OF\s+[\w.,\s]+?)?(?:\s+NOWAIT|\s+WAIT\s+\d+|\s+SKIP\s+LOCKED)?\s*$", re.I)
+_ROWNUM = re.compile(r"\s+AND\s+ROWNUM\s*(=\s*1|<=?\s*(\d+))", re.I)
+_ROWNUM_WHERE = re.compile(r"\bWHERE\s+ROWNUM\s*(=\s*1|<=?\s*(\d+))", re.I)
+_OFFSET_FETCH = re.compile(r"\s+OFFSET\s+(\S+)\s+ROWS?\s+FETCH\s+(?:FIRST|NEXT)\s+(\S+)\s+ROWS?\s+ONLY\s*$", re.I)
+_FETCH_FIRST = re.compile(r"\s+FETCH\s+(?:FIRST|NEXT)\s+(\S+)\s+ROWS?\s+ONLY\s*$", re.I)
+
+class Sentencia:
+
+    def __init__(self, sql):
+        texto = sql.strip().rstrip(";").strip()
+        self.tipo = texto.split(None, 1)[0].upper() if texto else ""
+        self.salida = []
+        self.limite = None
+
+        for patron, sustituto in _SUSTITUCIONES:
+            texto = _fuera_de_literales(texto, functools.partial(patron.sub, sustituto))
+        # Los binds del usuario, en el orden en el que aparecen (para los binds por posición)
+        self.binds_usuario = [n for n in _binds(texto) if not n.startswith("__seq__")]
+
+        encontrado = _RETURNING.search(texto)
+        if encontrado:
+            self.salida = [n.strip()[1:].lower() for n in encontrado.group(2).split(",")]
+            texto = texto[:encontrado.start()] + "RETURNING " + encontrado.group(1)
+
+        self.bloquea = False
+        if _FOR_UPDATE.search(texto):
+            texto = _FOR_UPDATE.sub("", texto)
+            self.bloquea = True
+
+        def rownum(m):
+            self.limite = 1 if m.group(2) is None else int(m.group(2)) - (0 if "=" in m.group(1) else 1)
+            return ""
+        texto = _ROWNUM.sub(rownum, texto)
+        texto = _ROWNUM_WHERE.sub(lambda m: rownum(m) or "WHERE 1 = 1", texto)
+
+        encontrado = _OFFSET_FETCH.search(texto) or _FETCH_FIRST.search(texto)
+        if encontrado:
+            limite = encontrado.groups()[-1]
+            desplazamiento = f" OFFSET {encontrado.group(1)}" if len(encontrado.groups()) == 2 else ""
+            texto = texto[:encontrado.start()] + f" LIMIT {limite}{desplazamiento}"
+        if self.limite is not None:
+            texto += f" LIMIT {self.limite}"
+
+        self.binds = _binds(texto)
+        self.secuencias = any(n.startswith("__seq__") for n in self.binds)
+        self.sql = _fuera_de_literales(texto, lambda trozo: _BIND.sub("?", trozo))
+        self.escribe = self.tipo in ("INSERT", "UPDATE", "DELETE", "MERGE", "SAVEPOINT") or self.bloquea
+
+    # Valores de los binds de entrada y variables de RETURNING INTO, a partir de los
+    # parámetros (dict por nombre o secuencia por posición)
+    def valores(self, parametros, siguiente_valor):
+        if parametros is None:
+            parametros = ()
+        if isinstance(parametros, dict):
+            por_nombre = {nombre.lower(): valor for nombre, valor in parametros.items()}
+        else:
+            parametros = list(parametros)
+            unicos = list(dict.fromkeys(self.binds_usuario))
+            if len(parametros) == len(self.binds_usuario):
+                por_nombre = {}
+                for nombre, valor in zip(self.binds_usuario, parametros):
+                    por_nombre.setdefault(nombre, valor)
+            elif len(parametros) == len(unicos):
+                por_nombre = dict(zip(unicos, parametros))
+            else:
+                raise error_ora(1008, "not all variables bound")
+
+        try:
+            entrada = [siguiente_valor(nombre[7:]) if nombre.startswith("__seq__") else _valor(por_nombre[nombre])
+                       for nombre in self.binds]
+            salida = [por_nombre[nombre] for nombre in self.salida]
+        except KeyError as e:
+            raise error_ora(1008, f"not all variables bound ({e.args[0]})") from None
+        return entrada, salida
+
+@functools.lru_cache(maxsize=512)
+def traducir(sql):
+    return Sentencia(sql)
+
+#-----------------------------------------------------------------------------------
+# DDL: tablas con sus restricciones con nombre, secuencias, disparadores y
+# procedimientos
+#-----------------------------------------------------------------------------------
+_CREATE_TABLE = re.compile(r"CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\(", re.I)
+_COLUMNA_TEXTO = re.compile(r"^\s*(\w+)\s+(?:VARCHAR2?|CHAR)\s*\(\s*(\d+)\s*\)", re.I | re.M)
+_UNIQUE = re.compile(r",\s*CONSTRAINT\s+(\w+)\s+UNIQUE\s*\(([^)]*)\)", re.I)
+_COLUMNA = re.compile(r"^(\s*)(\w+)\s+(?!KEY\b)[A-Z]\w*(?:\s*\([^)]*\))?", re.I | re.M)
+_PRIMARY_KEY_COLUMNA = re.compile(r"^\s*(?!CONSTRAINT\b)(\w+)\s+\w+(?:\s*\([^)]*\))?\s*PRIMARY\s+KEY", re.I | re.M)
+_PRIMARY_KEY_TABLA = re.compile(r"^\s*PRIMARY\s+KEY\s*\(([^)]*)\)", re.I | re.M)
+_PRIMARY_KEY_NOMBRE = re.compile(r"CONSTRAINT\s+(\w+)\s+PRIMARY\s+KEY\s*\(([^)]*)\)", re.I)
+_FOREIGN_KEY = re.compile(r"CONSTRAINT\s+(\w+)\s+FOREIGN\s+KEY\s*\(([^)]*)\)\s*REFERENCES\s+(\w+)\s*\(([^)]*)\)", re.I)
+
+def _columnas(texto):
+    return [c.strip() for c in texto.split(",")]
+
+# Las restricciones se comprueban después de los disparadores BEFORE, como en Oracle
+def _disparadores_restriccion(nombre, tabla, condicion, rechazo, columnas=None):
+    de = f" OF {', '.join(columnas)}" if columnas else ""
+    return [f"CREATE TRIGGER {nombre}__r_ins AFTER INSERT ON {tabla} FOR EACH ROW "
+            f"BEGIN SELECT RAISE(ABORT, '{rechazo}') WHERE {condicion}; END",
+            f"CREATE TRIGGER {nombre}__r_upd AFTER UPDATE{de} ON {tabla} FOR EACH ROW "
+            f"BEGIN SELECT RAISE(ABORT, '{rechazo}') WHERE {condicion}; END"]
+
+def _clave_externa(nombre, tabla, columnas, padre, referenciadas):
+    nulas = " AND ".join(f"NEW.{c} IS NOT NULL" for c in columnas)
+    iguales = " AND ".join(f"{r} = NEW.{c}" for c, r in zip(columnas, referenciadas))
+    condicion = f"{nulas} AND NOT EXISTS (SELECT 1 FROM {padre} WHERE {iguales})"
+    rechazo = f"ORA-02291: integrity constraint ({ESQUEMA}.{nombre.upper()}) violated - parent key not found"
+    return _disparadores_restriccion(nombre, tabla, condicion, rechazo, columnas)
+
+# CREATE TABLE de Oracle -> sentencias de SQLite y restricciones con nombre (nombre, tipo)
+def _traducir_tabla(sql):
+    encontrado = _CREATE_TABLE.search(sql)
+    si_no_existe = "IF NOT EXISTS " if encontrado.group(1) else ""
+    tabla = encontrado.group(2).lower()
+    sentencias = []
+    restricciones = []
+
+    # Las UNIQUE con nombre se crean como índice único, para poder borrarlas
+    for nombre, columnas in _UNIQUE.findall(sql):
+        sentencias.append(f"CREATE UNIQUE INDEX {si_no_existe}{nombre} ON {tabla} ({columnas})")
+        restricciones.append((nombre, "UNIQUE"))
+    sql = _UNIQUE.sub("", sql)
+
+    # Las FOREIGN KEY con nombre, además de la del motor, tienen un disparador que da
+    # el error con el nombre de la restricción (SQLite no dice cuál ha fallado)
+    for nombre, columnas, padre, referenciadas in _FOREIGN_KEY.findall(sql):
+        if not si_no_existe:
+            sentencias += _clave_externa(nombre, tabla, _columnas(columnas), padre, _columnas(referenciadas))
+        restricciones.append((nombre, "FOREIGN KEY"))
+
+    # En SQLite la clave primaria admite NULL (salvo INTEGER PRIMARY KEY); en Oracle no (ORA-01400)
+    primaria = {c.lower() for c in _PRIMARY_KEY_COLUMNA.findall(sql)}
+    for columnas in _PRIMARY_KEY_TABLA.findall(sql):
+        primaria.update(c.lower() for c in _columnas(columnas))
+    # La clave primaria con nombre se queda en la tabla; el nombre se guarda para el ORA-00001
+    for nombre, columnas in _PRIMARY_KEY_NOMBRE.findall(sql):
+        primaria.update(c.lower() for c in _columnas(columnas))
+        restricciones.append((nombre, "PRIMARY KEY"))
+    sql = _COLUMNA.sub(lambda m: m.group(0) + " NOT NULL " if m.group(2).lower() in primaria else m.group(0), sql)
+
+    # VARCHAR(n) de Oracle: n bytes como máximo (ORA-12899)
+    longitudes = [f"CONSTRAINT lng__{tabla}__{columna.lower()}__{n} CHECK (length(CAST({columna} AS BLOB)) <= {n})"
+                  for columna, n in _COLUMNA_TEXTO.findall(sql)]
+    cierre = sql.rstrip().rindex(")")
+    if longitudes:
+        sql = sql[:cierre] + ",\n" + ",\n".join(longitudes) + "\n" + sql[cierre:]
+    return tabla, [sql] + sentencias, restricciones
+
+#-----------------------------------------------------------------------------------
+# Disparadores: nombre del disparador de Oracle -> sentencias de SQLite
+#-----------------------------------------------------------------------------------
+# Un disparador de Oracle con varios eventos (BEFORE INSERT OR UPDATE) son varios en
+# SQLite: el primero con el mismo nombre y los demás con __upd / __del
+def _antes_de(nombre, eventos, tabla, *cuerpo):
+    sentencias = []
+    for i, evento in enumerate(eventos):
+        sufijo = "" if i == 0 else "__" + evento.lower()[:3]
+        sentencias.append(f"CREATE TRIGGER {nombre}{sufijo} BEFORE {evento} ON {tabla} FOR EACH ROW "
+                          f"BEGIN {' '.join(cuerpo)} END")
+    return sentencias
+
+# RAISE_APPLICATION_ERROR(codigo, mensaje) si se cumple la condición
+def _si(condicion, codigo, mensaje):
+    return f"SELECT RAISE(ABORT, '{_rechazo(codigo, mensaje)}') WHERE {condicion};"
+
+# SELECT ... INTO sin filas
+def _sin_filas(condicion):
+    return f"SELECT RAISE(ABORT, 'ORA-01403: no data found') WHERE {condicion};"
+
+DISPARADORES = {
+    # empleados
+    "verificar_mesas_antes_de_eliminar": _antes_de(
+        "verificar_mesas_antes_de_eliminar", ["DELETE"], "empleado",
+        _si("""EXISTS (SELECT 1 FROM mesa m JOIN asignado a ON m.id_mesa = a.id_mesa
+                       WHERE a.dni_empleado = OLD.dni AND (m.estado = 'OCUPADA' OR m.estado = 'RESERVADA'))""",
+            -20010, 'No se puede eliminar el usuario porque tiene mesas asociadas.'),
+        "DELETE FROM asignado WHERE dni_empleado = OLD.dni;"),
+    "verificar_repartos_antes_de_eliminar": _antes_de(
+        "verificar_repartos_antes_de_eliminar", ["DELETE"], "empleado",
+        _si("""EXISTS (SELECT 1 FROM pedido p JOIN reparte r ON p.id_pedido = r.id_pedido
+                       WHERE r.dni = OLD.dni AND p.estado = 'PENDIENTE')""",
+            -20011, 'No se puede eliminar el usuario porque tiene repartos asociados.'),
+        "DELETE FROM reparte WHERE dni = OLD.dni;"),
+    "verificar_salario_positivo": _antes_de(
+        "verificar_salario_positivo", ["INSERT", "UPDATE"], "empleado",
+        _si("NEW.salario < 0", -20012, 'El salario no puede ser negativo.')),
+    "verificar_formato_dni": _antes_de(
+        "verificar_formato_dni", ["INSERT", "UPDATE"], "empleado",
+        _si("NEW.dni IS NULL OR NOT REGEXP_LIKE(NEW.dni, '^[0-9]{8}[A-Z]$')",
+            -20013, 'Error: El DNI debe tener 8 números seguidos de 1 letra mayúscula.')),
+    "verificar_formato_tlf": _antes_de(
+        "verificar_formato_tlf", ["INSERT", "UPDATE"], "empleado",
+        _si(r"NEW.telefono IS NULL OR NOT REGEXP_LIKE(NEW.telefono, '^\+?[0-9]{1,3}?[0-9]{1,20}$')",
+            -20014, 'Error: El teléfono debe ser un número válido con un prefijo opcional.')),
+
+    # proveedores
+    "trigger_verificar_formato_telefono_proveedor": _antes_de(
+        "trigger_verificar_formato_telefono_proveedor", ["INSERT"], "proveedor",
+        _si(r"NOT REGEXP_LIKE(NEW.telefono, '^\+?\d+$')",
+            -20015, 'Error: El número debe comenzar con un "+" opcional, seguido solo de dígitos.')),
+    "trigger_verificar_formato_correo_proveedor": _antes_de(
+        "trigger_verificar_formato_correo_proveedor", ["INSERT"], "proveedor",
+        _si("INSTR(NEW.correo, '@') = 0", -20021, 'Error: El correo debe contener un carácter @.'),
+        _si("INSTR(NEW.correo, '@') = 1 OR INSTR(NEW.correo, '@') = LENGTH(NEW.correo)",
+            -20022, 'Error: El correo debe contener al menos un carácter antes y después del @.')),
+    "trigger_verificar_producto_existe": _antes_de(
+        "trigger_verificar_producto_existe", ["INSERT", "UPDATE"], "tiene",
+        _si("NOT EXISTS (SELECT 1 FROM viveres WHERE codigo = NEW.codigo)",
+            -20025, 'Error: El producto proporcionado no existe en la base de datos.')),
+
+    # pedidos online
+    "verificar_pedidos_antes_de_eliminar": _antes_de(
+        "verificar_pedidos_antes_de_eliminar", ["DELETE"], "usuario",
+        _si("""EXISTS (SELECT 1 FROM pedido p JOIN realiza r ON p.id_pedido = r.id_pedido
+                       WHERE r.telefono = OLD.telefono AND p.estado = 'PENDIENTE')""",
+            -20031, 'No se puede eliminar el usuario porque tiene pedidos pendientes.'),
+        "DELETE FROM realiza WHERE telefono = OLD.telefono;"),
+    "validar_reparte": _antes_de(
+        "validar_reparte", ["INSERT"], "reparte",
+        _si("NOT EXISTS (SELECT 1 FROM empleado WHERE dni = NEW.dni)",
+            -20036, 'No existe un empleado con el dni proporcionado'),
+        _si("NOT EXISTS (SELECT 1 FROM pedido WHERE id_pedido = NEW.id_pedido)",
+            -20037, 'No existe pedido con identificador asociado'),
+        _si("(SELECT cargo FROM empleado WHERE dni = NEW.dni) != 'REPARTIDOR'",
+            -20032, 'El empleado no es repartidor.'),
+        _si("(SELECT estado FROM pedido WHERE id_pedido = NEW.id_pedido) != 'PENDIENTE'",
+            -20033, 'El pedido no existe o no está pendiente.')),
+    "trigger_verificar_si_tlf_usuario_existe": _antes_de(
+        "trigger_verificar_si_tlf_usuario_existe", ["INSERT"], "realiza",
+        _si("NOT EXISTS (SELECT 1 FROM usuario WHERE telefono = NEW.telefono)",
+            -20034, 'El número de teléfono no pertenece a ningún usuario')),
+    "trigger_verificar_si_cod_prod_existe": _antes_de(
+        "trigger_verificar_si_cod_prod_existe", ["INSERT"], "contiene",
+        _si("NOT EXISTS (SELECT 1 FROM producto WHERE id_producto = NEW.id_producto)",
+            -20035, 'El código no identifica a ningún producto')),
+
+    # los cinco disparadores de reparte que sustituye validar_reparte (benchmark_reparte.py)
+    "verificar_si_es_repartidor": _antes_de(
+        "verificar_si_es_repartidor", ["INSERT"], "reparte",
+        _sin_filas("NOT EXISTS (SELECT 1 FROM empleado WHERE dni = NEW.dni)"),
+        _si("(SELECT cargo FROM empleado WHERE dni = NEW.dni) != 'REPARTIDOR'",
+            -20032, 'El empleado no es repartidor.')),
+    "verificar_si_pedido_pendiente": _antes_de(
+        "verificar_si_pedido_pendiente", ["INSERT"], "reparte",
+        _sin_filas("NOT EXISTS (SELECT 1 FROM pedido WHERE id_pedido = NEW.id_pedido)"),
+        _si("(SELECT estado FROM pedido WHERE id_pedido = NEW.id_pedido) != 'PENDIENTE'",
+            -20033, 'El pedido no existe o no está pendiente.')),
+    "trigger_verificar_si_empleado_existe": _antes_de(
+        "trigger_verificar_si_empleado_existe", ["INSERT"], "reparte",
+        _si("NOT EXISTS (SELECT 1 FROM empleado WHERE dni = NEW.dni)",
+            -20036, 'No existe un empleado con el dni proporcionado')),
+    "trigger_verificar_si_pedido_existe": _antes_de(
+        "trigger_verificar_si_pedido_existe", ["INSERT"], "reparte",
+        _si("NOT EXISTS (SELECT 1 FROM pedido WHERE id_pedido = NEW.id_pedido)",
+            -20037, 'No existe pedido con identificador asociado')),
+    "trigger_verificar_si_pedido_tiene_repartidor_asociado": _antes_de(
+        "trigger_verificar_si_pedido_tiene_repartidor_asociado", ["INSERT"], "reparte",
+        _si("EXISTS (SELECT 1 FROM reparte WHERE id_pedido = NEW.id_pedido)",
+            -20038, 'El pedido ya tiene un repartidor asignado')),
+
+    # reservas
+    "validar_numero_personas_reserva": _antes_de(
+        "validar_numero_personas_reserva", ["INSERT", "UPDATE"], "reserva",
+        _si("NEW.numero_personas < 1", -20038, 'El número de personas en una reserva debe ser mayor o igual a 1.')),
+    "validar_fecha_reserva_posterior": _antes_de(
+        "validar_fecha_reserva_posterior", ["INSERT", "UPDATE"], "reserva",
+        _si("NEW.fecha <= datetime('now', 'localtime')",
+            -20039, 'La fecha de la reserva debe ser posterior a la fecha actual.')),
+    "validar_formato_telefono_reserva": _antes_de(
+        "validar_formato_telefono_reserva", ["INSERT", "UPDATE"], "reserva",
+        _si("NEW.telefono IS NULL OR NOT REGEXP_LIKE(NEW.telefono, '^[0-9]{9}$')",
+            -20041, 'El teléfono debe tener exactamente 9 dígitos.')),
+    "validar_valores_lugar_reserva": _antes_de(
+        "validar_valores_lugar_reserva", ["INSERT", "UPDATE"], "reserva",
+        _si("NEW.lugar NOT IN (0, 1)", -20042, 'El valor de lugar debe ser 0 (dentro) o 1 (fuera).')),
+    # el disparador anterior a uq_encargado_reserva (concurrencia_encargado.py)
+    "validar_empleado_asignado": _antes_de(
+        "validar_empleado_asignado", ["INSERT", "UPDATE"], "encargado_de",
+        _si("EXISTS (SELECT 1 FROM encargado_de WHERE fecha = NEW.fecha AND tlf = NEW.tlf)",
+            -20043, 'La reserva ya tiene un empleado asignado.')),
+
+    # mesas
+    "no_activar_mesa_ocupada": _antes_de(
+        "no_activar_mesa_ocupada", ["UPDATE"], "mesa",
+        _si("OLD.estado = 'OCUPADA' AND NEW.estado = 'OCUPADA'",
+            -20043, 'Para ocupar una mesa, esta no debe estar ocupada')),
+}
+
+#-----------------------------------------------------------------------------------
+# Procedimientos: nombre -> función (cursor, *parámetros). El cursor es uno de este
+# backend, con el SQL de Oracle. callproc los ejecuta de forma atómica.
+#-----------------------------------------------------------------------------------
+def _aniadir_a_comanda(cursor, p_mesa, p_producto, p_consumiciones):
+    cursor.execute("""
+        SELECT id_comanda
+        FROM comanda
+        WHERE id_mesa = :1 AND estado = 'ACTIVO' AND ROWNUM = 1
+        FOR UPDATE
+    """, [p_mesa])
+    fila = cursor.fetchone()
+    if fila is None:
+        raise error_aplicacion(-20044, 'No hay ninguna comanda activa en esta mesa')
+    v_comanda, = fila
+
+    # Si el producto ya está en la comanda, se suman las consumiciones
+    cursor.execute("""
+        UPDATE entrada_comanda
+        SET num_consumidores = num_consumidores + :consumiciones
+        WHERE id_mesa = :mesa AND id_comanda = :comanda
+        AND EXISTS (SELECT 1
+                    FROM formado_por f
+                    WHERE f.id_mesa = entrada_comanda.id_mesa AND f.id_comanda = entrada_comanda.id_comanda
+                    AND f.id_entrada = entrada_comanda.id_entrada AND f.id_producto = :producto)
+    """, {"consumiciones": p_consumiciones, "mesa": p_mesa, "comanda": v_comanda, "producto": p_producto})
+
+    # Si no, se crea una entrada nueva
+    if cursor.rowcount == 0:
+        cursor.execute("""
+            SELECT NVL(MAX(id_entrada), 0) + 1
+            FROM entrada_comanda
+            WHERE id_mesa = :1 AND id_comanda = :2
+        """, [p_mesa, v_comanda])
+        v_entrada, = cursor.fetchone()
+
+        cursor.execute("""
+            INSERT INTO entrada_comanda (id_mesa, id_comanda, id_entrada, num_consumidores)
+            VALUES (:1, :2, :3, :4)
+        """, [p_mesa, v_comanda, v_entrada, p_consumiciones])
+
+        cursor.execute("""
+            INSERT INTO formado_por (id_entrada, id_mesa, id_comanda, id_producto)
+            VALUES (:1, :2, :3, :4)
+        """, [v_entrada, p_mesa, v_comanda, p_producto])
+
+def _comprobar_pedido(cursor, p_pedido):
+    cursor.execute("SELECT estado FROM pedido WHERE id_pedido = :1", [p_pedido])
+    fila = cursor.fetchone()
+    if fila is None:
+        raise error_aplicacion(-20037, 'No existe pedido con identificador asociado')
+    if fila[0] != 'PENDIENTE':
+        raise error_aplicacion(-20033, 'El pedido no existe o no está pendiente.')
+
+PROCEDIMIENTOS = {
+    "aniadir_a_comanda": _aniadir_a_comanda,
+    "comprobar_pedido": _comprobar_pedido,
+}
+
+#-----------------------------------------------------------------------------------
+# Conexión y cursor
+#-----------------------------------------------------------------------------------
+# Secuencias, restricciones con nombre y el contador de COMMIT (ORA_ROWSCN), que
+# SQLite no guarda. El contador va en el fichero para que se vean los COMMIT de
+# otros procesos
+_TABLAS_INTERNAS = [
+    "CREATE TABLE IF NOT EXISTS secuencias_ (nombre TEXT PRIMARY KEY, valor INTEGER)",
+    "CREATE TABLE IF NOT EXISTS objetos_ (nombre TEXT PRIMARY KEY, tipo TEXT, tabla TEXT)",
+    "CREATE TABLE IF NOT EXISTS scn_ (valor INTEGER)",
+    "INSERT INTO scn_ SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM scn_)",
+]
+_ficheros_preparados = set()
+_cerrojo_ficheros = threading.Lock()
+
+# Lo que recibe outputtypehandler por cada columna del resultado
+class Metadatos:
+
+    def __init__(self, nombre, tipo):
+        self.name = nombre
+        self.type_code = tipo
+
+class Variable:
+
+    def __init__(self, tipo=None, tamanio=0):
+        self.type = tipo
+        self.size = tamanio
+        self._valor = None
+
+    def getvalue(self, pos=0):
+        return self._valor
+
+    def setvalue(self, pos, valor):
+        self._valor = valor
+
+class Conexion:
+
+    def __init__(self, fichero, pool=None):
+        self.fichero = fichero
+        self._pool = pool
+        self._cerrada = False
+        self._cerrojo = threading.RLock()
+        try:
+            self._bd = sqlite3.connect(fichero, timeout=config.sqlite_espera, isolation_level=None,
+                                       detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        except sqlite3.Error as e:
+            raise error_ora(12154, f"no se puede abrir {fichero}: {e}") from None
+        self._bd.execute("PRAGMA foreign_keys = ON")
+        self._bd.create_function("regexp_like", 2, _regexp_like, deterministic=True)
+        self._bd.create_function("to_char", 1, _to_char, deterministic=True)
+        self._bd.create_function("to_char", 2, _to_char, deterministic=True)
+        self._bd.create_function("to_date", 1, _to_date, deterministic=True)
+        self._bd.create_function("to_date", 2, _to_date, deterministic=True)
+        with _cerrojo_ficheros:
+            if fichero not in _ficheros_preparados:
+                self._bd.execute("PRAGMA journal_mode = WAL")
+                for sql in _TABLAS_INTERNAS:
+                    self._bd.execute(sql)
+                _ficheros_preparados.add(fichero)
+
+    #-------------------------------------------------------------------------------
+    # Transacciones
+    #-------------------------------------------------------------------------------
+    @property
+    def transaction_in_progress(self):
+        return not self._cerrada and self._bd.in_transaction
+
+    def _comprobar(self):
+        if self._cerrada:
+            raise InterfaceError(_Error(1001, "DPY-1001: not connected to database"))
+
+    # La primera escritura de la transacción reserva la BD (un solo escritor a la vez)
+    def _empezar(self):
+        if not self._bd.in_transaction:
+            try:
+                self._bd.execute("BEGIN IMMEDIATE")
+            except sqlite3.Error as e:
+                raise _traducir_error(e, "BEGIN", self) from None
+
+    def commit(self):
+        self._comprobar()
+        with self._cerrojo:
+            if self._bd.in_transaction:
+                # El contador sube en la misma transacción que confirma
+                try:
+                    self._bd.execute("UPDATE scn_ SET valor = valor + 1")
+                    self._bd.execute("COMMIT")
+                except sqlite3.Error as e:
+                    raise _traducir_error(e, "COMMIT", self) from None
+
+    def rollback(self):
+        self._comprobar()
+        with self._cerrojo:
+            if self._bd.in_transaction:
+                self._bd.execute("ROLLBACK")
+
+    def close(self):
+        self._comprobar()
+        # Como en Oracle, lo que no se ha confirmado se deshace
+        if self._bd.in_transaction:
+            self._bd.execute("ROLLBACK")
+        if self._pool is not None:
+            self._pool._devolver(self)
+        else:
+            self._cerrada = True
+            self._bd.close()
+
+    def cursor(self):
+        self._comprobar()
+        return Cursor(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        if not self._cerrada:
+            self.close()
+
+    #-------------------------------------------------------------------------------
+    # Secuencias y objetos
+    #-------------------------------------------------------------------------------
+    def _siguiente_valor(self, secuencia):
+        fila = self._bd.execute("UPDATE secuencias_ SET valor = valor + 1 WHERE nombre = ? RETURNING valor",
+                                (secuencia.lower(),)).fetchone()
+        if fila is None:
+            raise error_ora(2289, "sequence does not exist")
+        return fila[0]
+
+    def _objeto(self, nombre):
+        return self._bd.execute("SELECT tipo, tabla FROM objetos_ WHERE nombre = ?", (nombre.lower(),)).fetchone()
+
+    # Nombre de la restricción UNIQUE / PRIMARY KEY sobre esas columnas
+    def _indice_unico(self, tabla, columnas):
+        for _, indice, unico, origen, *_ in self._bd.execute(f"PRAGMA index_list({tabla})").fetchall():
+            if unico:
+                cols = [fila[2] for fila in self._bd.execute(f"PRAGMA index_info({indice})")]
+                if cols == columnas and not indice.startswith("sqlite_autoindex"):
+                    return indice.upper()
+                if cols == columnas and origen == "pk":
+                    primaria = self._bd.execute("SELECT nombre FROM objetos_ WHERE tabla = ? AND tipo = 'PRIMARY KEY'",
+                                                (tabla.lower(),)).fetchone()
+                    if primaria:
+                        return primaria[0].upper()
+        return f"SYS_C_{tabla.upper()}"
+
+    # La DDL confirma lo pendiente y se confirma sola, como en Oracle
+    def _ddl(self, sql):
+        with self._cerrojo:
+            self.commit()
+            self._empezar()
+            try:
+                self._ejecutar_ddl(sql)
+                self.commit()
+            except sqlite3.Error as e:
+                self._bd.execute("ROLLBACK")
+                raise _traducir_error(e, "DDL", self) from None
+            except Error:
+                self._bd.execute("ROLLBACK")
+                raise
+
+    def _ejecutar_ddl(self, sql):
+        texto = " ".join(sql.split())
+        palabras = texto.upper().split()
+
+        if palabras[:4] == ["CREATE", "OR", "REPLACE", "TRIGGER"]:
+            nombre = texto.split()[4].lower()
+            if nombre not in DISPARADORES:
+                raise error_ora(24344, f"success with compilation error (no hay versión SQLite de {nombre})")
+            self._borrar_disparador(nombre)
+            for sentencia in DISPARADORES[nombre]:
+                self._bd.execute(sentencia)
+
+        elif palabras[:4] == ["CREATE", "OR", "REPLACE", "PROCEDURE"]:
+            nombre = re.match(r"\w+", texto.split()[4]).group(0).lower()
+            if nombre not in PROCEDIMIENTOS:
+                raise error_ora(24344, f"success with compilation error (no hay versión SQLite de {nombre})")
+            self._bd.execute("INSERT OR REPLACE INTO objetos_ VALUES (?, 'PROCEDURE', NULL)", (nombre,))
+
+        elif palabras[:2] == ["CREATE", "SEQUENCE"]:
+            nombre = texto.split()[2].lower()
+            inicio = re.search(r"START\s+WITH\s+(-?\d+)", texto, re.I)
+            if self._bd.execute("SELECT 1 FROM secuencias_ WHERE nombre = ?", (nombre,)).fetchone():
+                raise error_ora(955, "name is already used by an existing object")
+            self._bd.execute("INSERT INTO secuencias_ VALUES (?, ?)", (nombre, (int(inicio.group(1)) if inicio else 1) - 1))
+
+        elif palabras[:2] == ["CREATE", "TABLE"]:
+            tabla, sentencias, restricciones = _traducir_tabla(sql)
+            if not _CREATE_TABLE.search(sql).group(1):
+                self._bd.execute("DELETE FROM objetos_ WHERE tabla = ?", (tabla,))
+            for sentencia in sentencias:
+                self._bd.execute(sentencia)
+            for nombre, tipo in restricciones:
+                self._bd.execute("INSERT OR REPLACE INTO objetos_ VALUES (?, ?, ?)", (nombre.lower(), tipo, tabla))
+
+        elif palabras[:2] == ["ALTER", "TABLE"] and palabras[3:5] == ["ADD", "CONSTRAINT"]:
+            self._aniadir_restriccion(texto.split()[2].lower(), texto.split()[5].lower(), " ".join(texto.split()[6:]))
+
+        elif palabras[:2] == ["ALTER", "TABLE"] and palabras[3:5] == ["DROP", "CONSTRAINT"]:
+            nombre = texto.split()[5].lower()
+            objeto = self._objeto(nombre)
+            if objeto is None or objeto[0] not in ("UNIQUE", "CHECK", "FOREIGN KEY"):
+                raise error_ora(2443, "Cannot drop constraint  - nonexistent constraint")
+            if objeto[0] == "UNIQUE":
+                self._bd.execute(f"DROP INDEX IF EXISTS {nombre}")
+            self._bd.execute(f"DROP TRIGGER IF EXISTS {nombre}__r_ins")
+            self._bd.execute(f"DROP TRIGGER IF EXISTS {nombre}__r_upd")
+            self._bd.execute("DELETE FROM objetos_ WHERE nombre = ?", (nombre,))
+
+        elif palabras[0] == "DROP":
+            si_existe = palabras[2:4] == ["IF", "EXISTS"]
+            nombre = texto.split()[4 if si_existe else 2].lower()
+            tipo = palabras[1]
+            if tipo == "TRIGGER":
+                if not self._borrar_disparador(nombre) and not si_existe:
+                    raise error_ora(4080, f"trigger '{nombre.upper()}' does not exist")
+            elif tipo == "SEQUENCE":
+                if not self._bd.execute("DELETE FROM secuencias_ WHERE nombre = ?", (nombre,)).rowcount and not si_existe:
+                    raise error_ora(2289, "sequence does not exist")
+            elif tipo == "PROCEDURE":
+                if not self._bd.execute("DELETE FROM objetos_ WHERE nombre = ?", (nombre,)).rowcount and not si_existe:
+                    raise error_ora(4043, f"object {nombre.upper()} does not exist")
+            elif tipo == "TABLE":
+                self._bd.execute(f"DROP TABLE {'IF EXISTS ' if si_existe else ''}{nombre}")
+                self._bd.execute("DELETE FROM objetos_ WHERE tabla = ?", (nombre,))
+            else:
+                self._bd.execute(re.sub(r"\s+CASCADE\s+CONSTRAINTS\s*$", "", texto, flags=re.I))
+
+        else:
+            self._bd.execute(texto)
+
+    def _borrar_disparador(self, nombre):
+        existia = False
+        for sufijo in ("", "__ins", "__upd", "__del"):
+            existia |= self._bd.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                                        (nombre + sufijo,)).fetchone() is not None
+            self._bd.execute(f"DROP TRIGGER IF EXISTS {nombre}{sufijo}")
+        return existia
+
+    # UNIQUE (columnas) o CHECK (condición) sobre una tabla existente
+    def _aniadir_restriccion(self, tabla, nombre, definicion):
+        if self._objeto(nombre) is not None:
+            raise error_ora(2264, "name already used by an existing constraint")
+        tipo, _, resto = definicion.partition(" ")
+        resto = resto.strip()[1:-1]
+        if tipo.upper() == "UNIQUE":
+            self._bd.execute(f"CREATE UNIQUE INDEX {nombre} ON {tabla} ({resto})")
+        elif tipo.upper() == "CHECK":
+            # En el disparador las columnas son las de NEW
+            columnas = [fila[1] for fila in self._bd.execute(f"PRAGMA table_info({tabla})")]
+            patron = re.compile(r"(?<![.\w])(" + "|".join(columnas) + r")\b", re.I)
+            condicion = _fuera_de_literales(resto, lambda trozo: patron.sub(r"NEW.\1", trozo))
+            rechazo = f"ORA-02290: check constraint ({ESQUEMA}.{nombre.upper()}) violated"
+            for sentencia in _disparadores_restriccion(nombre, tabla, f"NOT ({condicion})", rechazo):
+                self._bd.execute(sentencia)
+        else:
+            raise error_ora(904, f"restricción no admitida en SQLite: {definicion}")
+        self._bd.execute("INSERT INTO objetos_ VALUES (?, ?, ?)", (nombre, tipo.upper(), tabla))
+
+class Cursor:
+
+    def __init__(self, conexion):
+        self.connection = conexion
+        self._cursor = conexion._bd.cursor()
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.outputtypehandler = None
+        self.inputtypehandler = None
+        self.rowcount = 0
+        self._errores_lote = []
+        self._filas_lote = []
+        self._decimales = None
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def var(self, tipo=None, size=0, arraysize=1, **opciones):
+        return Variable(tipo, size)
+
+    # Los tamaños y tipos de los binds solo ayudan a Oracle
+    def setinputsizes(self, *tamanios, **por_nombre):
+        pass
+
+    def _ejecutar(self, sentencia, parametros):
+        entrada, salida = sentencia.valores(parametros, self.connection._siguiente_valor)
+        try:
+            self._cursor.execute(sentencia.sql, entrada)
+        except sqlite3.Error as e:
+            raise _traducir_error(e, sentencia.tipo, self.connection) from None
+        if salida:
+            filas = self._cursor.fetchall()
+            for i, variable in enumerate(salida):
+                variable.setvalue(0, [fila[i] for fila in filas])
+            self.rowcount = len(filas)
+        else:
+            self.rowcount = self._cursor.rowcount
+
+    def execute(self, sql, parametros=None, **por_nombre):
+        conexion = self.connection
+        conexion._comprobar()
+        if parametros is None and por_nombre:
+            parametros = por_nombre
+        sentencia = traducir(sql)
+        if sentencia.tipo in ("CREATE", "DROP", "ALTER", "TRUNCATE"):
+            conexion._ddl(sql)
+            return None
+        if sentencia.tipo in ("BEGIN", "DECLARE"):
+            raise error_ora(6550, "PL/SQL no disponible en el backend SQLite")
+
+        with conexion._cerrojo:
+            if sentencia.escribe or sentencia.secuencias:
+                conexion._empezar()
+            self._ejecutar(sentencia, parametros)
+        self._decimales = self._columnas_decimales()
+        return self if sentencia.tipo in ("SELECT", "WITH", "EXPLAIN", "PRAGMA") else None
+
+    # Columnas que outputtypehandler pide como Decimal. SQLite no da el tipo de una
+    # expresión (p.precio * e.num_consumidores sale como float): se pasa NUMBER para
+    # todas y al leer solo se convierten los valores numéricos
+    def _columnas_decimales(self):
+        descripcion = self._cursor.description
+        if self.outputtypehandler is None or descripcion is None:
+            return None
+        columnas = [i for i, columna in enumerate(descripcion)
+                    if getattr(self.outputtypehandler(self, Metadatos(columna[0].upper(), DB_TYPE_NUMBER)),
+                               "type", None) is decimal.Decimal]
+        return columnas or None
+
+    def _convertir(self, fila):
+        if self._decimales is None or fila is None:
+            return fila
+        fila = list(fila)
+        for i in self._decimales:
+            if isinstance(fila[i], (int, float)) and not isinstance(fila[i], bool):
+                fila[i] = decimal.Decimal(str(fila[i]))
+        return tuple(fila)
+
+    def executemany(self, sql, filas, batcherrors=False, arraydmlrowcounts=False, **opciones):
+        conexion = self.connection
+        conexion._comprobar()
+        sentencia = traducir(sql)
+        filas = list(filas)
+        self._errores_lote = []
+        self._filas_lote = []
+
+        with conexion._cerrojo:
+            conexion._empezar()
+            # Sin nada que hacer fila a fila, un solo executemany de SQLite
+            if not (batcherrors or arraydmlrowcounts or sentencia.secuencias or sentencia.salida):
+                try:
+                    self._cursor.executemany(sentencia.sql, [sentencia.valores(fila, None)[0] for fila in filas])
+                except sqlite3.Error as e:
+                    raise _traducir_error(e, sentencia.tipo, conexion) from None
+                self.rowcount = self._cursor.rowcount
+                return
+
+            for i, fila in enumerate(filas):
+                if batcherrors:
+                    self._cursor.execute("SAVEPOINT fila_executemany")
+                try:
+                    self._ejecutar(sentencia, fila)
+                    self._filas_lote.append(self.rowcount)
+                except DatabaseError as e:
+                    error, = e.args
+                    error.offset = i
+                    if not batcherrors:
+                        raise
+                    self._cursor.execute("ROLLBACK TO SAVEPOINT fila_executemany")
+                    self._errores_lote.append(error)
+                    self._filas_lote.append(0)
+                finally:
+                    if batcherrors:
+                        self._cursor.execute("RELEASE SAVEPOINT fila_executemany")
+            self.rowcount = sum(self._filas_lote)
+
+    def getbatcherrors(self):
+        return list(self._errores_lote)
+
+    def getarraydmlrowcounts(self):
+        return list(self._filas_lote)
+
+    # Un procedimiento es una sola sentencia: si falla no deja nada a medias
+    def callproc(self, nombre, parametros=(), keyword_parameters=None):
+        conexion = self.connection
+        conexion._comprobar()
+        procedimiento = PROCEDIMIENTOS.get(nombre.lower())
+        with conexion._cerrojo:
+            objeto = conexion._objeto(nombre)
+            if procedimiento is None or objeto is None or objeto[0] != "PROCEDURE":
+                raise error_ora(6550, f"line 1, column 7:\nPLS-00201: identifier '{nombre.upper()}' must be declared")
+            conexion._empezar()
+            self._cursor.execute("SAVEPOINT callproc")
+            try:
+                procedimiento(Cursor(conexion), *parametros, **(keyword_parameters or {}))
+            except Exception:
+                self._cursor.execute("ROLLBACK TO SAVEPOINT callproc")
+                raise
+            finally:
+                self._cursor.execute("RELEASE SAVEPOINT callproc")
+        return list(parametros)
+
+    def fetchone(self):
+        return self._convertir(self._cursor.fetchone())
+
+    def fetchmany(self, numero=None):
+        return [self._convertir(fila) for fila in self._cursor.fetchmany(numero or self.arraysize)]
+
+    def fetchall(self):
+        return [self._convertir(fila) for fila in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return (self._convertir(fila) for fila in self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.close()
+
+#-----------------------------------------------------------------------------------
+# Pool de conexiones, con lo que usan conexion_pool y estadisticas_pool de codigo.py
+#-----------------------------------------------------------------------------------
+class Pool:
+
+    def __init__(self, fichero, minimo, maximo, incremento, espera):
+        self.fichero = fichero
+        self.min = minimo
+        self.max = maximo
+        self.increment = max(1, incremento)
+        self.wait_timeout = espera
+        self._libres = [Conexion(fichero, self) for _ in range(minimo)]
+        self._ocupadas = set()
+        self._condicion = threading.Condition()
+        self._abierto = True
+
+    @property
+    def busy(self):
+        return len(self._ocupadas)
+
+    @property
+    def opened(self):
+        return len(self._libres) + len(self._ocupadas)
+
+    def acquire(self):
+        limite = time.monotonic() + self.wait_timeout / 1000
+        with self._condicion:
+            while True:
+                if not self._abierto:
+                    raise InterfaceError(_Error(1002, "DPY-1002: connection pool is not open"))
+                if self._libres:
+                    conexion = self._libres.pop()
+                    break
+                if self.opened < self.max:
+                    nuevas = min(self.increment, self.max - self.opened)
+                    self._libres += [Conexion(self.fichero, self) for _ in range(nuevas - 1)]
+                    conexion = Conexion(self.fichero, self)
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise DatabaseError(_Error(4005, "DPY-4005: timed out waiting for the connection pool to return a connection"))
+                self._condicion.wait(restante)
+            self._ocupadas.add(conexion)
+            return conexion
+
+    # conn.close() de una conexión del pool la devuelve
+    def _devolver(self, conexion):
+        with self._condicion:
+            if conexion in self._ocupadas:
+                self._ocupadas.discard(conexion)
+                self._libres.append(conexion)
+                self._condicion.notify()
+
+    def release(self, conexion):
+        with self._condicion:
+            if conexion not in self._ocupadas:
+                raise InterfaceError(_Error(1001, "DPY-1001: not connected to database"))
+        conexion.close()
+
+    def close(self, force=False):
+        with self._condicion:
+            self._abierto = False
+            for conexion in self._libres + list(self._ocupadas):
+                conexion._cerrada = True
+                conexion._bd.close()
+            self._libres = []
+            self._ocupadas = set()
+
+#-----------------------------------------------------------------------------------
+# Backend
+#-----------------------------------------------------------------------------------
+class BackendSQLite:
+
+    nombre = "sqlite"
+
+    def __init__(self):
+        fichero = os.environ.get("PRACTICA3_SQLITE", config.sqlite_fichero)
+        if not os.path.isabs(fichero):
+            fichero = os.path.join(os.path.dirname(os.path.abspath(__file__)), fichero)
+        self.fichero = fichero
+
+    def conectar(self):
+        return Conexion(self.fichero)
+
+    def crear_pool(self, minimo, maximo, incremento, espera):
+        return Pool(self.fichero, minimo, maximo, incremento, espera)
+
+    def borrar_si_existe(self, cursor, tipo, nombre):
+        cursor.execute(f"DROP {tipo} IF EXISTS {nombre}")
+
+    def crear_secuencia(self, cursor, nombre, inicio):
+        self.borrar_si_existe(cursor, "SEQUENCE", nombre)
+        cursor.execute(f"CREATE SEQUENCE {nombre} START WITH {int(inicio)}")
+
+    def crear_tabla_si_no_existe(self, cursor, ddl):
+        cursor.execute(re.sub(r"CREATE\s+TABLE", "CREATE TABLE IF NOT EXISTS", ddl, count=1, flags=re.I))
+
+    def aniadir_restriccion(self, cursor, tabla, nombre, definicion):
+        try:
+            cursor.execute(f"ALTER TABLE {tabla} ADD CONSTRAINT {nombre} {definicion}")
+        except DatabaseError as e:
+            error, = e.args
+            if error.code not in (2261, 2264):
+                raise
+
+    def borrar_restriccion(self, cursor, tabla, nombre):
+        try:
+            cursor.execute(f"ALTER TABLE {tabla} DROP CONSTRAINT {nombre}")
+        except DatabaseError as e:
+            error, = e.args
+            if error.code != 2443:
+                raise
+
+    def desplegar_disparadores(self, cursor, lista, nombres, eliminar=()):
+        for nombre in eliminar:
+            self.borrar_si_existe(cursor, "TRIGGER", nombre)
+        errores = ""
+        for nombre, trigger_sql in zip(nombres, lista):
+            try:
+                cursor.execute(trigger_sql)
+            except DatabaseError as e:
+                error, = e.args
+                errores += f"{nombre}: {error.message}\n"
+        return errores or None
+
+    def estado_disparadores(self, cursor, nombres):
+        cursor.execute("SELECT upper(name) FROM sqlite_master WHERE type = 'trigger'")
+        existentes = {nombre for (nombre,) in cursor}
+        return {nombre: ("VALID" if nombre in existentes else "NO CREADO", []) for nombre in nombres}
+
+    def listar_disparadores(self, cursor):
+        cursor.execute("SELECT name, tbl_name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name")
+        disparadores = {}
+        for nombre, tabla, sql in cursor.fetchall():
+            if "__r_" in nombre:
+                continue   # restricciones
+            base = re.sub(r"__(ins|upd|del)$", "", nombre).upper()
+            evento = re.search(r"BEFORE\s+(\w+)", sql, re.I).group(1).upper()
+            if base in disparadores:
+                disparadores[base][2] += f" OR {evento}"
+            else:
+                disparadores[base] = [base, "BEFORE EACH ROW", evento, tabla.upper(), "ENABLED"]
+        return [tuple(fila) for fila in disparadores.values()]
+
+    def actualizar_estadisticas(self, cursor):
+        cursor.execute("ANALYZE")
+
+    def plan_ejecucion(self, cursor, consulta, binds):
+        cursor.execute("EXPLAIN QUERY PLAN " + consulta, binds)
+        return [fila[-1] for fila in cursor]
@@ -0,0 +1,106 @@
+import bd
+import random
+import sys
+
+from codigo import conectar_bd, crear_tablas, crear_procedimientos
+from generador import generar_datos, calcular_volumenes, comanda_activa, mesa_de_comanda
+from medicion import medir, mostrar_resumen
+
+#===================================================================================
+# BENCHMARK DE ANIADIR_PEDIDO
+#===================================================================================
+# Compara la latencia de añadir un plato a una mesa con la implementación
+# original (hasta cinco viajes a la BD) y con el procedimiento aniadir_a_comanda
+# (una sola llamada). Cada variante se deshace al terminar para partir siempre
+# de los mismos datos.
+#
+# Uso: python benchmark_aniadir_pedido.py [escala] [repeticiones]
+
+# Implementación original de aniadir_pedido, sin input(), como referencia
+def aniadir_pedido_original(cursor, numero_mesa, comida, n_cons):
+    cursor.execute("""
+        SELECT id_comanda
+        FROM comanda
+        WHERE (id_mesa = :identif AND estado = 'ACTIVO')
+    """, {"identif": numero_mesa})
+
+    comprobador = cursor.fetchone()
+    if (comprobador is None):
+        return
+
+    numero_comanda = comprobador[0]
+    cursor.execute("""
+        SELECT id_entrada, num_consumidores
+        FROM entrada_comanda NATURAL JOIN (SELECT * FROM formado_por WHERE id_producto = :identif_producto)
+        WHERE (id_mesa = :identif_mesa AND id_comanda = :identif_comanda)
+    """, {"identif_mesa": numero_mesa, "identif_comanda": numero_comanda, "identif_producto": comida})
+
+    resultado = cursor.fetchone()
+
+    if (resultado is None):
+        cursor.execute("""
+            SELECT id_entrada
+            FROM entrada_comanda
+            WHERE id_entrada = (SELECT MAX(id_entrada) FROM entrada_comanda WHERE (id_mesa = :identif_mesa AND id_comanda = :identif_com))
+        """, {"identif_mesa": numero_mesa, "identif_com": numero_comanda})
+
+        comprobador = cursor.fetchone()
+        num_entrada = 1 if comprobador is None else int(comprobador[0]) + 1
+
+        cursor.execute("""
+            INSERT INTO entrada_comanda (id_mesa, id_comanda, id_entrada, num_consumidores)
+            VALUES (:1, :2, :3, :4)
+        """, (numero_mesa, numero_comanda, num_entrada, n_cons))
+
+        cursor.execute("""
+            INSERT INTO formado_por (id_entrada, id_mesa, id_comanda, id_producto)
+            VALUES (:1, :2, :3, :4)
+        """, (num_entrada, numero_mesa, numero_comanda, comida))
+    else:
+        num_entrada, num_cons_act = resultado
+        cursor.execute("""
+            UPDATE entrada_comanda
+            SET num_consumidores = :nuevo_valor
+            WHERE (id_mesa = :identif_mesa AND id_comanda = :identif_com AND id_entrada = :identif_ent)
+        """, {"nuevo_valor": num_cons_act + int(n_cons), "identif_mesa": numero_mesa, "identif_com": numero_comanda, "identif_ent": num_entrada})
+
+def aniadir_pedido_procedimiento(cursor, numero_mesa, comida, n_cons):
+    cursor.callproc("aniadir_a_comanda", [numero_mesa, comida, n_cons])
+
+def benchmark_aniadir_pedido(conn, escala=1, repeticiones=1000, semilla=7):
+    vol = calcular_volumenes(escala)
+    crear_tablas(conn)
+    generar_datos(conn, escala)
+    crear_procedimientos(conn)
+
+    mesas_activas = sorted({mesa_de_comanda(c, vol) for c in range(1, vol["comanda"] + 1) if comanda_activa(c, vol)})
+    if not mesas_activas:
+        print("No hay mesas con comanda activa a esta escala")
+        return
+
+    cursor = conn.cursor()
+    print(f"\nAñadir plato a una mesa ({repeticiones} llamadas, {len(mesas_activas)} mesas activas):")
+    for nombre, implementacion in [("original (5 viajes)", aniadir_pedido_original),
+                                   ("procedimiento aniadir_a_comanda", aniadir_pedido_procedimiento)]:
+        # Misma secuencia de mesas y platos para las dos variantes
+        rng = random.Random(semilla)
+        def una_llamada():
+            implementacion(cursor, rng.choice(mesas_activas), rng.randint(1, vol["producto"]), rng.randint(1, 3))
+
+        latencias = medir(una_llamada, repeticiones)
+        conn.rollback()
+        mostrar_resumen(nombre, latencias)
+    cursor.close()
+
+if __name__ == "__main__":
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    conn = conectar_bd()
+    if conn:
+        try:
+            benchmark_aniadir_pedido(conn, escala, repeticiones)
+        except bd.DatabaseError as e:
+            error, = e.args
+            print(f"Error en el benchmark: {error.message}")
+        conn.close()
@@ -0,0 +1,431 @@
+import bd
+import collections
+import datetime
+import itertools
+import queue
+import random
+import sys
+import threading
+import time
+
+from codigo import conectar_bd, inicializar_esquema, mensaje_error
+from generador import (generar_datos, calcular_volumenes, cargo_empleado, dni_empleado,
+                       estado_mesa, telefono_usuario)
+from medicion import resumen_latencias
+from servicios import ServicioMesas, ServicioPedidosOnline, ServicioReservas
+from transaccion import confirmar_pendientes, mostrar_estadisticas_commit
+
+#===================================================================================
+# PRUEBA DE CARGA
+#===================================================================================
+# Simula varios terminales trabajando a la vez sobre los datos de generador.py
+# para saber cuántos aguantan el esquema y sus disparadores. Cada hilo es un
+# terminal con su propia conexión y atiende las llegadas de una cola común:
+#   - mesas:    un camarero activa una mesa libre, añade platos, pide la cuenta y
+#               registra el pago
+#   - reservas: un recepcionista crea una ráfaga de reservas y modifica alguna
+#               de las ya creadas
+#   - reparto:  llega un pedido online y se le asigna un repartidor
+#
+# Las llegadas siguen un proceso de Poisson con la tasa (llegadas/s) de cada
+# tramo de la rampa; el tipo de cada llegada se elige según la mezcla. Si la cola
+# de llegadas crece por encima de MAX_COLA las nuevas se descartan: los terminales
+# ya no dan abasto.
+#
+# Al terminar se muestra, por tramo, el rendimiento conseguido y, por operación,
+# las latencias (p50/p95/p99), los errores y las esperas por bloqueo de fila. Las
+# esperas se leen de v$session_event si el usuario tiene permiso; si no, se cuentan
+# las operaciones que han tardado más de UMBRAL_ESPERA.
+#
+# Uso: python benchmark_carga.py [hilos] [tasa] [segundos] [escala]
+#                                [--rampa=segundos:tasa,...] [--mezcla=mesas:6,reservas:3,reparto:1]
+# Ejemplo: python benchmark_carga.py 16 --rampa=10:5,10:20,30:50
+# (con --rampa se ignoran tasa y segundos)
+
+UMBRAL_ESPERA = 0.005   # segundos
+MAX_COLA = 1000
+MEZCLA = {"mesas": 6, "reservas": 3, "reparto": 1}
+
+OPERACIONES = ["activar_mesa", "aniadir_pedido", "solicitar_cuenta", "registrar_pago",
+               "crear_reserva", "modificar_reserva", "pedido_online", "asignar_repartidor"]
+
+def conectar():
+    return bd.backend.conectar()
+
+# Esperas por bloqueo de fila de la sesión: (número, segundos), o None sin permiso
+def esperas_bloqueo(cursor):
+    try:
+        cursor.execute("""
+            SELECT NVL(SUM(total_waits), 0), NVL(SUM(time_waited_micro), 0) / 1e6
+            FROM v$session_event
+            WHERE sid = SYS_CONTEXT('USERENV', 'SID')
+            AND event = 'enq: TX - row lock contention'
+        """)
+        return cursor.fetchone()
+    except bd.DatabaseError:
+        return None
+
+#-----------------------------------------------------------------------------------
+# Rampa de llegadas
+#-----------------------------------------------------------------------------------
+# "10:5,10:20,30:50" -> [(10.0, 5.0), (10.0, 20.0), (30.0, 50.0)]
+def leer_rampa(texto):
+    tramos = []
+    for tramo in texto.split(","):
+        segundos, tasa = tramo.split(":")
+        tramos.append((float(segundos), float(tasa)))
+    return tramos
+
+# "mesas:6,reparto:1" -> {"mesas": 6.0, "reparto": 1.0}
+def leer_mezcla(texto):
+    mezcla = {}
+    for parte in texto.split(","):
+        nombre, peso = parte.split(":")
+        if nombre not in MEZCLA:
+            raise ValueError(f"Tipo de llegada desconocido: {nombre}")
+        mezcla[nombre] = float(peso)
+    return mezcla
+
+# Índice del tramo en el que cae el instante t (segundos desde el inicio), o None al acabar
+def tramo_de(rampa, t):
+    fin = 0.0
+    for i, (segundos, _) in enumerate(rampa):
+        fin += segundos
+        if t < fin:
+            return i
+    return None
+
+#-----------------------------------------------------------------------------------
+# Resultados compartidos por los terminales
+#-----------------------------------------------------------------------------------
+class Resultados:
+
+    def __init__(self, rampa):
+        self.rampa = rampa
+        self.inicio = None
+        self.cerrojo = threading.Lock()
+        self.latencias = collections.defaultdict(list)
+        self.errores = collections.Counter()
+        self.ejemplos = {}              # primer mensaje de error de cada operación
+        self.lentas = collections.Counter()
+        self.por_tramo = collections.Counter()
+        self.ciclos = collections.Counter()
+        self.descartadas = 0
+        self.fallidas = collections.Counter()   # llegadas cortadas por un error inesperado
+        self.ejemplos_fallidas = {}             # primer error inesperado de cada escenario
+        self.espera_cola = []
+        self.esperas = []               # (número, segundos) de cada terminal, o None
+
+    def empezar(self):
+        self.inicio = time.monotonic()
+
+    # Ejecuta una operación y anota su latencia o su error. El error se vuelve a
+    # lanzar para que el escenario no siga con una mesa o un pedido a medias.
+    def medir(self, operacion, funcion, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except (bd.DatabaseError, ValueError) as e:
+            with self.cerrojo:
+                self.errores[operacion] += 1
+                if operacion not in self.ejemplos:
+                    if isinstance(e, bd.DatabaseError):
+                        error, = e.args
+                        self.ejemplos[operacion] = mensaje_error(error).splitlines()[0]
+                    else:
+                        self.ejemplos[operacion] = str(e).splitlines()[0]
+            raise
+        latencia = time.perf_counter() - inicio
+        tramo = tramo_de(self.rampa, time.monotonic() - self.inicio)
+        with self.cerrojo:
+            self.latencias[operacion].append(latencia)
+            if latencia > UMBRAL_ESPERA:
+                self.lentas[operacion] += 1
+            self.por_tramo[len(self.rampa) - 1 if tramo is None else tramo] += 1
+        return resultado
+
+    def ciclo(self, escenario):
+        with self.cerrojo:
+            self.ciclos[escenario] += 1
+
+#-----------------------------------------------------------------------------------
+# Datos que comparten los escenarios
+#-----------------------------------------------------------------------------------
+class Contexto:
+
+    def __init__(self, vol):
+        self.productos = list(range(1, vol["producto"] + 1))
+        self.usuarios = [telefono_usuario(i) for i in range(1, vol["usuario"] + 1)]
+        self.repartidores = [dni_empleado(i) for i in range(1, vol["empleado"] + 1)
+                             if cargo_empleado(i) == 'REPARTIDOR']
+
+        # Las mesas ocupadas en generador.py tienen comanda activa: se usan las demás
+        self.mesas_libres = queue.Queue()
+        for id_mesa in range(1, vol["mesa"] + 1):
+            if estado_mesa(id_mesa) != 'OCUPADA':
+                self.mesas_libres.put(id_mesa)
+
+        # Las reservas se crean en días que generador.py no usa, un minuto distinto cada una
+        manana = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.primera_fecha = manana + datetime.timedelta(days=365)
+        self.minutos = itertools.count()
+        self.reservas = collections.deque(maxlen=500)
+        self.cerrojo = threading.Lock()
+
+    def nueva_fecha(self):
+        with self.cerrojo:
+            return self.primera_fecha + datetime.timedelta(minutes=next(self.minutos))
+
+#-----------------------------------------------------------------------------------
+# Escenarios: una llegada de cada tipo
+#-----------------------------------------------------------------------------------
+def escenario_mesas(conn, contexto, resultados, rng):
+    try:
+        id_mesa = contexto.mesas_libres.get(timeout=1)
+    except queue.Empty:
+        with resultados.cerrojo:
+            resultados.errores["activar_mesa"] += 1
+            resultados.ejemplos.setdefault("activar_mesa", "No queda ninguna mesa libre")
+        return
+
+    mesas = ServicioMesas(conn)
+    activada = False
+    try:
+        resultados.medir("activar_mesa", mesas.activar, id_mesa)
+        activada = True
+        for _ in range(rng.randint(1, 4)):
+            resultados.medir("aniadir_pedido", mesas.aniadir, id_mesa, rng.choice(contexto.productos), rng.randint(1, 3))
+        resultados.medir("solicitar_cuenta", mesas.cuenta, id_mesa)
+        resultados.medir("registrar_pago", mesas.registrar_pago, id_mesa)
+        activada = False
+        resultados.ciclo("mesas")
+    except (bd.DatabaseError, ValueError):
+        pass
+    finally:
+        if activada:
+            # Se cierra la comanda para que la mesa pueda volver a usarse
+            try:
+                mesas.registrar_pago(id_mesa)
+                activada = False
+            except bd.DatabaseError:
+                pass
+        # Una mesa que no se ha podido cerrar se queda fuera de la prueba
+        if not activada:
+            contexto.mesas_libres.put(id_mesa)
+
+def escenario_reservas(conn, contexto, resultados, rng):
+    reservas = ServicioReservas(conn)
+    try:
+        for _ in range(rng.randint(1, 5)):
+            fecha = contexto.nueva_fecha()
+            telefono = f"6{rng.randint(0, 99999999):08d}"
+            resultados.medir("crear_reserva", reservas.crear, fecha, telefono, "Carga", "Prueba",
+                             rng.randint(1, 8), rng.randint(0, 1))
+            contexto.reservas.append((telefono, fecha))
+
+        for _ in range(rng.randint(0, 2)):
+            try:
+                telefono, fecha = rng.choice(contexto.reservas)
+            except IndexError:
+                break
+            resultados.medir("modificar_reserva", reservas.modificar, telefono, fecha,
+                             numero_personas=rng.randint(1, 8))
+        resultados.ciclo("reservas")
+    except (bd.DatabaseError, ValueError):
+        pass
+
+def escenario_reparto(conn, contexto, resultados, rng):
+    pedidos = ServicioPedidosOnline(conn)
+    try:
+        lineas = [(id_producto, rng.randint(1, 3))
+                  for id_producto in rng.sample(contexto.productos, rng.randint(1, min(3, len(contexto.productos))))]
+        id_pedido = resultados.medir("pedido_online", pedidos.hacer_pedido, rng.choice(contexto.usuarios),
+                                     f"Calle Carga {rng.randint(1, 200)}", lineas)
+        resultados.medir("asignar_repartidor", pedidos.asignar_repartidor, id_pedido, rng.choice(contexto.repartidores))
+        resultados.ciclo("reparto")
+    except (bd.DatabaseError, ValueError):
+        pass
+
+ESCENARIOS = {
+    "mesas": escenario_mesas,
+    "reservas": escenario_reservas,
+    "reparto": escenario_reparto,
+}
+
+#-----------------------------------------------------------------------------------
+# Terminales y generador de llegadas
+#-----------------------------------------------------------------------------------
+def terminal(abrir, llegadas, contexto, resultados, barrera):
+    try:
+        conn = abrir()
+    except bd.DatabaseError:
+        barrera.abort()   # para que los demás hilos no se queden esperando
+        raise
+    cursor = conn.cursor()
+    rng = random.Random(threading.get_ident())
+    inicial = esperas_bloqueo(cursor)
+    barrera.wait()
+
+    while True:
+        llegada = llegadas.get()
+        if llegada is None:
+            break
+        escenario, instante = llegada
+        with resultados.cerrojo:
+            resultados.espera_cola.append(time.monotonic() - instante)
+        # Un error que el escenario no espera se cuenta y el terminal sigue atendiendo
+        try:
+            ESCENARIOS[escenario](conn, contexto, resultados, rng)
+        except Exception as e:
+            with resultados.cerrojo:
+                resultados.fallidas[escenario] += 1
+                resultados.ejemplos_fallidas.setdefault(escenario, f"{type(e).__name__}: {e}".splitlines()[0])
+
+    confirmar_pendientes(conn)
+    final = esperas_bloqueo(cursor)
+    with resultados.cerrojo:
+        if inicial is not None and final is not None:
+            resultados.esperas.append((final[0] - inicial[0], final[1] - inicial[1]))
+        else:
+            resultados.esperas.append(None)
+    cursor.close()
+    conn.close()
+
+def generar_llegadas(llegadas, rampa, mezcla, resultados, rng):
+    nombres = list(mezcla)
+    pesos = [mezcla[nombre] for nombre in nombres]
+    siguiente = resultados.inicio
+    while True:
+        tramo = tramo_de(rampa, siguiente - resultados.inicio)
+        if tramo is None:
+            break
+        tasa = rampa[tramo][1]
+        if tasa <= 0:
+            # tramo sin llegadas: se salta al principio del siguiente
+            siguiente = resultados.inicio + sum(s for s, _ in rampa[:tramo + 1])
+            continue
+        siguiente += rng.expovariate(tasa)
+        if tramo_de(rampa, siguiente - resultados.inicio) is None:
+            break
+        espera = siguiente - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+        if llegadas.qsize() >= MAX_COLA:
+            with resultados.cerrojo:
+                resultados.descartadas += 1
+            continue
+        llegadas.put((rng.choices(nombres, pesos)[0], time.monotonic()))
+
+#-----------------------------------------------------------------------------------
+# Informe
+#-----------------------------------------------------------------------------------
+def mostrar_informe(resultados, hilos, segundos):
+    print(f"\nRendimiento por tramo ({hilos} terminales):")
+    for i, (duracion, tasa) in enumerate(resultados.rampa):
+        print(f"\tTramo {i + 1}: {tasa:8.1f} llegadas/s durante {duracion:6.1f} s -> "
+              f"{resultados.por_tramo[i] / duracion if duracion else 0:10,.1f} operaciones/s")
+
+    total_ops = sum(len(l) for l in resultados.latencias.values())
+    total_errores = sum(resultados.errores.values())
+    print(f"\n\t{'Duración':<24} {segundos:10.2f} s")
+    print(f"\t{'Operaciones correctas':<24} {total_ops:10,d} ({total_ops / segundos:,.1f} ops/s)")
+    print(f"\t{'Ciclos completos':<24} " + ", ".join(f"{e}={resultados.ciclos[e]}" for e in ESCENARIOS))
+    print(f"\t{'Llegadas descartadas':<24} {resultados.descartadas:10,d}")
+    if resultados.fallidas:
+        print(f"\t{'Llegadas fallidas':<24} " + ", ".join(f"{e}={n}" for e, n in resultados.fallidas.items()))
+    espera = resumen_latencias(resultados.espera_cola)
+    print(f"\t{'Espera en cola':<24} p50={espera['p50_ms']:8.1f} ms  p95={espera['p95_ms']:8.1f} ms  p99={espera['p99_ms']:8.1f} ms")
+
+    print("\nLatencia por operación:")
+    for operacion in OPERACIONES:
+        latencias = resultados.latencias[operacion]
+        errores = resultados.errores[operacion]
+        if not latencias and not errores:
+            continue
+        r = resumen_latencias(latencias)
+        tasa_error = errores / (errores + len(latencias)) * 100
+        print(f"\t{operacion:<20} n={r['n']:<7} p50={r['p50_ms']:8.3f} ms  p95={r['p95_ms']:8.3f} ms  "
+              f"p99={r['p99_ms']:8.3f} ms  errores={errores} ({tasa_error:.1f} %)")
+
+    if total_errores:
+        print("\nPrimer error de cada operación:")
+        for operacion in OPERACIONES:
+            if operacion in resultados.ejemplos:
+                print(f"\t{operacion:<20} {resultados.ejemplos[operacion]}")
+    if resultados.fallidas:
+        print("\nPrimer error inesperado de cada escenario:")
+        for escenario in resultados.fallidas:
+            print(f"\t{escenario:<20} {resultados.ejemplos_fallidas[escenario]}")
+
+    esperas = resultados.esperas
+    if esperas and all(e is not None for e in esperas):
+        print(f"\n\t{'Esperas por bloqueo':<24} {sum(e[0] for e in esperas):10,.0f} ({sum(e[1] for e in esperas):.2f} s)")
+    else:
+        lentas = sum(resultados.lentas.values())
+        print(f"\n\t{'Operaciones > ' + str(int(UMBRAL_ESPERA * 1000)) + ' ms':<24} {lentas:10,d} (sin permiso sobre v$session_event)")
+    mostrar_estadisticas_commit()
+
+#-----------------------------------------------------------------------------------
+# Prueba completa
+#-----------------------------------------------------------------------------------
+def benchmark_carga(conn, hilos=8, rampa=None, mezcla=None, escala=1, abrir=conectar, semilla=11):
+    rampa = rampa or [(30.0, 20.0)]
+    mezcla = mezcla or MEZCLA
+    vol = calcular_volumenes(escala)
+    inicializar_esquema(conn)
+    generar_datos(conn, escala)
+    contexto = Contexto(vol)
+
+    # Sin repartidores, usuarios o productos el escenario de reparto no puede hacer nada
+    if mezcla.get("reparto") and not (contexto.repartidores and contexto.usuarios and contexto.productos):
+        print("\nNo hay repartidores, usuarios o productos: se quita el reparto de la mezcla")
+        mezcla = {nombre: peso for nombre, peso in mezcla.items() if nombre != "reparto"}
+    if not any(peso > 0 for peso in mezcla.values()):
+        print("La mezcla no tiene ningún escenario con peso: no hay nada que medir")
+        return
+
+    print(f"\nCarga con {hilos} terminales, mezcla " + ", ".join(f"{n}:{p:g}" for n, p in mezcla.items()) +
+          ", rampa " + ", ".join(f"{s:g} s a {t:g}/s" for s, t in rampa))
+
+    resultados = Resultados(rampa)
+    llegadas = queue.Queue()
+    barrera = threading.Barrier(hilos + 1)
+    terminales = [threading.Thread(target=terminal, args=(abrir, llegadas, contexto, resultados, barrera))
+                  for _ in range(hilos)]
+    for t in terminales:
+        t.start()
+    barrera.wait()
+
+    resultados.empezar()
+    generar_llegadas(llegadas, rampa, mezcla, resultados, random.Random(semilla))
+    for _ in terminales:
+        llegadas.put(None)
+    for t in terminales:
+        t.join()
+    segundos = time.monotonic() - resultados.inicio
+
+    mostrar_informe(resultados, hilos, segundos)
+
+if __name__ == "__main__":
+    opciones = dict(a[2:].split("=", 1) for a in sys.argv[1:] if a.startswith("--") and "=" in a)
+    posicionales = [a for a in sys.argv[1:] if not a.startswith("--")]
+    hilos = int(posicionales[0]) if len(posicionales) > 0 else 8
+    tasa = float(posicionales[1]) if len(posicionales) > 1 else 20
+    segundos = float(posicionales[2]) if len(posicionales) > 2 else 30
+    escala = float(posicionales[3]) if len(posicionales) > 3 else 1
+
+    try:
+        rampa = leer_rampa(opciones["rampa"]) if "rampa" in opciones else [(segundos, tasa)]
+        mezcla = leer_mezcla(opciones["mezcla"]) if "mezcla" in opciones else MEZCLA
+    except ValueError as e:
+        print(f"Opción no válida: {e}")
+        sys.exit(1)
+
+    conn = conectar_bd()
+    if conn:
+        try:
+            benchmark_carga(conn, hilos, rampa, mezcla, escala)
+        except bd.DatabaseError as e:
+            error, = e.args
+            print(f"Error en el benchmark: {error.message}")
+        conn.close()
@@ -0,0 +1,85 @@
+import bd
+import sys
+
+from codigo import conectar_bd, crear_tablas, crear_indices, eliminar_indices
+from generador import generar_datos, calcular_volumenes, dni_empleado, telefono_usuario
+from medicion import medir, mostrar_resumen
+
+#===================================================================================
+# BENCHMARK DE ÍNDICES SECUNDARIOS
+#===================================================================================
+# Genera datos a la escala indicada y, para cada camino de acceso cubierto por
+# INDICES, muestra el plan de ejecución y la latencia sin índices y con índices.
+#
+# Uso: python benchmark_indices.py [escala] [repeticiones]
+
+# (nombre, consulta, función que da los binds de la repetición i)
+CONSULTAS = [
+    ("comanda activa de una mesa",
+     "SELECT id_comanda FROM comanda WHERE id_mesa = :1 AND estado = 'ACTIVO'",
+     lambda vol, i: [i % vol["mesa"] + 1]),
+    ("mesas asignadas a un empleado",
+     """SELECT COUNT(*) FROM mesa m JOIN asignado a ON m.id_mesa = a.id_mesa
+        WHERE a.dni_empleado = :1 AND (m.estado = 'OCUPADA' OR m.estado = 'RESERVADA')""",
+     lambda vol, i: [dni_empleado(i % vol["empleado"] + 1)]),
+    ("repartos pendientes de un empleado",
+     """SELECT COUNT(*) FROM pedido p JOIN reparte r ON p.id_pedido = r.id_pedido
+        WHERE r.dni = :1 AND p.estado = 'PENDIENTE'""",
+     lambda vol, i: [dni_empleado(i % vol["empleado"] + 1)]),
+    ("pedidos pendientes de un usuario",
+     """SELECT COUNT(*) FROM pedido p JOIN realiza r ON p.id_pedido = r.id_pedido
+        WHERE r.telefono = :1 AND p.estado = 'PENDIENTE'""",
+     lambda vol, i: [telefono_usuario(i % vol["usuario"] + 1)]),
+    ("código de un víver por nombre",
+     "SELECT codigo FROM viveres WHERE nombre = :1",
+     lambda vol, i: [f"Vivere{i % vol['viveres'] + 1}"]),
+]
+
+def actualizar_estadisticas(conn):
+    cursor = conn.cursor()
+    bd.backend.actualizar_estadisticas(cursor)
+    cursor.close()
+
+def mostrar_plan(cursor, consulta, binds):
+    for linea in bd.backend.plan_ejecucion(cursor, consulta, binds):
+        print("\t\t" + linea)
+
+def ejecutar_consultas(conn, vol, repeticiones, titulo):
+    cursor = conn.cursor()
+    print(f"\n--- {titulo} ---")
+    for nombre, consulta, binds in CONSULTAS:
+        print(f"\n\t{nombre}:")
+        mostrar_plan(cursor, consulta, binds(vol, 0))
+
+        contador = iter(range(repeticiones))
+        def una_consulta():
+            cursor.execute(consulta, binds(vol, next(contador)))
+            cursor.fetchall()
+        mostrar_resumen(nombre, medir(una_consulta, repeticiones))
+    cursor.close()
+
+def benchmark_indices(conn, escala=1, repeticiones=200):
+    vol = calcular_volumenes(escala)
+    crear_tablas(conn)
+    generar_datos(conn, escala)
+
+    eliminar_indices(conn)
+    actualizar_estadisticas(conn)
+    ejecutar_consultas(conn, vol, repeticiones, "SIN ÍNDICES SECUNDARIOS")
+
+    crear_indices(conn)
+    actualizar_estadisticas(conn)
+    ejecutar_consultas(conn, vol, repeticiones, "CON ÍNDICES SECUNDARIOS")
+
+if __name__ == "__main__":
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    conn = conectar_bd()
+    if conn:
+        try:
+            benchmark_indices(conn, escala, repeticiones)
+        except bd.DatabaseError as e:
+            error, = e.args
+            print(f"Error en el benchmark: {error.message}")
+        conn.close()
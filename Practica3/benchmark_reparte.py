@@ -0,0 +1,182 @@
+import bd
+import sys
+import time
+
+from codigo import (conectar_bd, crear_tablas, crear_triggers, desplegar_disparadores,
+                    TRIGGER_VALIDAR_REPARTE, TRIGGERS_REPARTE_ANTIGUOS)
+from generador import generar_datos, calcular_volumenes, cargo_empleado, dni_empleado, pedido_pendiente
+
+#===================================================================================
+# BENCHMARK DE LOS DISPARADORES DE REPARTE
+#===================================================================================
+# Asigna de golpe (executemany) un repartidor a todos los pedidos pendientes que
+# no lo tienen, primero con los cinco disparadores por fila originales y después
+# con el disparador validar_reparte (una consulta por fila, y la clave primaria
+# pk_reparte para el pedido que ya tiene repartidor). Cada variante se deshace al terminar.
+#
+# Uso: python benchmark_reparte.py [escala]
+
+# Disparadores originales sobre reparte, como referencia
+TRIGGERS_ANTIGUOS_SQL = [
+    """
+    CREATE OR REPLACE TRIGGER verificar_si_es_repartidor
+    BEFORE INSERT ON reparte
+    FOR EACH ROW
+    DECLARE
+         cargo_empleado VARCHAR(20);
+    BEGIN
+        -- obtener el cargo
+        SELECT cargo
+        INTO cargo_empleado
+        FROM empleado
+        WHERE dni = :NEW.dni;
+
+        -- Si el empleado es repartidor
+        IF cargo_empleado != 'REPARTIDOR' THEN
+            RAISE_APPLICATION_ERROR(-20032, 'El empleado no es repartidor.');
+        END IF;
+    END;
+    """,
+    """
+    CREATE OR REPLACE TRIGGER verificar_si_pedido_pendiente
+    BEFORE INSERT ON reparte
+    FOR EACH ROW
+    DECLARE
+        estado_pedido VARCHAR(20);
+    BEGIN
+        -- obtener el cargo
+        SELECT estado
+        INTO estado_pedido
+        FROM pedido
+        WHERE id_pedido = :NEW.id_pedido;
+
+        -- Si el pedido no pendiente
+        IF estado_pedido != 'PENDIENTE' THEN
+            RAISE_APPLICATION_ERROR(-20033, 'El pedido no existe o no está pendiente.');
+        END IF;
+    END;
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trigger_verificar_si_empleado_existe
+    BEFORE INSERT ON reparte
+    FOR EACH ROW
+    DECLARE
+        nombre_asoc VARCHAR(20);
+
+    BEGIN
+        -- Comprobar si el dni de empleado existe en la tabla empleado
+        BEGIN
+            SELECT nombre
+            INTO nombre_asoc
+            FROM empleado
+            WHERE dni = :NEW.dni;
+
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                -- Si no existe, lanzar una excepción
+                RAISE_APPLICATION_ERROR(-20036, 'No existe un empleado con el dni proporcionado');
+
+        END;
+    END;
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trigger_verificar_si_pedido_existe
+    BEFORE INSERT ON reparte
+    FOR EACH ROW
+    DECLARE
+        estado_ped VARCHAR(50);
+
+    BEGIN
+        -- Comprobar si el dni de empleado existe en la tabla empleado
+        BEGIN
+            SELECT estado
+            INTO estado_ped
+            FROM pedido
+            WHERE id_pedido = :NEW.id_pedido;
+
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                -- Si no existe, lanzar una excepción
+                RAISE_APPLICATION_ERROR(-20037, 'No existe pedido con identificador asociado');
+
+        END;
+    END;
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trigger_verificar_si_pedido_tiene_repartidor_asociado
+    BEFORE INSERT ON reparte
+    FOR EACH ROW
+    DECLARE
+        contador INT;
+
+    BEGIN
+    -- Comprobar si el número de producto existe en la tabla producto
+
+        SELECT COUNT(*)
+        INTO contador
+        FROM reparte
+        WHERE id_pedido = :NEW.id_pedido;
+
+        --lanzar una excepción
+        IF contador >0 THEN 
+
+            RAISE_APPLICATION_ERROR(-20038, 'El pedido ya tiene un repartidor asignado');
+        END IF;
+
+    END;
+    """,
+]
+
+def eliminar_triggers(cursor, nombres):
+    for nombre in nombres:
+        bd.backend.borrar_si_existe(cursor, "TRIGGER", nombre)
+
+def asignaciones_pendientes(vol):
+    repartidores = [i for i in range(1, vol["empleado"] + 1) if cargo_empleado(i) == 'REPARTIDOR']
+    # el generador ya asigna repartidor a los pendientes múltiplos de 8
+    return [(i, dni_empleado(repartidores[i % len(repartidores)]))
+            for i in range(1, vol["pedido"] + 1) if pedido_pendiente(i) and i % 8 != 0]
+
+def asignar_en_bloque(conn, asignaciones):
+    cursor = conn.cursor()
+    inicio = time.perf_counter()
+    cursor.executemany("INSERT INTO reparte (id_pedido, dni) VALUES (:1, :2)", asignaciones)
+    segundos = time.perf_counter() - inicio
+    conn.rollback()
+    cursor.close()
+    return segundos
+
+def benchmark_reparte(conn, escala=1):
+    vol = calcular_volumenes(escala)
+    crear_tablas(conn)
+    generar_datos(conn, escala)
+    crear_triggers(conn)
+    asignaciones = asignaciones_pendientes(vol)
+
+    cursor = conn.cursor()
+    print(f"\nAsignación en bloque de {len(asignaciones)} repartos:")
+
+    # Cinco disparadores por fila
+    eliminar_triggers(cursor, ["validar_reparte"])
+    for trigger_sql in TRIGGERS_ANTIGUOS_SQL:
+        cursor.execute(trigger_sql)
+    segundos = asignar_en_bloque(conn, asignaciones)
+    print(f"\t{'5 disparadores por fila':<30} {segundos:8.3f} s ({len(asignaciones) / segundos:,.0f} filas/s)")
+
+    # Un solo disparador (quita los antiguos en el mismo bloque)
+    desplegar_disparadores(conn, [TRIGGER_VALIDAR_REPARTE], TRIGGERS_REPARTE_ANTIGUOS)
+    segundos = asignar_en_bloque(conn, asignaciones)
+    print(f"\t{'validar_reparte':<30} {segundos:8.3f} s ({len(asignaciones) / segundos:,.0f} filas/s)")
+    cursor.close()
+
+if __name__ == "__main__":
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+    conn = conectar_bd()
+    if conn:
+        try:
+            benchmark_reparte(conn, escala)
+        except bd.DatabaseError as e:
+            error, = e.args
+            print(f"Error en el benchmark: {error.message}")
+        conn.close()
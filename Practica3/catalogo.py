@@ -0,0 +1,104 @@
+import decimal
+import threading
+
+#===================================================================================
+# CACHÉ DEL CATÁLOGO (producto y viveres)
+#===================================================================================
+# producto y viveres son tablas pequeñas que casi nunca cambian, pero casi todos
+# los subsistemas las consultan (nombre y precio de un plato, código de un víver).
+# Se cargan enteras en memoria y las búsquedas se responden sin ir a la BD.
+#
+# Invalidación: cada cambio hecho por la aplicación en estas tablas llama a
+# catalogo.invalidar(), que sube el contador de versión. La siguiente búsqueda
+# ve que la versión cargada no es la actual y recarga las dos tablas.
+#
+# Los cambios hechos desde otro proceso o terminal no pasan por invalidar(): un
+# identificador o código que no está en la caché fuerza una recarga antes de
+# responder que no existe. Los importes del recibo no salen de aquí, los calcula la BD.
+
+class Catalogo:
+
+    def __init__(self):
+        self._cerrojo = threading.Lock()
+        self._version = 0
+        self._version_cargada = -1
+        self._productos = {}        # id_producto -> (nombre, precio)
+        self._viveres = {}          # codigo -> nombre
+        self._codigo_por_nombre = {} # nombre -> codigo
+
+    @property
+    def version(self):
+        return self._version
+
+    def invalidar(self):
+        with self._cerrojo:
+            self._version += 1
+
+    def cargar(self, conn):
+        with self._cerrojo:
+            version = self._version
+
+        cursor = conn.cursor()
+        try:
+            # El precio se lee como Decimal
+            def precio_decimal(cursor, metadata):
+                if metadata.name.upper() == "PRECIO":
+                    return cursor.var(decimal.Decimal, arraysize=cursor.arraysize)
+            cursor.outputtypehandler = precio_decimal
+
+            cursor.execute("SELECT id_producto, nombre, precio FROM producto")
+            productos = {id_producto: (nombre, precio) for id_producto, nombre, precio in cursor}
+
+            cursor.execute("SELECT codigo, nombre FROM viveres")
+            viveres = dict(cursor.fetchall())
+        finally:
+            cursor.close()
+
+        with self._cerrojo:
+            self._productos = productos
+            self._viveres = viveres
+            self._codigo_por_nombre = {nombre: codigo for codigo, nombre in viveres.items()}
+            self._version_cargada = version
+
+    def _actualizar(self, conn):
+        if self._version_cargada != self._version:
+            self.cargar(conn)
+
+    #-----------------------------------------------------------------------------
+    # Búsquedas
+    #-----------------------------------------------------------------------------
+    def producto(self, conn, id_producto):
+        try:
+            id_producto = int(id_producto)
+        except ValueError:
+            return None
+        self._actualizar(conn)
+        if id_producto not in self._productos:
+            self.cargar(conn)
+        return self._productos.get(id_producto)
+
+    def nombre_producto(self, conn, id_producto):
+        producto = self.producto(conn, id_producto)
+        return producto[0] if producto else None
+
+    def precio(self, conn, id_producto):
+        producto = self.producto(conn, id_producto)
+        return producto[1] if producto else None
+
+    def existe_producto(self, conn, id_producto):
+        return self.producto(conn, id_producto) is not None
+
+    def codigo_viveres(self, conn, nombre):
+        self._actualizar(conn)
+        if nombre not in self._codigo_por_nombre:
+            self.cargar(conn)
+        return self._codigo_por_nombre.get(nombre)
+
+    def existe_viveres(self, conn, codigo):
+        self._actualizar(conn)
+        if codigo not in self._viveres:
+            self.cargar(conn)
+        return codigo in self._viveres
+
+# Instancia compartida por toda la aplicación
+catalogo = Catalogo()
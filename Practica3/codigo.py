@@ -1,125 +1,338 @@
-import oracledb
+import bd
 import config
 import datetime
+import contextlib
+import hashlib
+import inspect
+import re
+import sys
+import threading
+import time
+
+from catalogo import catalogo
+import sesion
+from transaccion import confirmar_pendientes, mostrar_estadisticas_commit
+from servicios import (ServicioEmpleados, ServicioProveedores, ServicioPedidosOnline, ServicioMesas,
+                       ServicioReservas)
 #===================================================================================
-# Función para conectarse a la base de datos Oracle
+# Función para conectarse a la base de datos (Oracle o SQLite, ver bd.py)
 #===================================================================================
 def conectar_bd():
     try:
-        conn = oracledb.connect(user=config.username, password=config.password, host=config.dsn, port=config.port, service_name=config.service_name)
+        conn = bd.backend.conectar()
         print("Conexión exitosa a la base de datos")
         return conn
-    except oracledb.DatabaseError as e:
+    except bd.DatabaseError as e:
         print("Error al conectarse a la base de datos", e)
         return None
+
 #===================================================================================
-# Función para crear tablas y predefinir datos
+# Pool de conexiones: varios terminales (TPV, back-office) comparten sesiones
+# del servidor en lugar de abrir cada uno su propia conexión dedicada
 #===================================================================================
-def crear_tablas(conn):
+# Tiempos de espera medidos al pedir una conexión al pool
+_estadisticas_pool = {"adquisiciones": 0, "espera_total": 0.0, "espera_max": 0.0}
+_cerrojo_estadisticas = threading.Lock()
+
+def crear_pool():
     try:
-		# Crea objeto asociado con la conexión conn
-        # así cursor nos permite interactuar con la BD
-        cursor = conn.cursor()
-        def drop_table_if_exists(table_name):
-            try:
-                cursor.execute(f"""
-                    BEGIN
-                        EXECUTE IMMEDIATE 'DROP TABLE {table_name} CASCADE CONSTRAINTS';
-                    EXCEPTION
-                        WHEN OTHERS THEN
-                            NULL; -- Ignorar si no existe
-                    END;
-                """)
-                #print(f"Tabla {table_name} eliminada correctamente (con restricciones).")
-            except oracledb.DatabaseError as e:
-                print(f"Error al eliminar la tabla {table_name}: {e}")
-            
-        # Eliminar tablas si existen
-        drop_table_if_exists('hace')
-        drop_table_if_exists('asociado')
-        drop_table_if_exists('proveedor')
-        drop_table_if_exists('tiene')
-        
-        drop_table_if_exists('pedido_proveedor')
-        drop_table_if_exists('contiene')
+        pool = bd.backend.crear_pool(config.pool_min, config.pool_max, config.pool_increment, config.pool_wait_timeout)
+        print("Pool de conexiones creado correctamente")
+        return pool
+    except bd.DatabaseError as e:
+        print("Error al crear el pool de conexiones", e)
+        return None
 
-        drop_table_if_exists('reparte')
-        drop_table_if_exists('realiza')
-        drop_table_if_exists('usuario')
-        drop_table_if_exists('pedido')
+# Uso: with conexion_pool(pool) as conn: ...
+# La conexión se devuelve al pool al salir del bloque, aunque haya un error
+@contextlib.contextmanager
+def conexion_pool(pool):
+    inicio = time.perf_counter()
+    conn = pool.acquire()
+    espera = time.perf_counter() - inicio
 
-        drop_table_if_exists('entrada_comanda')
-        drop_table_if_exists('comanda')
-        
-        drop_table_if_exists('formado_por')
-
-        drop_table_if_exists('asignado')
-        drop_table_if_exists('reporta')
-        drop_table_if_exists('encargado_de')
-        drop_table_if_exists('empleado')
-        drop_table_if_exists('reserva')
-        drop_table_if_exists('viveres')
-        drop_table_if_exists('incidencia')
-        drop_table_if_exists('mesa')
-        drop_table_if_exists('producto')
-        
+    with _cerrojo_estadisticas:
+        _estadisticas_pool["adquisiciones"] += 1
+        _estadisticas_pool["espera_total"] += espera
+        _estadisticas_pool["espera_max"] = max(_estadisticas_pool["espera_max"], espera)
 
-        # Se vuelven a crear las tablas
-        # cursor.execute nos permite ejecutar sentencias SQL
-        #print("creando tabla proveedor")
-        cursor.execute("""
+    try:
+        yield conn
+    finally:
+        try:
+            # Lo pendiente del commit agrupado no puede volver al pool sin confirmar
+            confirmar_pendientes(conn)
+            pool.release(conn)
+        except bd.InterfaceError:
+            # la conexión ya se cerró (p.ej. desde menu_principal), ya está devuelta al pool
+            pass
+
+def estadisticas_pool(pool):
+    with _cerrojo_estadisticas:
+        adquisiciones = _estadisticas_pool["adquisiciones"]
+        espera_total = _estadisticas_pool["espera_total"]
+        espera_max = _estadisticas_pool["espera_max"]
+
+    return {
+        "ocupadas": pool.busy,
+        "abiertas": pool.opened,
+        "min": pool.min,
+        "max": pool.max,
+        "adquisiciones": adquisiciones,
+        "espera_media_ms": (espera_total / adquisiciones * 1000) if adquisiciones else 0.0,
+        "espera_max_ms": espera_max * 1000,
+    }
+
+def mostrar_estadisticas_pool(pool):
+    est = estadisticas_pool(pool)
+    print(f"Pool: {est['ocupadas']} ocupadas / {est['abiertas']} abiertas (min {est['min']}, max {est['max']})")
+    print(f"Adquisiciones: {est['adquisiciones']} // Espera media: {est['espera_media_ms']:.2f} ms // Espera máxima: {est['espera_max_ms']:.2f} ms")
+
+#===================================================================================
+# Datos predefinidos de las tablas
+#===================================================================================
+# Cada entrada: (tabla, sentencia INSERT, tamaños de los binds, tuplas)
+# Los tamaños se pasan a setinputsizes para que executemany no tenga que
+# deducir el tipo de cada columna fila a fila. El orden respeta las claves externas.
+DATOS_INICIALES = [
+    ("proveedor", """
+        INSERT INTO proveedor (cif, correo, telefono, nombre)
+        VALUES (:1, :2, :3, :4)""",
+     (9, 30, 20, 20),
+     [('cif1', 'correo1@gmail.com', '111111111','prov1'),
+      ('cif2', 'correo2@gmail.com', '222222222','prov2'),
+      ('cif3', 'correo3@gmail.com', '333333333','prov3')]),
+
+    ("pedido_proveedor", """
+        INSERT INTO pedido_proveedor (id, estado, fecha)
+        VALUES (:1, :2, SYSDATE)""",
+     (bd.DB_TYPE_NUMBER, 50),
+     [(1, 'ACTIVO'),
+      (2, 'ACTIVO'),
+      (3, 'FINALIZADO')]),
+
+    ("asociado", """
+        INSERT INTO asociado (cif, id)
+        VALUES (:1, :2)""",
+     (9, bd.DB_TYPE_NUMBER),
+     [('cif1', 1),
+      ('cif2', 2),
+      ('cif3', 3)]),
+
+    ("usuario", """
+        INSERT INTO usuario (telefono, correo, nombre, apellido)
+        VALUES (:1, :2, :3, :4)""",
+     (20, 20, 20, 20),
+     [('999999999', 'usuario1@gmail.com', 'Nombre1', 'Apellido1'),
+      ('888888888', 'usuario2@gmail.com', 'Nombre2', 'Apellido2'),
+      ('777777777', 'usuario3@gmail.com', 'Nombre3', 'Apellido3')]),
+
+    ("pedido", """
+        INSERT INTO pedido (id_pedido, estado, direccion)
+        VALUES (:1, :2, :3)""",
+     (bd.DB_TYPE_NUMBER, 50, 50),
+     [(1, 'PENDIENTE', "calle Gran Via, 9, Granada"),
+      (2, 'ENTREGADO', "calle Gonzalo Gallas, 4, Granada"),
+      (3, 'PENDIENTE', " C. Periodista Daniel Saucedo Aranda, s/n, Granada")]),
+
+    ("realiza", """
+        INSERT INTO realiza (id_pedido, telefono)
+        VALUES (:1, :2)""",
+     (bd.DB_TYPE_NUMBER, 20),
+     [(1, '999999999'),
+      (2, '888888888'),
+      (3, '777777777')]),
+
+    ("empleado", """
+        INSERT INTO empleado (dni, nombre, apellido, cargo, telefono, num_ss, salario)
+        VALUES (:1, :2, :3, :4, :5, :6, :7)""",
+     (9, 20, 20, 20, 20, 12, bd.DB_TYPE_NUMBER),
+     [('12345678A', 'Pedro', 'García', 'JEFE', '123456789', '000111222', 1500),
+      ('87654321B', 'Ana', 'López', 'REPARTIDOR', '987654321', '333444555', 1200)]),
+
+    ("hace", """
+        INSERT INTO hace (id, dni)
+        VALUES (:1, :2)""",
+     (bd.DB_TYPE_NUMBER, 9),
+     [(1, '12345678A'),
+      (2, '12345678A')]),
+
+    ("reserva", """
+        INSERT INTO reserva (fecha, telefono, nombre, apellido, numero_personas, lugar)
+        VALUES (TO_DATE('2024-12-10', 'YYYY-MM-DD'), :1, :2, :3, :4, :5)""",
+     (20, 20, 20, bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER),
+     [('999999999', 'Nombre1', 'Apellido1', 4, 0),
+      ('888888888', 'Nombre2', 'Apellido2', 2, 1)]),
+
+    ("encargado_de", """
+        INSERT INTO encargado_de (dni_empleado, fecha, tlf)
+        VALUES (:1, TO_DATE('2024-12-10', 'YYYY-MM-DD'), :2)""",
+     (9, 20),
+     [('12345678A', '999999999'),
+      ('87654321B', '888888888')]),
+
+    ("reparte", """
+        INSERT INTO reparte (id_pedido, dni)
+        VALUES (:1, :2)""",
+     (bd.DB_TYPE_NUMBER, 9),
+     [(1, '87654321B'),
+      (2, '87654321B')]),
+
+    ("viveres", """
+        INSERT INTO viveres (codigo, nombre)
+        VALUES (:1, :2)""",
+     (10, 20),
+     [('V001', 'Harina'),
+      ('V002', 'Leche'),
+      ('V003', 'Huevos')]),
+
+    ("tiene", """
+        INSERT INTO tiene (id, codigo, cantidad)
+        VALUES (:1, :2, :3)""",
+     (bd.DB_TYPE_NUMBER, 10, bd.DB_TYPE_NUMBER),
+     [(1, 'V001', 20),
+      (2, 'V002', 50)]),
+
+    ("incidencia", """
+        INSERT INTO incidencia (id_incidencia, fecha, descripcion)
+        VALUES (:1, TO_DATE('2024-12-05', 'YYYY-MM-DD'), :2)""",
+     (bd.DB_TYPE_NUMBER, 500),
+     [(1, 'El cliente faltó al respeto al camarero'),
+      (2, 'El cliente se fue corriendo y no pagó la cuenta')]),
+
+    ("reporta", """
+        INSERT INTO reporta (dni, id_incidencia)
+        VALUES (:1, :2)""",
+     (9, bd.DB_TYPE_NUMBER),
+     [('12345678A', 1),
+      ('87654321B', 2)]),
+
+    ("producto", """
+        INSERT INTO producto (id_producto, nombre, precio)
+        VALUES (:1, :2, :3)""",
+     (bd.DB_TYPE_NUMBER, 20, bd.DB_TYPE_NUMBER),
+     [(1, 'Pizza', 8.50),
+      (2, 'Pasta', 7.30),
+      (3, 'Ensalada', 5.90),
+      (4, 'Albondigas', 6),
+      (5, 'Agua', 2),
+      (6, 'Cerveza', 2.30),
+      (7, 'Pepsi', 2.50)]),
+
+    ("contiene", """
+        INSERT INTO contiene (id_pedido, id_producto, cantidad)
+        VALUES (:1, :2, :3)""",
+     (bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER),
+     [(1, 1, 2),
+      (2, 2, 1),
+      (3, 3, 3)]),
+
+    ("mesa", """
+        INSERT INTO mesa (id_mesa, estado)
+        VALUES (:1, :2)""",
+     (bd.DB_TYPE_NUMBER, 50),
+     [(1, 'DISPONIBLE'),
+      (2, 'OCUPADA'),
+      (3, 'RESERVADA')]),
+
+    ("asignado", """
+        INSERT INTO asignado (id_mesa, dni_empleado)
+        VALUES (:1, :2)""",
+     (bd.DB_TYPE_NUMBER, 9),
+     [(1, '12345678A'),
+      (2, '87654321B')]),
+
+    ("comanda", """
+        INSERT INTO comanda (id_comanda, id_mesa, estado, fecha_entrada)
+        VALUES (:1, :2, :3, SYSDATE)""",
+     (bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER, 10),
+     [(1, 1, 'PAGADO'),
+      (1, 2, 'ACTIVO')]),
+
+    ("entrada_comanda", """
+        INSERT INTO entrada_comanda (id_entrada, id_comanda, id_mesa, num_consumidores)
+        VALUES (:1, :2, :3, :4)""",
+     (bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER),
+     [(1, 1, 1, 2),
+      (2, 1, 1, 3),
+      (3, 1, 1, 5),
+      (1, 1, 2, 4)]),
+
+    ("formado_por", """
+        INSERT INTO formado_por (id_entrada, id_comanda, id_mesa, id_producto)
+        VALUES (:1, :2, :3, :4)""",
+     (bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER, bd.DB_TYPE_NUMBER),
+     [(1, 1, 1, 1),
+      (2, 1, 1, 4),
+      (3, 1, 1, 6),
+      (1, 1, 2, 3)]),
+]
+
+# Inserta los datos predefinidos con un executemany por tabla (un solo viaje
+# a la BD por tabla). No hace commit: lo decide quien llama.
+# Devuelve una lista (tabla, nº filas, segundos) para el informe de tiempos.
+def insertar_datos_iniciales(cursor):
+    tiempos = []
+    for tabla, sql, tamanios, filas in DATOS_INICIALES:
+        inicio = time.perf_counter()
+        cursor.setinputsizes(*tamanios)
+        cursor.executemany(sql, filas)
+        tiempos.append((tabla, len(filas), time.perf_counter() - inicio))
+    return tiempos
+
+def mostrar_tiempos_carga(tiempo_ddl, tiempos, tiempo_total):
+    print("\nTiempos de creación de la base de datos:")
+    print(f"\t{'Creación de tablas':<20} {tiempo_ddl*1000:9.2f} ms")
+    for tabla, num_filas, segundos in tiempos:
+        print(f"\t{tabla:<20} {segundos*1000:9.2f} ms ({num_filas} filas)")
+    print(f"\t{'TOTAL':<20} {tiempo_total*1000:9.2f} ms")
+
+#===================================================================================
+# Definición de las tablas, en orden de creación (cada tabla va detrás de las que
+# referencia). Se borran en el orden inverso.
+#===================================================================================
+TABLAS = [
+    ("proveedor", """
         CREATE TABLE proveedor (
             cif VARCHAR(9) PRIMARY KEY,
             correo VARCHAR(30),
             telefono VARCHAR(20),
             nombre VARCHAR(20)
-        )""")
-
-        #print("creando tabla pedido_proveedor")
-        cursor.execute("""
+        )"""),
+    ("pedido_proveedor", """
         CREATE TABLE pedido_proveedor (
             id INT PRIMARY KEY,
             estado VARCHAR(50),
             fecha DATE
-        )""")
-
-        #print("creando tabla asociado")
-        cursor.execute("""
+        )"""),
+    ("asociado", """
         CREATE TABLE asociado (
             cif VARCHAR(9),
             id INT PRIMARY KEY,
             FOREIGN KEY (cif) REFERENCES proveedor(cif),
             FOREIGN KEY (id) REFERENCES pedido_proveedor(id)
-        )""")
-
-        #print("creando tabla usuario")
-        cursor.execute("""
+        )"""),
+    ("usuario", """
         CREATE TABLE usuario (
             telefono VARCHAR(20) PRIMARY KEY,
             correo VARCHAR(20),
             nombre VARCHAR(20),
             apellido VARCHAR(20)
-        )""")
-
-        #print("creando tabla pedido")
-        cursor.execute("""
+        )"""),
+    ("pedido", """
         CREATE TABLE pedido (
             id_pedido INT PRIMARY KEY,
             estado VARCHAR(50),
             direccion VARCHAR(50)
-        )""")
-
-        #print("creando tabla realiza")
-        cursor.execute("""
+        )"""),
+    ("realiza", """
         CREATE TABLE realiza (
             id_pedido INT PRIMARY KEY,
             telefono VARCHAR(20),
             FOREIGN KEY (id_pedido) REFERENCES pedido(id_pedido),
-            FOREIGN KEY (telefono) REFERENCES usuario(telefono)
-        )""")
-
-        #print("creando tabla empleado")
-        cursor.execute("""
+            CONSTRAINT fk_realiza_usuario FOREIGN KEY (telefono) REFERENCES usuario(telefono)
+        )"""),
+    ("empleado", """
         CREATE TABLE empleado (
             dni VARCHAR(9) PRIMARY KEY,
             nombre VARCHAR(20),
@@ -128,19 +341,15 @@ def crear_tablas(conn):
             telefono VARCHAR(20), 
             num_ss VARCHAR(12),
             salario INT
-        )""")
-
-        #print("creando tabla hace")
-        cursor.execute("""
+        )"""),
+    ("hace", """
         CREATE TABLE hace (
             id INT PRIMARY KEY,
             dni VARCHAR(9),
             FOREIGN KEY (id) REFERENCES pedido_proveedor(id),
             FOREIGN KEY (dni) REFERENCES empleado(dni)
-        )""")
-
-        #print("creando tabla reserva")
-        cursor.execute("""
+        )"""),
+    ("reserva", """
         CREATE TABLE reserva(
             fecha DATE,
             telefono VARCHAR(20),
@@ -149,106 +358,81 @@ def crear_tablas(conn):
             numero_personas INT,
             lugar INT,
             PRIMARY KEY (fecha, telefono)
-        )
-        """)
-
-        #print("creando tabla encargado_de")
-        cursor.execute("""
+        )"""),
+    ("encargado_de", """
         CREATE TABLE encargado_de(
             dni_empleado VARCHAR(9),
             fecha DATE,
             tlf VARCHAR(20),
             PRIMARY KEY (dni_empleado, fecha, tlf),
             FOREIGN KEY (dni_empleado) REFERENCES empleado(dni),
-            FOREIGN KEY (fecha, tlf) REFERENCES reserva(fecha, telefono)
-        )
-        """)
-
-        #print("creando tabla reparte")
-        cursor.execute("""
+            FOREIGN KEY (fecha, tlf) REFERENCES reserva(fecha, telefono),
+            CONSTRAINT uq_encargado_reserva UNIQUE (fecha, tlf)
+        )"""),
+    ("reparte", """
         CREATE TABLE reparte(
-            id_pedido INT PRIMARY KEY,
+            id_pedido INT,
             dni VARCHAR(9),
-            FOREIGN KEY (id_pedido) REFERENCES pedido(id_pedido),
-            FOREIGN KEY (dni) REFERENCES empleado(dni)
-        )""")
-
-        #print("creando tabla viveres")
-        cursor.execute("""
+            CONSTRAINT pk_reparte PRIMARY KEY (id_pedido),
+            CONSTRAINT fk_reparte_pedido FOREIGN KEY (id_pedido) REFERENCES pedido(id_pedido),
+            CONSTRAINT fk_reparte_empleado FOREIGN KEY (dni) REFERENCES empleado(dni)
+        )"""),
+    ("viveres", """
         CREATE TABLE viveres(
             codigo VARCHAR(10)PRIMARY KEY,
             nombre VARCHAR(20)
-        )""")
-
-        #print("creando tabla tiene")
-        cursor.execute("""
+        )"""),
+    ("tiene", """
         CREATE TABLE tiene (
             id INT,
             codigo VARCHAR(10),
             cantidad INT,
             PRIMARY KEY (id, codigo),
             FOREIGN KEY (id) REFERENCES pedido_proveedor(id),
-            FOREIGN KEY (codigo) REFERENCES viveres(codigo)
-        )
-        """)
-
-        #print("creando tabla incidencia")
-        cursor.execute("""
+            CONSTRAINT fk_tiene_viveres FOREIGN KEY (codigo) REFERENCES viveres(codigo)
+        )"""),
+    ("incidencia", """
         CREATE TABLE incidencia (
             id_incidencia INT PRIMARY KEY,
             fecha DATE,
             descripcion VARCHAR2(500)
-        )""")
-
-        #print("creando tabla reporta")
-        cursor.execute("""
+        )"""),
+    ("reporta", """
         CREATE TABLE reporta (
             dni VARCHAR(9),
             id_incidencia INT,
             PRIMARY KEY (dni , id_incidencia),
             FOREIGN KEY (dni) REFERENCES empleado(dni),
             FOREIGN KEY (id_incidencia) REFERENCES incidencia(id_incidencia)
-        )""")
-
-        #print("creando tabla producto")
-        cursor.execute("""
+        )"""),
+    ("producto", """
         CREATE TABLE producto (
             id_producto INT PRIMARY KEY,
             nombre VARCHAR(20),
             precio DECIMAL(10, 2)
-        )""")
-
-
-        #print("creando tabla contiene")
-        cursor.execute("""
+        )"""),
+    ("contiene", """
         CREATE TABLE contiene(
             id_pedido INT,
             id_producto INT,
             cantidad INT,
             PRIMARY KEY (id_pedido , id_producto),
             FOREIGN KEY (id_pedido) REFERENCES pedido(id_pedido),
-            FOREIGN KEY (id_producto) REFERENCES producto(id_producto)
-        )""")
-
-        
-        #print("creando tabla mesa")
-        cursor.execute("""
+            CONSTRAINT fk_contiene_producto FOREIGN KEY (id_producto) REFERENCES producto(id_producto)
+        )"""),
+    ("mesa", """
         CREATE TABLE mesa (
             id_mesa INT PRIMARY KEY,
             estado VARCHAR(50)
-        )""")
-        
-        #print("creando tabla asignado")
-        cursor.execute("""
+        )"""),
+    ("asignado", """
         CREATE TABLE asignado(
             id_mesa INT PRIMARY KEY,
             dni_empleado VARCHAR(9),
             FOREIGN KEY (id_mesa) REFERENCES mesa(id_mesa),
             FOREIGN KEY (dni_empleado) REFERENCES empleado(dni)
-        )""")
-    
-        #print("creando tabla comanda")
-        cursor.execute("""
+        )"""),
+    ("comanda", """
         CREATE TABLE comanda (
             id_comanda INT,
             id_mesa INT,
@@ -256,10 +440,8 @@ def crear_tablas(conn):
             fecha_entrada DATE,
             PRIMARY KEY (id_comanda, id_mesa),
             FOREIGN KEY (id_mesa) REFERENCES mesa(id_mesa)
-        )""")
-
-        #print("creando tabla entrada_comanda")
-        cursor.execute("""
+        )"""),
+    ("entrada_comanda", """
         CREATE TABLE entrada_comanda (
             id_mesa INT,           
             id_comanda INT,
@@ -267,12 +449,8 @@ def crear_tablas(conn):
             num_consumidores INT CHECK (num_consumidores >= 0),
             PRIMARY KEY(id_entrada, id_comanda, id_mesa),
             FOREIGN KEY (id_comanda, id_mesa) REFERENCES 
-            comanda(id_comanda, id_mesa))
-            
-        """)
-        
-        #print("creando tabla formado_por")
-        cursor.execute("""
+            comanda(id_comanda, id_mesa))"""),
+    ("formado_por", """
         CREATE TABLE formado_por(
             id_entrada INT,
             id_comanda INT,
@@ -281,303 +459,125 @@ def crear_tablas(conn):
             PRIMARY KEY(id_entrada, id_comanda, id_mesa, id_producto),
             FOREIGN KEY(id_entrada, id_comanda, id_mesa) REFERENCES entrada_comanda(id_entrada, id_comanda,id_mesa), 
             FOREIGN KEY(id_producto) REFERENCES producto(id_producto)
-        )""")
+        )"""),
+]
+
+#===================================================================================
+# Función para crear tablas y predefinir datos
+#===================================================================================
+def crear_tablas(conn):
+    try:
+        inicio = time.perf_counter()
+
+		# Crea objeto asociado con la conexión conn
+        # así cursor nos permite interactuar con la BD
+        cursor = conn.cursor()
+        def drop_table_if_exists(table_name):
+            try:
+                bd.backend.borrar_si_existe(cursor, "TABLE", table_name)
+                #print(f"Tabla {table_name} eliminada correctamente (con restricciones).")
+            except bd.DatabaseError as e:
+                print(f"Error al eliminar la tabla {table_name}: {e}")
+            
+        # Eliminar tablas si existen
+        for nombre, _ in reversed(TABLAS):
+            drop_table_if_exists(nombre)
+
+        # Se vuelven a crear las tablas
+        # cursor.execute nos permite ejecutar sentencias SQL
+        for nombre, ddl in TABLAS:
+            cursor.execute(ddl)
         
         conn.commit()
 
-        # Insertamos tuplas predefinidas en la tabla proveedor
-        proveedor = [('cif1', 'correo1@gmail.com', '111111111','prov1'), 
-            ('cif2', 'correo2@gmail.com', '222222222','prov2'), 
-            ('cif3', 'correo3@gmail.com', '333333333','prov3')]
-        
-        #print("INSERTANDO TUPLAS DE PROVEEDOR")
-        for prov in proveedor:
-            cursor.execute("""
-                INSERT INTO proveedor (cif, correo, telefono, nombre)
-                VALUES (:1, :2, :3, :4)""", prov)
-            conn.commit()
-        
-         # Insertamos tuplas predefinidas en la tabla pedido_proveedor
-        pedido_proveedor = [(1, 'ACTIVO'),
-                            (2, 'ACTIVO'),
-                            (3, 'FINALIZADO')]
+        tiempo_ddl = time.perf_counter() - inicio
 
-        
-        #print("INSERTANDO TUPLAS DE PEDIDO_PROVEEDOR")
-        for pedido in pedido_proveedor:
-            cursor.execute("""
-                INSERT INTO pedido_proveedor (id, estado, fecha)
-                VALUES (:1, :2, SYSDATE)""", pedido)
-            conn.commit()
-
-        #Insertamos tuplas predefinidas en la tabla asociado
-        asociado = [('cif1', 1),
-            ('cif2', 2),
-            ('cif3', 3)]
-        
-        #print("INSERTANDO TUPLAS DE ASOCIADO")
-        for asoc in asociado:
-            cursor.execute("""
-                INSERT INTO asociado (cif, id)
-                VALUES (:1, :2)""", asoc)
-            conn.commit()
-
-        #Insertamos tuplas predefinidas en la tabla usuario
-        usuario = [
-            ('999999999', 'usuario1@gmail.com', 'Nombre1', 'Apellido1'),
-            ('888888888', 'usuario2@gmail.com', 'Nombre2', 'Apellido2'),
-            ('777777777', 'usuario3@gmail.com', 'Nombre3', 'Apellido3')]
-
-        #print("INSERTANDO TUPLAS DE USUARIO")
-        for usr in usuario:
-            cursor.execute("""
-                INSERT INTO usuario (telefono, correo, nombre, apellido)
-                VALUES (:1, :2, :3, :4)""", usr)
-            conn.commit()
-
-        #Insertamos tuplas predefinidas en la tabla pedido
-        #print("INSERTANDO TUPLAS DE pedido")
-        pedido = [
-            (1, 'PENDIENTE', "calle Gran Via, 9, Granada"),
-            (2, 'ENTREGADO', "calle Gonzalo Gallas, 4, Granada"),
-            (3, 'PENDIENTE', " C. Periodista Daniel Saucedo Aranda, s/n, Granada")]
-
-        for ped in pedido:
-            cursor.execute("""
-                INSERT INTO pedido (id_pedido, estado, direccion)
-                VALUES (:1, :2, :3)""", ped)
-            conn.commit()
-
-        #Insertamos tuplas predefinidas en la tabla realiza
-        realiza = [
-            (1, '999999999'),
-            (2, '888888888'),
-            (3, '777777777')]
-
-        #print("INSERTANDO TUPLAS DE REALIZA")
-
-        for rel in realiza:
-            cursor.execute("""
-                INSERT INTO realiza (id_pedido, telefono)
-                VALUES (:1, :2)""", rel)
-            conn.commit()
+        # Insertamos las tuplas predefinidas de todas las tablas
+        tiempos = insertar_datos_iniciales(cursor)
 
-        
-        empleado = [ 
-            ('12345678A', 'Pedro', 'García', 'JEFE', '123456789', '000111222', 1500),
-            ('87654321B', 'Ana', 'López', 'REPARTIDOR', '987654321', '333444555', 1200)
-        ]
-
-        #print("INSERTANDO TUPLAS DE Empleado")
-
-        for emp in empleado:
-            cursor.execute("""
-                INSERT INTO empleado (dni, nombre, apellido, cargo, telefono, num_ss, salario)
-                VALUES (:1, :2, :3, :4, :5, :6, :7)""", emp)
-            conn.commit()
-
-        # Insertamos tuplas predefinidas en la tabla hace
-
-        hace = [
-            (1, '12345678A'),
-            (2, '12345678A')
-        ]
-
-        for h in hace: 
-            cursor.execute ("""
-                INSERT INTO hace (id, dni)
-                VALUES (:1, :2)""", h)
-            conn.commit()
-
-        # Insertamos tuplas predefinidas en la tabla reserva
-        reserva = [
-            ('999999999', 'Nombre1', 'Apellido1', 4, 0),
-            ('888888888', 'Nombre2', 'Apellido2', 2, 1)]
-                
-        #print("INSERTANDO TUPLAS DE RESERVA")
-        for res in reserva:
-            cursor.execute("""
-                INSERT INTO reserva (fecha, telefono, nombre, apellido, numero_personas, lugar)
-                VALUES (TO_DATE('2024-12-10', 'YYYY-MM-DD'), :1, :2, :3, :4, :5)""", res)
-            conn.commit()
-
-        # Insertamos tuplas predefinidas en la tabla encargado_de
-        encargado_de = [
-            ('12345678A', '999999999'),
-            ('87654321B', '888888888')
-        ]
-
-        #print("INSERTANDO TUPLAS DE ENCARGADO_DE")
-        for enc in encargado_de:
-            cursor.execute("""
-                INSERT INTO encargado_de (dni_empleado, fecha, tlf)
-                VALUES (:1, TO_DATE('2024-12-10', 'YYYY-MM-DD'), :3)""", enc)
-            conn.commit()
-        
-        repartes = [
-            (1, '87654321B'),
-            (2, '87654321B')
-        ]
-
-        #print("INSERTANDO TUPLAS DE REPARTE")
-        for rep in repartes:
-            cursor.execute("""
-                INSERT INTO reparte (id_pedido, dni)
-                VALUES (:1,:2)""", rep)
-            conn.commit()
-
-        viveres = [
-            ('V001', 'Harina'),
-            ('V002', 'Leche'),
-            ('V003', 'Huevos')
-        ]
-
-        #print("INSERTANDO TUPLAS DE VIVERES")
-        for viv in viveres:
-            cursor.execute("""
-                INSERT INTO viveres (codigo, nombre)
-                VALUES (:1, :2)""", viv)
-            conn.commit()
-        
+        # Un único commit para toda la carga: si algo falla se deshace entera
+        conn.commit()
 
-        tiene = [
-            (1, 'V001', 20),
-            (2, 'V002', 50)
-        ]
-
-        #print("INSERTANDO TUPLAS DE TIENE")
-        for tie in tiene:
-            cursor.execute("""
-                INSERT INTO tiene (id, codigo, cantidad)
-                VALUES (:1, :2, :3)""", tie)
-            conn.commit()
-
-        incidencia = [
-            (1, 'El cliente faltó al respeto al camarero'),
-            (2, 'El cliente se fue corriendo y no pagó la cuenta')
-        ]
-
-        #print("INSERTANDO TUPLAS DE INCIDENCIA")
-        for inc in incidencia:
-            cursor.execute("""
-                INSERT INTO incidencia (id_incidencia, fecha, descripcion)
-                VALUES (:1, TO_DATE('2024-12-05', 'YYYY-MM-DD'), :2)""", inc)
-            conn.commit()
-
-        reporta = [
-            ('12345678A', 1),
-            ('87654321B', 2)
-        ]
-
-        #print("INSERTANDO TUPLAS DE REPORTA")
-        for rep in reporta:
-            cursor.execute("""
-                INSERT INTO reporta (dni, id_incidencia)
-                VALUES (:1, :2)""", rep)
-            conn.commit()
-
-        producto = [
-            (1, 'Pizza', 8.50),
-            (2, 'Pasta', 7.30),
-            (3, 'Ensalada', 5.90),
-            (4, 'Albondigas', 6),
-            (5, 'Agua', 2),
-            (6, 'Cerveza', 2.30),
-            (7, 'Pepsi', 2.50)
-        ]
-
-        #print("INSERTANDO TUPLAS DE PRODUCTO")
-        for prod in producto:
-            cursor.execute("""
-                INSERT INTO producto (id_producto, nombre, precio)
-                VALUES (:1, :2, :3)""", prod)
-            conn.commit()
-
-        contiene = [
-            (1, 1, 2),
-            (2, 2, 1),
-            (3, 3, 3)
-        ]
-
-        #print("INSERTANDO TUPLAS DE CONTIENE")
-        for cont in contiene:
-            cursor.execute("""
-                INSERT INTO contiene (id_pedido, id_producto, cantidad)
-                VALUES (:1, :2, :3)""", cont)
-            conn.commit()
-
-        mesa = [
-            (1, 'DISPONIBLE'),
-            (2, 'OCUPADA'),
-            (3, 'RESERVADA')
-        ]
-
-        #print("INSERTANDO TUPLAS DE MESA")
-        for mes in mesa:
-            cursor.execute("""
-                INSERT INTO mesa (id_mesa, estado)
-                VALUES (:1, :2)""", mes)
-            conn.commit()
-
-        asignado = [
-            (1, '12345678A'),
-            (2, '87654321B')
-        ]
-
-        #print("INSERTANDO TUPLAS DE ASIGNADO")
-        for asi in asignado:
-            cursor.execute("""
-                INSERT INTO asignado (id_mesa, dni_empleado)
-                VALUES (:1, :2)""", asi)
-            conn.commit()
-
-        comanda = [
-            (1, 1, 'PAGADO'),
-            (1, 2, 'ACTIVO')
-        ]
-
-        for com in comanda:
-            cursor.execute("""
-                INSERT INTO comanda (id_comanda, id_mesa, estado, fecha_entrada)
-                VALUES (:1, :2, :3, SYSDATE)""", com)
-            conn.commit()
-
-        # Insertamos tuplas predefinidas en la tabla entrada_comanda
-        entrada_comanda = [
-            (1, 1, 1, 2),
-            (2, 1, 1, 3),
-            (3, 1, 1, 5),
-            (1, 1, 2, 4)
-        ]
-
-        for ent in entrada_comanda:
-            cursor.execute("""
-                INSERT INTO entrada_comanda (id_entrada, id_comanda, id_mesa, num_consumidores)
-                VALUES (:1, :2, :3, :4)""", ent)
-            conn.commit()
-
-        # Insertamos tuplas predefinidas en la tabla formado_por
-        formado_por = [
-            (1, 1, 1, 1),
-            (2, 1, 1, 4),
-            (3, 1, 1, 6),
-            (1, 1, 2, 3)
-        ]
-
-        for form in formado_por:
-            cursor.execute("""
-                INSERT INTO formado_por (id_entrada, id_comanda, id_mesa, id_producto)
-                VALUES (:1, :2, :3, :4)""", form)
-            conn.commit()
-
-        # conn.commit confirma los cambios realizados en la BD durante la sesión
-        # si no se ejecuta, los cmabios no se reflejan en la BD
+        # Las secuencias empiezan detrás de los identificadores ya insertados
+        crear_secuencias(conn)
+        crear_indices(conn)
+        _versionar_tablas(conn)
+        catalogo.invalidar()
         print("\nTablas creadas y datos insertados.")
+        mostrar_tiempos_carga(tiempo_ddl, tiempos, time.perf_counter() - inicio)
 
-    except oracledb.DatabaseError as e:
+    except bd.DatabaseError as e:
         print("Error al crear las tablas o insertar datos:", e)
         conn.rollback()
 
+#===================================================================================
+# Índices secundarios
+#===================================================================================
+# Las claves primarias solo dan índice a sus columnas. Estos cubren los accesos
+# frecuentes que no empiezan por la clave primaria. (nombre, tabla, columnas, uso)
+INDICES = [
+    ("idx_comanda_mesa_estado", "comanda", "id_mesa, estado",
+     "aniadir_pedido, eliminar_pedido, solicitar_cuenta: comanda activa de una mesa"),
+    ("idx_asignado_dni", "asignado", "dni_empleado",
+     "disparador verificar_mesas_antes_de_eliminar"),
+    ("idx_reparte_dni", "reparte", "dni",
+     "disparador verificar_repartos_antes_de_eliminar"),
+    ("idx_realiza_telefono", "realiza", "telefono",
+     "disparador verificar_pedidos_antes_de_eliminar"),
+    ("idx_viveres_nombre", "viveres", "nombre",
+     "hacer_pedido: buscar el código de un víver por su nombre"),
+]
+
+def crear_indices(conn):
+    try:
+        cursor = conn.cursor()
+        for nombre, tabla, columnas, _ in INDICES:
+            cursor.execute(f"CREATE INDEX {nombre} ON {tabla} ({columnas})")
+
+    except bd.DatabaseError as e:
+        error, = e.args
+        print(f"Error al crear los índices: {error.message}")
+
+    finally:
+        cursor.close()
+
+def eliminar_indices(conn):
+    cursor = conn.cursor()
+    for nombre, *_ in INDICES:
+        bd.backend.borrar_si_existe(cursor, "INDEX", nombre)
+    cursor.close()
+
+#===================================================================================
+# Secuencias para los identificadores
+#===================================================================================
+# Los identificadores nuevos salen de una secuencia (seq.NEXTVAL ... RETURNING INTO)
+# en lugar de SELECT COUNT(*)+1 o MAX(id)+1: un solo viaje a la BD por inserción,
+# sin recorrer la tabla, y dos terminales nunca obtienen el mismo identificador.
+# (secuencia, tabla, columna)
+SECUENCIAS = [
+    ("seq_incidencia", "incidencia", "id_incidencia"),
+    ("seq_pedido", "pedido", "id_pedido"),
+    ("seq_comanda", "comanda", "id_comanda"),
+    ("seq_pedido_proveedor", "pedido_proveedor", "id"),
+]
+
+# Migración: (re)crea cada secuencia empezando en MAX(columna)+1 de los datos existentes.
+# Se puede ejecutar sobre una base de datos ya poblada sin perder nada.
+def crear_secuencias(conn):
+    try:
+        cursor = conn.cursor()
+        for secuencia, tabla, columna in SECUENCIAS:
+            cursor.execute(f"SELECT NVL(MAX({columna}), 0) + 1 FROM {tabla}")
+            siguiente = cursor.fetchone()[0]
+            bd.backend.crear_secuencia(cursor, secuencia, siguiente)
+
+    except bd.DatabaseError as e:
+        error, = e.args
+        print(f"Error al crear las secuencias: {error.message}")
+
+    finally:
+        cursor.close()
+
 
 
 #========================================================================================
@@ -598,12 +598,8 @@ def crear_tablas(conn):
 #--------------------------------------------------------------------------------------------
 
 # #disparador comprobar que un empleado no tiene mesas asociadas a la hora de borrarlo
-def trigger_verificar_mesas_antes_de_eliminar(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: antes de eliminar de empleado, contar las mesas asignadas
-        trigger_sql = """
+# Código del trigger en SQL: antes de eliminar de empleado, contar las mesas asignadas
+TRIGGER_VERIFICAR_MESAS_ANTES_DE_ELIMINAR = """
         CREATE OR REPLACE TRIGGER verificar_mesas_antes_de_eliminar
         BEFORE DELETE ON empleado
         FOR EACH ROW
@@ -624,24 +620,11 @@ def trigger_verificar_mesas_antes_de_eliminar(conn):
             END IF;
         END;"""
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
-
 # #--------------------------------------------------------------------------------------------
 
 # #disparador comprobar que un empleado no tiene repartos asociadas a la hora de borrarlo
-def trigger_verificar_repartos_antes_de_eliminar(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: antes de eliminar de empleado, contar los repartos asignados
-        trigger_sql = """
+# Código del trigger en SQL: antes de eliminar de empleado, contar los repartos asignados
+TRIGGER_VERIFICAR_REPARTOS_ANTES_DE_ELIMINAR = """
         CREATE OR REPLACE TRIGGER verificar_repartos_antes_de_eliminar
         BEFORE DELETE ON empleado
         FOR EACH ROW
@@ -662,23 +645,10 @@ def trigger_verificar_repartos_antes_de_eliminar(conn):
             END IF;
         END;"""
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
-
 # #--------------------------------------------------------------------------------------------
 
-def trigger_verificar_salario_positivo(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: verifica que el salario es positivo antes de insertar en la tabla empleado
-        trigger_sql = """
+# Código del trigger en SQL: verifica que el salario es positivo antes de insertar en la tabla empleado
+TRIGGER_VERIFICAR_SALARIO_POSITIVO = """
         CREATE OR REPLACE TRIGGER verificar_salario_positivo
         BEFORE INSERT OR UPDATE ON empleado
         FOR EACH ROW
@@ -689,23 +659,10 @@ def trigger_verificar_salario_positivo(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
-
 # #--------------------------------------------------------------------------------------------
 
-def trigger_verificar_formato_dni(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: verifica que el DNI se introduce con formato
-        trigger_sql = """
+# Código del trigger en SQL: verifica que el DNI se introduce con formato
+TRIGGER_VERIFICAR_FORMATO_DNI = """
         CREATE OR REPLACE TRIGGER verificar_formato_dni
         BEFORE INSERT OR UPDATE ON empleado
         FOR EACH ROW
@@ -716,23 +673,10 @@ def trigger_verificar_formato_dni(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
-
 # #--------------------------------------------------------------------------------------------
 
-def trigger_verificar_formato_tlf_empleado(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: antes de eliminar de empleado, contar los repartos asignados
-        trigger_sql = """
+# Código del trigger en SQL: antes de eliminar de empleado, contar los repartos asignados
+TRIGGER_VERIFICAR_FORMATO_TLF_EMPLEADO = """
         CREATE OR REPLACE TRIGGER verificar_formato_tlf
         BEFORE INSERT OR UPDATE ON empleado
         FOR EACH ROW
@@ -743,26 +687,11 @@ def trigger_verificar_formato_tlf_empleado(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
-
 #--------------------------------------------------------------------------------------------
 #DISPARADORES SUBSISTEMA DE PROVEEDORES
 #--------------------------------------------------------------------------------------------
 
-def trigger_verificar_formato_telefono_proveedor(conn):
-
-    try:
-
-        cursor = conn.cursor()
-
-        trigger_sql = """
+TRIGGER_VERIFICAR_FORMATO_TELEFONO_PROVEEDOR = """
         CREATE OR REPLACE TRIGGER trigger_verificar_formato_telefono_proveedor
         BEFORE INSERT 
         ON proveedor
@@ -774,24 +703,9 @@ def trigger_verificar_formato_telefono_proveedor(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
-
 #--------------------------------------------------------------------------------------------
-def trigger_verificar_formato_correo_proveedor(conn):
-
-    try:
-
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: antes de dar de alta un proveedor
-        trigger_sql = """
+# Código del trigger en SQL: antes de dar de alta un proveedor
+TRIGGER_VERIFICAR_FORMATO_CORREO_PROVEEDOR = """
         CREATE OR REPLACE TRIGGER trigger_verificar_formato_correo_proveedor
         BEFORE INSERT 
         ON proveedor
@@ -809,15 +723,6 @@ def trigger_verificar_formato_correo_proveedor(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
-
 #--------------------------------------------------------------------------------------------
 
 # def trigger_verificar_que_no_existen_pedidos_activos_de_proveedor (conn):
@@ -851,20 +756,14 @@ def trigger_verificar_formato_correo_proveedor(conn):
 #         cursor.execute(trigger_sql)
 #         conn.commit()
 
-#     except oracledb.DatabaseError as e:
+#     except bd.DatabaseError as e:
 #         error, = e.args
 
 #     finally:
 #         cursor.close()
 
 #--------------------------------------------------------------------------------------------
-def trigger_verificar_producto_existe(conn):
-
-    try:
-        
-        cursor = conn.cursor()
-
-        trigger_sql ="""
+TRIGGER_VERIFICAR_PRODUCTO_EXISTE = """
 
         CREATE OR REPLACE TRIGGER trigger_verificar_producto_existe
         BEFORE INSERT OR UPDATE 
@@ -884,15 +783,6 @@ def trigger_verificar_producto_existe(conn):
             END IF;
         END;
         """
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-        conn.commit()
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
 
 
 #--------------------------------------------------------------------------------------------
@@ -900,12 +790,8 @@ def trigger_verificar_producto_existe(conn):
 #--------------------------------------------------------------------------------------------
 
 #disparador comprobar que un usuario no tiene pedidos asociados
-def trigger_verificar_pedidos_antes_de_eliminar(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: antes de eliminar de usuario, contar los pedidos pendientes
-        trigger_sql = """
+# Código del trigger en SQL: antes de eliminar de usuario, contar los pedidos pendientes
+TRIGGER_VERIFICAR_PEDIDOS_ANTES_DE_ELIMINAR = """
         CREATE OR REPLACE TRIGGER verificar_pedidos_antes_de_eliminar
         BEFORE DELETE ON usuario
         FOR EACH ROW
@@ -928,94 +814,62 @@ def trigger_verificar_pedidos_antes_de_eliminar(conn):
             END IF;
         END;"""
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
-
 #--------------------------------------------------------------------------------------------
-#trigger_verificar_si_es_repartidor
-def trigger_verificar_si_es_repartidor(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: antes de eliminar de usuario, contar los pedidos pendientes
-        trigger_sql = """
-        CREATE OR REPLACE TRIGGER verificar_si_es_repartidor
+#trigger validar_reparte: todas las comprobaciones de un reparto en un solo disparador
+#(sustituye a verificar_si_es_repartidor, verificar_si_pedido_pendiente,
+# trigger_verificar_si_empleado_existe, trigger_verificar_si_pedido_existe y
+# trigger_verificar_si_pedido_tiene_repartidor_asociado: una consulta por fila en vez de cinco)
+# Que el pedido no tenga ya repartidor lo comprueba la clave primaria pk_reparte (su
+# ORA-00001 se muestra como el -20038, ver MENSAJES_RESTRICCIONES): el disparador no
+# consulta reparte, así que un INSERT ... SELECT de varias filas no da ORA-04091
+TRIGGERS_REPARTE_ANTIGUOS = [
+    "verificar_si_es_repartidor",
+    "verificar_si_pedido_pendiente",
+    "trigger_verificar_si_empleado_existe",
+    "trigger_verificar_si_pedido_existe",
+    "trigger_verificar_si_pedido_tiene_repartidor_asociado",
+]
+
+# Código del trigger en SQL: mismos códigos de error que los disparadores anteriores
+TRIGGER_VALIDAR_REPARTE = """
+        CREATE OR REPLACE TRIGGER validar_reparte
         BEFORE INSERT ON reparte
         FOR EACH ROW
         DECLARE
-             cargo_empleado VARCHAR(20);
+            dni_empleado empleado.dni%TYPE;
+            cargo_empleado empleado.cargo%TYPE;
+            id_ped pedido.id_pedido%TYPE;
+            estado_pedido pedido.estado%TYPE;
         BEGIN
-            -- obtener el cargo
-            SELECT cargo
-            INTO cargo_empleado
-            FROM empleado
-            WHERE dni = :NEW.dni;
+            -- empleado y pedido en una sola consulta
+            SELECT e.dni, e.cargo, p.id_pedido, p.estado
+            INTO dni_empleado, cargo_empleado, id_ped, estado_pedido
+            FROM dual
+            LEFT JOIN empleado e ON e.dni = :NEW.dni
+            LEFT JOIN pedido p ON p.id_pedido = :NEW.id_pedido;
+
+            IF dni_empleado IS NULL THEN
+                RAISE_APPLICATION_ERROR(-20036, 'No existe un empleado con el dni proporcionado');
+            END IF;
+
+            IF id_ped IS NULL THEN
+                RAISE_APPLICATION_ERROR(-20037, 'No existe pedido con identificador asociado');
+            END IF;
 
-            -- Si el empleado es repartidor
             IF cargo_empleado != 'REPARTIDOR' THEN
                 RAISE_APPLICATION_ERROR(-20032, 'El empleado no es repartidor.');
             END IF;
-        END;"""
-
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
-
-#--------------------------------------------------------------------------------------------
-#trigger_verificar_si_pedido_pendiente
-def trigger_verificar_si_pedido_pendiente(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: comprobar si un pedido existe y está pendiente
-        trigger_sql = """
-        CREATE OR REPLACE TRIGGER verificar_si_pedido_pendiente
-        BEFORE INSERT ON reparte
-        FOR EACH ROW
-        DECLARE
-            estado_pedido VARCHAR(20);
-        BEGIN
-            -- obtener el cargo
-            SELECT estado
-            INTO estado_pedido
-            FROM pedido
-            WHERE id_pedido = :NEW.id_pedido;
 
-            -- Si el pedido no pendiente
             IF estado_pedido != 'PENDIENTE' THEN
                 RAISE_APPLICATION_ERROR(-20033, 'El pedido no existe o no está pendiente.');
             END IF;
-        END;"""
-
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
+        END;
+        """
 
 #--------------------------------------------------------------------------------------------
 #trigger verificar si el telefono del usuario existe en la base de datos antes de realizar pedido
-def trigger_verificar_si_tlf_usuario_existe(conn):
-    try:
-        cursor = conn.cursor()
-        # Código del trigger en SQL: comprobar si un pedido existe y está pendiente
-        trigger_sql ="""
+# Código del trigger en SQL: comprobar si un pedido existe y está pendiente
+TRIGGER_VERIFICAR_SI_TLF_USUARIO_EXISTE = """
         CREATE OR REPLACE TRIGGER trigger_verificar_si_tlf_usuario_existe
         BEFORE INSERT ON realiza
         FOR EACH ROW
@@ -1037,26 +891,13 @@ def trigger_verificar_si_tlf_usuario_existe(conn):
             END;
         END;
         """
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-        conn.commit()
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    finally:
-        cursor.close()
 
 
 
 #----------------------------------------------------------------------------------------
 #trigger verificar si el pedido existe en la base de datos
-def trigger_verificar_si_cod_prod_existe(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Define el código del trigger
-        trigger_sql = """
+# Define el código del trigger
+TRIGGER_VERIFICAR_SI_COD_PROD_EXISTE = """
         CREATE OR REPLACE TRIGGER trigger_verificar_si_cod_prod_existe
         BEFORE INSERT ON contiene
         FOR EACH ROW
@@ -1080,144 +921,6 @@ def trigger_verificar_si_cod_prod_existe(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el procedimiento
-        cursor.execute(trigger_sql)
-        conn.commit()
-
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    
-    finally:
-        cursor.close()  
-
-
-#-------------------------------------------------------------------------------------------
-#trigger empleado registrado en la base de datos
-def trigger_verificar_si_empleado_existe(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Define el código del procedimiento
-        trigger = """
-        CREATE OR REPLACE TRIGGER trigger_verificar_si_empleado_existe
-        BEFORE INSERT ON reparte
-        FOR EACH ROW
-        DECLARE
-            nombre_asoc VARCHAR(20);
-
-        BEGIN
-            -- Comprobar si el dni de empleado existe en la tabla empleado
-            BEGIN
-                SELECT nombre
-                INTO nombre_asoc
-                FROM empleado
-                WHERE dni = :NEW.dni;
-
-            EXCEPTION
-                WHEN NO_DATA_FOUND THEN
-                    -- Si no existe, lanzar una excepción
-                    RAISE_APPLICATION_ERROR(-20036, 'No existe un empleado con el dni proporcionado');
-
-            END;
-        END;
-        """
-
-        # Ejecutar el SQL para crear el procedimiento
-        cursor.execute(trigger)
-        conn.commit()
-
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-    
-    finally:
-        cursor.close() 
-#-------------------------------------------------------------------------------------------
-#trigger pedido en la base de datos
-def trigger_verificar_si_pedido_existe(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Define el código del procedimiento
-        trigger_sql = """
-        CREATE OR REPLACE TRIGGER trigger_verificar_si_pedido_existe
-        BEFORE INSERT ON reparte
-        FOR EACH ROW
-        DECLARE
-            estado_ped VARCHAR(50);
-
-        BEGIN
-            -- Comprobar si el dni de empleado existe en la tabla empleado
-            BEGIN
-                SELECT estado
-                INTO estado_ped
-                FROM pedido
-                WHERE id_pedido = :NEW.id_pedido;
-
-            EXCEPTION
-                WHEN NO_DATA_FOUND THEN
-                    -- Si no existe, lanzar una excepción
-                    RAISE_APPLICATION_ERROR(-20037, 'No existe pedido con identificador asociado');
-
-            END;
-        END;
-        """
-
-        # Ejecutar el SQL para crear el procedimiento
-        cursor.execute(trigger_sql)
-        conn.commit()
-
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-    
-    finally:
-        cursor.close() 
-#---------------------------------------------------------------------------------
-#trigger verificar si el pedido tiene asignado un repartidor
-def trigger_verificar_si_pedido_tiene_repartidor_asociado(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Define el código del trigger
-        trigger_sql = """
-        CREATE OR REPLACE TRIGGER trigger_verificar_si_pedido_tiene_repartidor_asociado
-        BEFORE INSERT ON reparte
-        FOR EACH ROW
-        DECLARE
-            contador INT;
-
-        BEGIN
-        -- Comprobar si el número de producto existe en la tabla producto
-
-            SELECT COUNT(*)
-            INTO contador
-            FROM reparte
-            WHERE id_pedido = :NEW.id_pedido;
-
-            --lanzar una excepción
-            IF contador >0 THEN 
-                
-                RAISE_APPLICATION_ERROR(-20038, 'El pedido ya tiene un repartidor asignado');
-            END IF;
-
-        END;
-        """
-
-        # Ejecutar el SQL para crear el procedimiento
-        cursor.execute(trigger_sql)
-        conn.commit()
-
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-
-    
-    finally:
-        cursor.close()  
-
 
 # #--------------------------------------------------------------------------------------------
 # #trigger_verificar_si_pedido_pendiente --- kessler
@@ -1249,7 +952,7 @@ def trigger_verificar_si_pedido_tiene_repartidor_asociado(conn):
 #         cursor.execute(trigger_sql)
 
 
-#     except oracledb.DatabaseError as e:
+#     except bd.DatabaseError as e:
 #         error, = e.args
 
 #     finally:
@@ -1257,12 +960,8 @@ def trigger_verificar_si_pedido_tiene_repartidor_asociado(conn):
 
 #===================================================================================
 # Triggers reservas
-def trigger_validar_numero_personas_reserva(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: verifica el número de personas en la tabla reserva
-        trigger_sql = """
+# Código del trigger en SQL: verifica el número de personas en la tabla reserva
+TRIGGER_VALIDAR_NUMERO_PERSONAS_RESERVA = """
         CREATE OR REPLACE TRIGGER validar_numero_personas_reserva
         BEFORE INSERT OR UPDATE ON reserva
         FOR EACH ROW
@@ -1273,24 +972,8 @@ def trigger_validar_numero_personas_reserva(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-        conn.commit()
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error al crear el trigger: {error.message}")
-        conn.rollback()
-
-    finally:
-        cursor.close()
-
-def trigger_validar_fecha_reserva_posterior(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: verifica que la fecha de la reserva es posterior a la actual
-        trigger_sql = """
+# Código del trigger en SQL: verifica que la fecha de la reserva es posterior a la actual
+TRIGGER_VALIDAR_FECHA_RESERVA_POSTERIOR = """
         CREATE OR REPLACE TRIGGER validar_fecha_reserva_posterior
         BEFORE INSERT OR UPDATE ON reserva
         FOR EACH ROW
@@ -1301,24 +984,8 @@ def trigger_validar_fecha_reserva_posterior(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-        conn.commit()
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error al crear el trigger: {error.message}")
-        conn.rollback()
-
-    finally:
-        cursor.close()
-
-def trigger_validar_formato_telefono_reserva(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: verifica que el teléfono tenga un formato válido
-        trigger_sql = """
+# Código del trigger en SQL: verifica que el teléfono tenga un formato válido
+TRIGGER_VALIDAR_FORMATO_TELEFONO_RESERVA = """
         CREATE OR REPLACE TRIGGER validar_formato_telefono_reserva
         BEFORE INSERT OR UPDATE ON reserva
         FOR EACH ROW
@@ -1329,24 +996,8 @@ def trigger_validar_formato_telefono_reserva(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-        conn.commit()
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error al crear el trigger: {error.message}")
-        conn.rollback()
-
-    finally:
-        cursor.close()
-
-def trigger_validar_valores_lugar_reserva(conn):
-    try:
-        cursor = conn.cursor()
-
-        # Código del trigger en SQL: verifica que el valor de lugar sea 0 o 1
-        trigger_sql = """
+# Código del trigger en SQL: verifica que el valor de lugar sea 0 o 1
+TRIGGER_VALIDAR_VALORES_LUGAR_RESERVA = """
         CREATE OR REPLACE TRIGGER validar_valores_lugar_reserva
         BEFORE INSERT OR UPDATE ON reserva
         FOR EACH ROW
@@ -1357,326 +1008,656 @@ def trigger_validar_valores_lugar_reserva(conn):
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-        conn.commit()
+# Una reserva solo puede tener un empleado encargado. Antes lo comprobaba el disparador
+# validar_empleado_asignado con un SELECT COUNT(*) que no usaba ningún índice (la clave
+# primaria empieza por dni_empleado) y que dejaba pasar a dos sesiones a la vez, porque
+# ninguna ve la fila sin confirmar de la otra. El índice único uq_encargado_reserva lo
+# garantiza siempre; ORA-00001 se traduce al mensaje -20043 en mensaje_error.
+def restriccion_encargado_unico(conn):
+    try:
+        cursor = conn.cursor()
+
+        # Si el esquema viene de una versión anterior, se quita el disparador
+        bd.backend.borrar_si_existe(cursor, "TRIGGER", "validar_empleado_asignado")
 
-    except oracledb.DatabaseError as e:
+        # crear_tablas ya la crea; esto solo hace falta en esquemas anteriores
+        bd.backend.aniadir_restriccion(cursor, "encargado_de", "uq_encargado_reserva", "UNIQUE (fecha, tlf)")
+
+    except bd.DatabaseError as e:
         error, = e.args
-        print(f"Error al crear el trigger: {error.message}")
-        conn.rollback()
+        print(f"Error al crear la restricción: {error.message}")
 
     finally:
         cursor.close()
 
-def trigger_validar_asignacionempleado(conn):
+############################################################################################
+# DISPARADORES GESTIÓN DE MESAS
+############################################################################################
+
+# Este trigger está porque en la base de datos, al poner una mesa como ocupada, se crea una nueva entrada en la tabla de comanda de esa mesa.
+# No queremos tener dos comandas activas al mismo tiempo en esa mesa.
+
+TRIGGER_NO_ACTIVAR_MESA_OCUPADA = """
+        CREATE OR REPLACE TRIGGER no_activar_mesa_ocupada
+        BEFORE UPDATE ON mesa
+        FOR EACH ROW
+        BEGIN
+            IF (:OLD.estado = 'OCUPADA' AND :NEW.estado = 'OCUPADA') THEN
+                RAISE_APPLICATION_ERROR(-20043, 'Para ocupar una mesa, esta no debe estar ocupada');
+            END IF;
+        END;
+        """
+
+
+#========================================================================================
+#PROCEDIMIENTOS
+#========================================================================================
+
+# Añade consumiciones de un producto a la comanda activa de una mesa.
+# Sustituye las consultas que hacía aniadir_pedido (comanda activa, entrada existente,
+# MAX(id_entrada), INSERT/UPDATE) por una sola llamada atómica. La comanda se bloquea
+# con FOR UPDATE para que dos terminales no den el mismo número de entrada.
+def procedimiento_aniadir_a_comanda(conn):
     try:
         cursor = conn.cursor()
 
-        # Código del trigger en SQL: verifica que el valor de lugar sea 0 o 1
-        trigger_sql = """
-        CREATE OR REPLACE TRIGGER validar_empleado_asignado
-        BEFORE INSERT OR UPDATE ON encargado_de
-        FOR EACH ROW
-        DECLARE
-            contador_empleados NUMBER;
+        procedimiento_sql = """
+        CREATE OR REPLACE PROCEDURE aniadir_a_comanda(
+            p_mesa IN INT,
+            p_producto IN INT,
+            p_consumiciones IN INT
+        ) IS
+            v_comanda comanda.id_comanda%TYPE;
+            v_entrada entrada_comanda.id_entrada%TYPE;
         BEGIN
-            SELECT COUNT(*)
-            INTO contador_empleados
-            FROM encargado_de
-            WHERE fecha = :NEW.fecha
-            AND tlf = :NEW.tlf;
+            BEGIN
+                SELECT id_comanda
+                INTO v_comanda
+                FROM comanda
+                WHERE id_mesa = p_mesa AND estado = 'ACTIVO' AND ROWNUM = 1
+                FOR UPDATE;
+            EXCEPTION
+                WHEN NO_DATA_FOUND THEN
+                    RAISE_APPLICATION_ERROR(-20044, 'No hay ninguna comanda activa en esta mesa');
+            END;
 
-            IF contador_empleados > 0 THEN
-                RAISE_APPLICATION_ERROR(-20043, 'La reserva ya tiene un empleado asignado.');
+            -- Si el producto ya está en la comanda, se suman las consumiciones
+            UPDATE entrada_comanda e
+            SET e.num_consumidores = e.num_consumidores + p_consumiciones
+            WHERE e.id_mesa = p_mesa AND e.id_comanda = v_comanda
+            AND EXISTS (SELECT 1
+                        FROM formado_por f
+                        WHERE f.id_mesa = e.id_mesa AND f.id_comanda = e.id_comanda
+                        AND f.id_entrada = e.id_entrada AND f.id_producto = p_producto);
+
+            -- Si no, se crea una entrada nueva
+            IF SQL%ROWCOUNT = 0 THEN
+                SELECT NVL(MAX(id_entrada), 0) + 1
+                INTO v_entrada
+                FROM entrada_comanda
+                WHERE id_mesa = p_mesa AND id_comanda = v_comanda;
+
+                INSERT INTO entrada_comanda (id_mesa, id_comanda, id_entrada, num_consumidores)
+                VALUES (p_mesa, v_comanda, v_entrada, p_consumiciones);
+
+                INSERT INTO formado_por (id_entrada, id_mesa, id_comanda, id_producto)
+                VALUES (v_entrada, p_mesa, v_comanda, p_producto);
             END IF;
         END;
         """
 
-        # Ejecutar el SQL para crear el trigger
-        cursor.execute(trigger_sql)
-        conn.commit()
+        cursor.execute(procedimiento_sql)
 
-    except oracledb.DatabaseError as e:
+    except bd.DatabaseError as e:
         error, = e.args
-        print(f"Error al crear el trigger: {error.message}")
-        conn.rollback()
+        print(f"Error al crear el procedimiento: {error.message}")
 
     finally:
         cursor.close()
 
-############################################################################################
-# DISPARADORES GESTIÓN DE MESAS
-############################################################################################
-
-# Este trigger está porque en la base de datos, al poner una mesa como ocupada, se crea una nueva entrada en la tabla de comanda de esa mesa.
-# No queremos tener dos comandas activas al mismo tiempo en esa mesa.
-
-def trigger_no_activar_mesa_ocupada(conn):
+# Comprueba que un pedido existe y está pendiente antes de asignarle repartidor
+# (asignar_repartidor lo llama antes del INSERT en reparte). Mismos códigos que validar_reparte.
+def procedimiento_comprobar_pedido(conn):
     try:
         cursor = conn.cursor()
 
-        trigger_sql = """
-        CREATE OR REPLACE TRIGGER no_activar_mesa_ocupada
-        BEFORE UPDATE ON mesa
-        FOR EACH ROW
+        procedimiento_sql = """
+        CREATE OR REPLACE PROCEDURE comprobar_pedido(
+            p_pedido IN INT
+        ) IS
+            v_estado pedido.estado%TYPE;
         BEGIN
-            IF (:OLD.estado = 'OCUPADA' AND :NEW.estado = 'OCUPADA') THEN
-                RAISE_APPLICATION_ERROR(-20043, 'Para ocupar una mesa, esta no debe estar ocupada');
+            SELECT estado
+            INTO v_estado
+            FROM pedido
+            WHERE id_pedido = p_pedido;
+
+            IF v_estado != 'PENDIENTE' THEN
+                RAISE_APPLICATION_ERROR(-20033, 'El pedido no existe o no está pendiente.');
             END IF;
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                RAISE_APPLICATION_ERROR(-20037, 'No existe pedido con identificador asociado');
         END;
         """
 
-        cursor.execute(trigger_sql)
-        conn.commit()
-        print("Trigger 'no_activar_mesa_ocupada' creado con éxito")
+        cursor.execute(procedimiento_sql)
 
-    except oracledb.DatabaseError as e:
+    except bd.DatabaseError as e:
         error, = e.args
-        print(f"Error al crear el trigger: {error.message}")
-        conn.rollback()
+        print(f"Error al crear el procedimiento: {error.message}")
 
     finally:
         cursor.close()
 
+#===================================================================================
+# Función para crear procedimientos
+#===================================================================================
+# procedimientos subsistema mesas
+PROCEDIMIENTOS = [
+    procedimiento_aniadir_a_comanda,
+    # procedimientos subsistema pedidos online
+    procedimiento_comprobar_pedido,
+]
+
+def crear_procedimientos(conn):
+    for procedimiento in PROCEDIMIENTOS:
+        procedimiento(conn)
 
 #===================================================================================
 # Función para crear triggers
 #===================================================================================
-def crear_triggers(conn):
+# Registro de disparadores: código SQL de los disparadores activos en el modo de
+# restricciones actual, en orden de creación
+def disparadores():
+
+    # En modo declarativo las comprobaciones de formato y existencia son restricciones
+    # CHECK / FOREIGN KEY y no se crean los disparadores equivalentes
+    declarativo = config.modo_restricciones == 'declarativo'
+    lista = []
 
     # disparadores subsistema empleados 
-    trigger_verificar_mesas_antes_de_eliminar(conn)
-    trigger_verificar_repartos_antes_de_eliminar(conn)
-    trigger_verificar_salario_positivo(conn)
-    trigger_verificar_formato_dni(conn)
-    trigger_verificar_formato_tlf_empleado(conn)
+    lista += [TRIGGER_VERIFICAR_MESAS_ANTES_DE_ELIMINAR,
+              TRIGGER_VERIFICAR_REPARTOS_ANTES_DE_ELIMINAR]
+    if not declarativo:
+        lista += [TRIGGER_VERIFICAR_SALARIO_POSITIVO,
+                  TRIGGER_VERIFICAR_FORMATO_DNI,
+                  TRIGGER_VERIFICAR_FORMATO_TLF_EMPLEADO]
 
     # triggers subsistema de proveedores 
-    trigger_verificar_formato_telefono_proveedor(conn)
-    trigger_verificar_formato_correo_proveedor(conn)
-    # trigger_verificar_que_no_existen_pedidos_activos_de_proveedor(conn)
-    trigger_verificar_producto_existe(conn)
+    if not declarativo:
+        lista += [TRIGGER_VERIFICAR_FORMATO_TELEFONO_PROVEEDOR,
+                  TRIGGER_VERIFICAR_FORMATO_CORREO_PROVEEDOR,
+                  TRIGGER_VERIFICAR_PRODUCTO_EXISTE]
+    # trigger_verificar_que_no_existen_pedidos_activos_de_proveedor
 
     #triggers subsistema pedidos online
-    trigger_verificar_pedidos_antes_de_eliminar(conn)
-    trigger_verificar_si_es_repartidor(conn)
-    trigger_verificar_si_pedido_pendiente(conn)
-    trigger_verificar_si_tlf_usuario_existe(conn)
-    trigger_verificar_si_cod_prod_existe(conn)
-    trigger_verificar_si_pedido_existe(conn)
-    trigger_verificar_si_pedido_tiene_repartidor_asociado(conn)
-    trigger_verificar_si_empleado_existe(conn)
+    lista += [TRIGGER_VERIFICAR_PEDIDOS_ANTES_DE_ELIMINAR,
+              TRIGGER_VALIDAR_REPARTE]
+    if not declarativo:
+        lista += [TRIGGER_VERIFICAR_SI_TLF_USUARIO_EXISTE,
+                  TRIGGER_VERIFICAR_SI_COD_PROD_EXISTE]
 
     #triggers subsistema reservas
-    trigger_validar_numero_personas_reserva(conn)
-    trigger_validar_fecha_reserva_posterior(conn)
-    trigger_validar_formato_telefono_reserva(conn)
-    trigger_validar_valores_lugar_reserva(conn)
-    trigger_validar_asignacionempleado(conn)
+    lista += [TRIGGER_VALIDAR_FECHA_RESERVA_POSTERIOR]
+    if not declarativo:
+        lista += [TRIGGER_VALIDAR_NUMERO_PERSONAS_RESERVA,
+                  TRIGGER_VALIDAR_FORMATO_TELEFONO_RESERVA,
+                  TRIGGER_VALIDAR_VALORES_LUGAR_RESERVA]
 
     # disparadores subsistema mesas
-    trigger_no_activar_mesa_ocupada(conn)
+    lista += [TRIGGER_NO_ACTIVAR_MESA_OCUPADA]
 
     #otro
-    # trigger_verificar_si_mesas_asociadas(conn)
+    # trigger_verificar_si_mesas_asociadas
+
+    return lista
+
+def nombre_disparador(trigger_sql):
+    return re.search(r"CREATE OR REPLACE TRIGGER\s+(\w+)", trigger_sql, re.IGNORECASE).group(1).upper()
+
+# Crea todos los disparadores de una vez (en Oracle, un único bloque PL/SQL anónimo: una
+# sola ida y vuelta). Si uno falla los demás se crean igual.
+# Los nombres de 'eliminar' son disparadores obsoletos que se borran antes.
+# Devuelve {nombre: (estado, errores)} leído después con una sola consulta.
+def desplegar_disparadores(conn, lista, eliminar=()):
+    nombres = [nombre_disparador(trigger_sql) for trigger_sql in lista]
+    cursor = conn.cursor()
+    try:
+        errores = bd.backend.desplegar_disparadores(cursor, lista, nombres, eliminar)
+        if errores:
+            print(f"Error al crear los disparadores:\n{errores}")
+
+        return bd.backend.estado_disparadores(cursor, nombres)
+
+    except bd.DatabaseError as e:
+        error, = e.args
+        print(f"Error al crear los disparadores: {error.message}")
+        return {}
+
+    finally:
+        cursor.close()
+
+def mostrar_estado_disparadores(estado):
+    for nombre, (status, errores) in estado.items():
+        if status != "VALID":
+            print(f"\tDisparador {nombre}: {status}")
+            for error in errores:
+                print(f"\t\t{error}")
+    validos = sum(1 for status, _ in estado.values() if status == "VALID")
+    print(f"Disparadores válidos: {validos}/{len(estado)}")
+
+# Restricciones CHECK del modo declarativo, o su eliminación en el modo 'triggers'
+def aplicar_restricciones(conn):
+    if config.modo_restricciones == 'declarativo':
+        crear_restricciones_declarativas(conn)
+    else:
+        eliminar_restricciones_declarativas(conn)
+
+def crear_triggers(conn):
+    # Si el esquema viene de una versión anterior, se quitan los disparadores de reparte sueltos
+    mostrar_estado_disparadores(desplegar_disparadores(conn, disparadores(), TRIGGERS_REPARTE_ANTIGUOS))
+    restriccion_encargado_unico(conn)
+    aplicar_restricciones(conn)
+
+#===================================================================================
+# Restricciones declarativas (config.modo_restricciones = 'declarativo')
+#===================================================================================
+# Comprobaciones que los disparadores hacían a mano y que el motor resuelve mucho
+# más barato con una restricción: sin cambio de contexto a PL/SQL ni SELECT extra.
+# (restricción, tabla, condición CHECK, disparador al que sustituye)
+# Las existencias (FOREIGN KEY) ya están en crear_tablas con nombre propio.
+RESTRICCIONES_CHECK = [
+    ("ck_empleado_salario", "empleado", "salario >= 0", "verificar_salario_positivo"),
+    ("ck_empleado_dni", "empleado", r"REGEXP_LIKE(dni, '^[0-9]{8}[A-Z]$')", "verificar_formato_dni"),
+    ("ck_empleado_telefono", "empleado", r"telefono IS NOT NULL AND REGEXP_LIKE(telefono, '^\+?[0-9]{1,3}?[0-9]{1,20}$')", "verificar_formato_tlf"),
+    ("ck_proveedor_telefono", "proveedor", r"REGEXP_LIKE(telefono, '^\+?\d+$')", "trigger_verificar_formato_telefono_proveedor"),
+    ("ck_proveedor_correo_arroba", "proveedor", "INSTR(correo, '@') > 0", "trigger_verificar_formato_correo_proveedor"),
+    ("ck_proveedor_correo_posicion", "proveedor", "INSTR(correo, '@') = 0 OR (INSTR(correo, '@') > 1 AND INSTR(correo, '@') < LENGTH(correo))", "trigger_verificar_formato_correo_proveedor"),
+    ("ck_reserva_personas", "reserva", "numero_personas >= 1", "validar_numero_personas_reserva"),
+    ("ck_reserva_telefono", "reserva", "REGEXP_LIKE(telefono, '^[0-9]{9}$')", "validar_formato_telefono_reserva"),
+    ("ck_reserva_lugar", "reserva", "lugar IN (0, 1)", "validar_valores_lugar_reserva"),
+]
+
+# Disparadores de existencia sustituidos por las FOREIGN KEY con nombre
+TRIGGERS_EXISTENCIA = [
+    "trigger_verificar_producto_existe",
+    "trigger_verificar_si_tlf_usuario_existe",
+    "trigger_verificar_si_cod_prod_existe",
+]
+
+# Restricción -> (código, mensaje) del disparador al que sustituye, para que el
+# usuario vea el mismo mensaje en los dos modos
+MENSAJES_RESTRICCIONES = {
+    "CK_EMPLEADO_SALARIO": (-20012, 'El salario no puede ser negativo.'),
+    "CK_EMPLEADO_DNI": (-20013, 'Error: El DNI debe tener 8 números seguidos de 1 letra mayúscula.'),
+    "CK_EMPLEADO_TELEFONO": (-20014, 'Error: El teléfono debe ser un número válido con un prefijo opcional.'),
+    "CK_PROVEEDOR_TELEFONO": (-20015, 'Error: El número debe comenzar con un "+" opcional, seguido solo de dígitos.'),
+    "CK_PROVEEDOR_CORREO_ARROBA": (-20021, 'Error: El correo debe contener un carácter @.'),
+    "CK_PROVEEDOR_CORREO_POSICION": (-20022, 'Error: El correo debe contener al menos un carácter antes y después del @.'),
+    "FK_TIENE_VIVERES": (-20025, 'Error: El producto proporcionado no existe en la base de datos.'),
+    "FK_REALIZA_USUARIO": (-20034, 'El número de teléfono no pertenece a ningún usuario'),
+    "FK_CONTIENE_PRODUCTO": (-20035, 'El código no identifica a ningún producto'),
+    "FK_REPARTE_EMPLEADO": (-20036, 'No existe un empleado con el dni proporcionado'),
+    "FK_REPARTE_PEDIDO": (-20037, 'No existe pedido con identificador asociado'),
+    "CK_RESERVA_PERSONAS": (-20038, 'El número de personas en una reserva debe ser mayor o igual a 1.'),
+    "CK_RESERVA_TELEFONO": (-20041, 'El teléfono debe tener exactamente 9 dígitos.'),
+    "CK_RESERVA_LUGAR": (-20042, 'El valor de lugar debe ser 0 (dentro) o 1 (fuera).'),
+    "UQ_ENCARGADO_RESERVA": (-20043, 'La reserva ya tiene un empleado asignado.'),
+    "PK_REPARTE": (-20038, 'El pedido ya tiene un repartidor asignado'),
+}
+
+# Columna obligatoria vacía -> restricción cuyo mensaje se muestra. El disparador de
+# formato rechaza también el NULL; el CHECK no, y lo que llega es ORA-01400 / ORA-01407
+MENSAJES_COLUMNAS_NULAS = {
+    ("EMPLEADO", "DNI"): "CK_EMPLEADO_DNI",
+    ("RESERVA", "TELEFONO"): "CK_RESERVA_TELEFONO",
+}
+
+# ORA-00001 (clave única duplicada), ORA-02290 (CHECK incumplido) y ORA-02291 (clave
+# padre no encontrada) traen el nombre de la restricción entre paréntesis: (ESQUEMA.NOMBRE)
+_patron_restriccion = re.compile(r"\((?:[^.()]+\.)?([^.()]+)\)")
+
+# ORA-01400 (insertar NULL) y ORA-01407 (actualizar a NULL): ("ESQUEMA"."TABLA"."COLUMNA")
+_patron_columna = re.compile(r'\("[^"]+"\."([^"]+)"\."([^"]+)"\)')
+
+# Mensaje para el usuario de un error de oracledb: si viene de una restricción
+# declarativa conocida, el mismo texto que daba el disparador
+def mensaje_error(error):
+    if error.code in (1, 2290, 2291):
+        encontrado = _patron_restriccion.search(error.message)
+        if encontrado and encontrado.group(1).upper() in MENSAJES_RESTRICCIONES:
+            codigo, mensaje = MENSAJES_RESTRICCIONES[encontrado.group(1).upper()]
+            return f"ORA{codigo}: {mensaje}"
+    if error.code in (1400, 1407):
+        encontrado = _patron_columna.search(error.message)
+        if encontrado and encontrado.groups() in MENSAJES_COLUMNAS_NULAS:
+            codigo, mensaje = MENSAJES_RESTRICCIONES[MENSAJES_COLUMNAS_NULAS[encontrado.groups()]]
+            return f"ORA{codigo}: {mensaje}"
+    return error.message
+
+def crear_restricciones_declarativas(conn):
+    try:
+        cursor = conn.cursor()
+
+        for nombre in TRIGGERS_EXISTENCIA:
+            bd.backend.borrar_si_existe(cursor, "TRIGGER", nombre)
+
+        for restriccion, tabla, condicion, trigger in RESTRICCIONES_CHECK:
+            bd.backend.borrar_si_existe(cursor, "TRIGGER", trigger)
+            bd.backend.aniadir_restriccion(cursor, tabla, restriccion, f"CHECK ({condicion})")
+
+    except bd.DatabaseError as e:
+        error, = e.args
+        print(f"Error al crear las restricciones: {error.message}")
+
+    finally:
+        cursor.close()
+
+# Al volver al modo 'triggers' se quitan las CHECK para no validar dos veces
+def eliminar_restricciones_declarativas(conn):
+    cursor = conn.cursor()
+    for restriccion, tabla, *_ in RESTRICCIONES_CHECK:
+        bd.backend.borrar_restriccion(cursor, tabla, restriccion)
+    cursor.close()
+
+#========================================================================================
+#VERSIONADO DEL ESQUEMA
+#========================================================================================
+# Al arrancar solo se aplica lo que ha cambiado. La tabla esquema_version guarda, por
+# componente (tablas, secuencias, índices, cada procedimiento y cada disparador), la
+# suma SHA-256 de su definición. El manifiesto se calcula a partir del código: para
+# las tablas, su DDL y los datos iniciales; para los disparadores, su código SQL del
+# registro; para los procedimientos, el código de la función que los crea.
+# Los disparadores cambiados se crean todos juntos en un solo bloque.
+#
+# Si cambian las tablas se borran y se recrean con sus datos iniciales. Al borrar una
+# tabla Oracle borra también sus disparadores y restricciones, así que crear_tablas
+# olvida la versión de esos componentes y se vuelven a aplicar.
+
+def _suma(*partes):
+    return hashlib.sha256(repr(partes).encode()).hexdigest()
+
+def _recrear_indices(conn):
+    eliminar_indices(conn)
+    crear_indices(conn)
+
+# componente -> (suma, cómo se aplica), en orden de aplicación. Para los disparadores
+# 'cómo se aplica' es su código SQL, que se despliega con desplegar_disparadores
+def manifiesto_esquema():
+    manifiesto = {
+        "tablas": (_suma(TABLAS, DATOS_INICIALES), crear_tablas),
+        "secuencias": (_suma(SECUENCIAS), crear_secuencias),
+        "indices": (_suma(INDICES), _recrear_indices),
+    }
+    for funcion in PROCEDIMIENTOS:
+        manifiesto[funcion.__name__] = (_suma(inspect.getsource(funcion)), funcion)
+    for trigger_sql in disparadores():
+        manifiesto[f"disparador:{nombre_disparador(trigger_sql)}"] = (_suma(trigger_sql), trigger_sql)
+    manifiesto["restriccion_encargado_unico"] = (_suma(inspect.getsource(restriccion_encargado_unico)),
+                                                 restriccion_encargado_unico)
+    manifiesto["restricciones"] = (_suma(config.modo_restricciones, RESTRICCIONES_CHECK,
+                                         TRIGGERS_EXISTENCIA), aplicar_restricciones)
+    return manifiesto
+
+# Componentes que desaparecen al borrar las tablas
+def _depende_de_tablas(componente):
+    return componente.startswith("disparador:") or componente in ("restriccion_encargado_unico", "restricciones")
+
+def _crear_tabla_version(cursor):
+    bd.backend.crear_tabla_si_no_existe(cursor, """
+        CREATE TABLE esquema_version (
+            componente VARCHAR(100) PRIMARY KEY,
+            suma CHAR(64),
+            version INT,
+            fecha DATE
+        )""")
+
+# Una sola consulta: componente -> (suma, version). Vacío si aún no hay versión
+def leer_version_esquema(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT componente, suma, version FROM esquema_version")
+        return {componente: (suma, version) for componente, suma, version in cursor}
+    except bd.DatabaseError as e:
+        error, = e.args
+        if error.code != 942: # la tabla no existe
+            raise
+        return {}
+    finally:
+        cursor.close()
+
+def guardar_version_esquema(conn, sumas, olvidar=()):
+    cursor = conn.cursor()
+    try:
+        _crear_tabla_version(cursor)
+        cursor.execute("SELECT NVL(MAX(version), 0) + 1 FROM esquema_version")
+        version, = cursor.fetchone()
+
+        # Los componentes aplicados se borran y se vuelven a insertar con la versión nueva
+        # (sin MERGE, que SQLite no tiene); todo en la misma transacción
+        borrar = list(olvidar) + [componente for componente in sumas if componente not in olvidar]
+        if borrar:
+            cursor.executemany("DELETE FROM esquema_version WHERE componente = :1",
+                               [(componente,) for componente in borrar])
+        cursor.executemany("""
+            INSERT INTO esquema_version (componente, suma, version, fecha)
+            VALUES (:1, :2, :3, SYSDATE)
+        """, [(componente, suma, version) for componente, suma in sumas.items()])
+        conn.commit()
+        return version
+    finally:
+        cursor.close()
+
+# crear_tablas deja registradas las tablas y olvida lo que se ha borrado con ellas
+def _versionar_tablas(conn):
+    manifiesto = manifiesto_esquema()
+    sumas = {componente: manifiesto[componente][0] for componente in ("tablas", "secuencias", "indices")}
+    anteriores = leer_version_esquema(conn)
+    guardar_version_esquema(conn, sumas, [c for c in anteriores if _depende_de_tablas(c)])
+
+def inicializar_esquema(conn, reiniciar=False):
+    manifiesto = manifiesto_esquema()
+    aplicado = {} if reiniciar else leer_version_esquema(conn)
+
+    pendientes = [componente for componente, (suma, _) in manifiesto.items()
+                  if aplicado.get(componente, (None,))[0] != suma]
+    if not pendientes:
+        version = max(v for _, v in aplicado.values())
+        print(f"Esquema al día (versión {version}), no se aplica ningún cambio.")
+        return
+
+    if "tablas" in pendientes:
+        # crear_tablas ya crea secuencias e índices y borra los disparadores
+        pendientes = [c for c in manifiesto if c not in ("secuencias", "indices")]
+
+    # Los disparadores pendientes se despliegan todos juntos al llegar al primero
+    nuevos = [manifiesto[c][1] for c in pendientes if c.startswith("disparador:")]
+    for componente in pendientes:
+        if not componente.startswith("disparador:"):
+            manifiesto[componente][1](conn)
+        elif nuevos:
+            mostrar_estado_disparadores(desplegar_disparadores(conn, nuevos, TRIGGERS_REPARTE_ANTIGUOS))
+            nuevos = []
+
+    # Los componentes que ya no están en el manifiesto (p. ej. al cambiar de modo)
+    obsoletos = [c for c in leer_version_esquema(conn) if c not in manifiesto]
+    version = guardar_version_esquema(conn, {c: manifiesto[c][0] for c in pendientes}, obsoletos)
+    print(f"Esquema actualizado a la versión {version}: {', '.join(pendientes)}")
+
+#========================================================================================
+#SESIÓN DEL EMPLEADO
+#========================================================================================
+# El DNI se pide una sola vez, la primera vez que hace falta; después se usa la sesión
+def obtener_sesion(conn):
+    if sesion.sesion_actual is None:
+        dni = input("Introduzca su DNI: ")
+        sesion.sesion_actual = sesion.iniciar_sesion(conn, dni)
+        if sesion.sesion_actual is None:
+            print("El DNI introducido no corresponde a ningún empleado.")
+    return sesion.sesion_actual
+
+# En un terminal compartido: olvida la sesión y pide el DNI del siguiente empleado
+def cambiar_de_empleado(conn):
+    sesion.cerrar_sesion()
+    sesion_empleado = obtener_sesion(conn)
+    if sesion_empleado is not None:
+        print(f"Sesión iniciada: {sesion_empleado.nombre} ({sesion_empleado.cargo(conn)})")
+
+def requiere_jefe(conn):
+    sesion_empleado = obtener_sesion(conn)
+    if sesion_empleado is None or not sesion_empleado.es_jefe(conn):
+        print("Solo un empleado con cargo JEFE puede realizar esta acción.")
+        return None
+    return sesion_empleado
+
+#========================================================================================
+#LECTURA DE DATOS
+#========================================================================================
+# Los menús piden los datos, llaman al servicio (servicios.py) y muestran el resultado.
+# Los errores se muestran todos igual: los de la BD con mensaje_error y los de los
+# servicios (ValueError, DatosNoValidos) con su mensaje.
+def mostrar_error(e, prefijo="Error"):
+    if isinstance(e, bd.DatabaseError):
+        error, = e.args
+        print(f"{prefijo}: {mensaje_error(error)}")
+    else:
+        print(e)
+
+def pedir_entero(mensaje):
+    while True:
+        try:
+            return int(input(mensaje))
+        except ValueError:
+            print("Introduzca un número entero.")
+
+# Fecha DD-MM-YYYY y hora HH:MM a datetime; None si alguna no es válida
+def leer_fecha_hora(fecha, hora):
+    try:
+        return datetime.datetime.strptime(f"{fecha} {hora}", "%d-%m-%Y %H:%M")
+    except ValueError:
+        print("La fecha o la hora ingresadas no son válidas. Asegúrate de usar los formatos DD-MM-YYYY y HH:MM.")
+        return None
+
 #========================================================================================
 #FUNCIONES SUBSISTEMA GESTIÓN EMPLEADOS
 #========================================================================================
 #ALTA EMPLEADO
 def dar_de_alta_empleado(conn):
-    try: 
-        cursor = conn.cursor()
+    # Verificar si el usuario es jefe (en memoria, con la sesión iniciada)
+    if requiere_jefe(conn) is None:
+        return
 
-        # Verificar si el usuario es jefe
-        dni_jefe = input("Introduzca su DNI (jefe): ")
-        cursor.execute("SELECT cargo FROM empleado WHERE dni = :dni", {"dni": dni_jefe})
-        resultado = cursor.fetchone()
-        if not resultado or resultado[0] != 'JEFE':
-            print("Solo un empleado con cargo JEFE puede realizar esta acción.")
-            return
-        
-        nombre = input("Nombre: ")
-        apellido = input("Apellido: ")
-        dni_empleado = input("DNI: ") # se comprueba con un trigger que el formato sea el correcto
-        tlf = input("Telefono: ") # se comprueba con un trigger que el formato sea el correcto
-        cargo = input("Cargo: ")
-        ss = input("Número de la seguridad social: ")
-        salario = input("Salario: ") # se comprueba con un trigger que no sea negativo
-
-        cursor.execute("INSERT INTO empleado (dni, nombre, apellido, cargo, telefono, num_ss, salario) VALUES (:1, :2, :3, :4, :5, :6, :7)", (dni_empleado, nombre, apellido, cargo, tlf, ss, salario))
+    nombre = input("Nombre: ")
+    apellido = input("Apellido: ")
+    dni_empleado = input("DNI: ") # se comprueba con un trigger que el formato sea el correcto
+    tlf = input("Telefono: ") # se comprueba con un trigger que el formato sea el correcto
+    cargo = input("Cargo: ")
+    ss = input("Número de la seguridad social: ")
+    salario = input("Salario: ") # se comprueba con un trigger que no sea negativo
+
+    try:
+        ServicioEmpleados(conn).alta(dni_empleado, nombre, apellido, cargo, tlf, ss, salario)
         print("Se ha dado de alta al empleado correctamente")
-        conn.commit()
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
 #----------------------------------------------------------------------------------------
 
 def dar_de_baja_empleado(conn):
-    try:
-        cursor = conn.cursor()
+    # Verificar si el usuario es jefe (en memoria, con la sesión iniciada)
+    if requiere_jefe(conn) is None:
+        return
 
-        # Verificar si el usuario es jefe
-        dni_jefe = input("Introduzca su DNI (jefe): ")
-        cursor.execute("SELECT cargo FROM empleado WHERE dni = :dni", {"dni": dni_jefe})
-        resultado = cursor.fetchone()
-        if not resultado or resultado[0] != 'JEFE':
-            print("Solo un empleado con cargo JEFE puede realizar esta acción.")
-            return
-        
-        # Verificar si el empleado existe en la base de datos
-        dni_empleado = input("DNI del empleado a borrar: ")
-        cursor.execute("SELECT * FROM empleado WHERE dni = :dni", {"dni": dni_empleado})
-        resultado = cursor.fetchone()
-        if not resultado:
-            print("El DNI introducido no corresponde a ningún empleado.")
-            return
-        
-        # borrado en cascada manual 
-        cursor.execute("DELETE FROM hace WHERE dni = :dni", {"dni": dni_empleado})
-        cursor.execute("DELETE FROM encargado_de WHERE dni_empleado = :dni", {"dni": dni_empleado})
-        cursor.execute("DELETE FROM reporta WHERE dni = :dni", {"dni": dni_empleado})
-
-        # al borrar, se ejecuta el trigger que comprueba que el empleado no tenga repartos asignados
-        # al borrar, se ejecuta el trigger que comprueba que el empleado no tenga mesas asignadas
-        cursor.execute("DELETE FROM empleado WHERE dni = :dni", {"dni":dni_empleado})
+    dni_empleado = input("DNI del empleado a borrar: ")
+    try:
+        ServicioEmpleados(conn).baja(dni_empleado)
         print("Se ha eliminado el empleado correctamente")
-        conn.commit()
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
+        if sesion.sesion_actual is not None and sesion.sesion_actual.dni == dni_empleado:
+            sesion.cerrar_sesion()
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
 #----------------------------------------------------------------------------------------
 
 def modificar_datos_empleado(conn):
+    # Verificar si el usuario es jefe (en memoria, con la sesión iniciada)
+    if requiere_jefe(conn) is None:
+        return
+
     try:
-        cursor = conn.cursor()
+        empleados = ServicioEmpleados(conn)
 
-        # Verificar si el usuario es jefe
-        dni_jefe = input("Introduzca su DNI (jefe): ")
-        cursor.execute("SELECT cargo FROM empleado WHERE dni = :dni", {"dni": dni_jefe})
-        resultado = cursor.fetchone()
-        if not resultado or resultado[0] != 'JEFE':
-            print("Solo un empleado con cargo JEFE puede realizar esta acción.")
-            return
-        
         # Verificar si el empleado existe en la base de datos
         dni_empleado = input("DNI del empleado a modificar: ")
-        cursor.execute("SELECT * FROM empleado WHERE dni = :dni", {"dni": dni_empleado})
-        resultado = cursor.fetchone()
-        if not resultado:
+        if empleados.buscar(dni_empleado) is None:
             print("El DNI introducido no corresponde a ningún empleado.")
             return
 
+        # Primero se piden todos los cambios y después se aplican juntos: o se
+        # modifican todos los datos o ninguno
+        cambios = {}
         comprobacion_tlf = input("¿Quiere modificar el teléfono del empleado? (S sí, N no): ")
         if (comprobacion_tlf == "S" or comprobacion_tlf == "s"):
-            tlf = input("Introduzca el nuevo teléfono: ")
-            # se ejecutan los triggers correspondientes de formato de tlf y dni
-            cursor.execute("UPDATE empleado SET telefono = :tlf WHERE dni = :dni", {"tlf": tlf, "dni": dni_empleado})
-            conn.commit()
-        
+            cambios["telefono"] = input("Introduzca el nuevo teléfono: ")
+
         comprobacion_nombre = input("¿Quiere modificar el nombre del empleado? (S sí, N no): ")
         if (comprobacion_nombre == "S" or comprobacion_nombre == "s"):
-            nombre = input("Introduzca el nuevo nombre: ")
-            cursor.execute("UPDATE empleado SET nombre = :nombre WHERE dni = :dni", {"nombre": nombre, "dni": dni_empleado})
-            conn.commit()
-        
+            cambios["nombre"] = input("Introduzca el nuevo nombre: ")
+
         comprobacion_apellido = input("¿Quiere modificar el apellido del empleado? (S sí, N no): ")
         if (comprobacion_apellido == "S" or comprobacion_apellido == "s"):
-            apellido = input("Introduzca el nuevo apellido: ")
-            cursor.execute("UPDATE empleado SET apellido = :apellido WHERE dni = :dni", {"apellido": apellido, "dni": dni_empleado})
-            conn.commit()
-        
+            cambios["apellido"] = input("Introduzca el nuevo apellido: ")
+
         comprobacion_salario = input("¿Quiere modificar el salario del empleado? (S sí, N no): ")
         if (comprobacion_salario == "S" or comprobacion_salario == "s"):
-            salario = input("Introduzca el nuevo salario: ")
-            # se ejecutá el trigger correspondiente al salario
-            cursor.execute("UPDATE empleado SET salario = :salario WHERE dni = :dni", {"salario": salario, "dni": dni_empleado})
-            conn.commit()
+            cambios["salario"] = input("Introduzca el nuevo salario: ")
+
+        if not cambios:
+            print("No se ha modificado ningún dato")
+            return
 
+        empleados.modificar(dni_empleado, **cambios)
         print("Se han modificado los datos del empleado")
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")    
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
 #----------------------------------------------------------------------------------------
 
 def listar_empleados(conn):
-    cursor = conn.cursor()
-
-    # Verificar si el usuario es jefe
-    dni_jefe = input("Introduzca su DNI (jefe): ")
-    cursor.execute("SELECT cargo FROM empleado WHERE dni = :dni", {"dni": dni_jefe})
-    resultado = cursor.fetchone()
-    if not resultado or resultado[0] != 'JEFE':
-        print("Solo un empleado con cargo JEFE puede realizar esta acción.")
+    # Verificar si el usuario es jefe (en memoria, con la sesión iniciada)
+    if requiere_jefe(conn) is None:
         return
-    
+
     cargo = input("Introduzca el cargo por el que quiere filtrar (JEFE, REPARTIDOR). Si quiere verlos todos, introduzca -1: ")
     salario = input("Introduzca el salario a partir del cual quiere filtrar. Si quiere verlos todos, introduzca -1: ")
-    
-    if cargo == "-1" and salario == "-1":
-        # Mostrar todos los empleados
-        cursor.execute("""
-        SELECT *
-        FROM empleado
-        ORDER BY empleado.apellido
-        """)
-    elif cargo == "-1":
-        # Mostrar los empleados con un salario mayor que "salario"
-        cursor.execute("""
-        SELECT *
-        FROM empleado
-        WHERE salario > :salario
-        ORDER BY empleado.apellido
-        """, {"salario": float(salario)})
-    elif salario == "-1": 
-        # Mostrar los empleados con un cargo particular
-        cursor.execute("""
-        SELECT *
-        FROM empleado
-        WHERE cargo = :cargo
-        ORDER BY empleado.apellido
-        """, {"cargo": cargo})
-    else:
-        # Mostrar los empleados con un cargo particular y un salario mayor que "salario"
-        cursor.execute("""
-        SELECT *
-        FROM empleado
-        WHERE cargo = :cargo AND salario > :salario
-        ORDER BY empleado.apellido
-        """, {"cargo": cargo, "salario": salario})
-    
+
+    try:
+        empleados = ServicioEmpleados(conn).listar(cargo=None if cargo == "-1" else cargo,
+                                                   salario_minimo=None if salario == "-1" else float(salario))
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
+        return
+
     # Mostrar los resultados
     print ("\n\t DNI | Nombre | Apellido | Cargo | Telefono | Num_SS | Salario")
-    for row in cursor:
-        print("\t", row)
+    for empleado in empleados:
+        print("\t", tuple(empleado))
 
 #----------------------------------------------------------------------------------------
 
 def reporta_incidencia(conn):
-    cursor = conn.cursor()
-
-    # Verificar si el empleado existe en la base de datos
-    dni = input("Introduzca su DNI: ")
-    cursor.execute("SELECT * FROM empleado WHERE dni = :dni", {"dni": dni})
-    resultado = cursor.fetchone()
-    if not resultado:
-        print("El DNI introducido no corresponde a ningún empleado.")
+    # El empleado que reporta es el de la sesión iniciada
+    sesion_empleado = obtener_sesion(conn)
+    if sesion_empleado is None:
         return
 
-    cursor.execute("""
-    SELECT COUNT(*)
-    FROM incidencia
-    """
-    )
-    id_incidencia = cursor.fetchone()[0]+1
-    descripcion = input("Describa lo ocurrido: ")    
-
-    cursor.execute("INSERT INTO incidencia VALUES (:1, SYSDATE, :2)", (id_incidencia, descripcion))
-    cursor.execute("INSERT INTO reporta VALUES(:1, :2)", (dni, id_incidencia))
-    conn.commit()
+    descripcion = input("Describa lo ocurrido: ")
+    try:
+        id_incidencia = ServicioEmpleados(conn).reportar_incidencia(sesion_empleado.dni, descripcion)
+        print("Incidencia registrada con identificador", id_incidencia)
+    except bd.DatabaseError as e:
+        mostrar_error(e)
 
 
 #========================================================================================
@@ -1686,202 +1667,123 @@ def reporta_incidencia(conn):
 # DAR DE ALTA A UN PROVEEDOR
 
 def dar_de_alta_proveedor(conn):
+    cif = input("CIF: ")
+    # un disparador comprueba el formato del correo
+    correo = input("Correo electronico: ")
+    telefono = input("Telefono: ")
+    nombre = input("Nombre: ")
 
-    try: 
-        cursor = conn.cursor()
-
-        cif = input("CIF: ")
-        # un disparador comprueba el formato del correo
-        correo = input("Correo electronico: ")
-        telefono = input("Telefono: ")
-        nombre = input("Nombre: ")
-        cursor.execute("INSERT INTO proveedor (cif, correo, telefono, nombre) VALUES (:1, :2, :3, :4)", (cif, correo, telefono, nombre))
-        
+    try:
+        ServicioProveedores(conn).alta(cif, correo, telefono, nombre)
         print("Se ha dado de alta al proveedor")
-        conn.commit()
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
 #----------------------------------------------------------------------------------------
 # DAR DE BAJA A UN PROVEEDOR
 
 def dar_de_baja_proveedor(conn):
-
+    cif = input("Introduzca el CIF del proveedor que desea que sea borrado: ")
     try:
-        cursor = conn.cursor()
-        cif = input("Introduzca el CIF del proveedor que desea que sea borrado: ")
-        
-        # de la propia existencia del CIF se encarga la sentencia DELETE de SQL
-        # un disparador debería comprobar que no existan pedidos activos de dicho proveedor
-        # pero está comentado, no logré que funcionara
-
-        cursor.execute("DELETE FROM asociado WHERE cif = :cif", {"cif":cif})
-        cursor.execute("DELETE FROM proveedor WHERE cif = :cif", {"cif":cif})
-        conn.commit()
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
+        ServicioProveedores(conn).baja(cif)
+        print("Se ha dado de baja al proveedor")
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
 #----------------------------------------------------------------------------------------
 # LISTADO POR CIF SIN PEDIDOS
 
 def listado_por_cif_sin_pedidos(conn):
-
-    cursor = conn.cursor()
     cif = input("Introduzca CIF del proveedor (si quiere verlos todos, introduzca -1): ")
+    try:
+        proveedores = ServicioProveedores(conn).listar(None if cif == "-1" else cif)
+    except bd.DatabaseError as e:
+        mostrar_error(e)
+        return
 
-    if cif == "-1":
-        cursor.execute("""
-        SELECT p.cif, p.correo, p.telefono, p.nombre
-        FROM proveedor p
-        ORDER BY p.nombre
-        """)
-    else:
-        cursor.execute("""
-        SELECT p.cif, p.correo, p.telefono, p.nombre
-        FROM proveedor p
-        WHERE p.cif = :cif
-        """, {"cif": cif})
-    
     # Mostrar los resultados
     print ("\n\t CIF | CORREO | TELÉFONO | NOMBRE")
-    for row in cursor:
-        print("\t", row)
+    for proveedor in proveedores:
+        print("\t", tuple(proveedor))
 
 #----------------------------------------------------------------------------------------
 # LISTADO POR CIF CON PEDIDOS
 
 def listado_por_cif_con_pedidos(conn):
-
-    cursor = conn.cursor()
     cif = input("Introduzca CIF del proveedor (si quiere verlos todos, introduzca -1): ")
+    try:
+        pedidos = ServicioProveedores(conn).listar_pedidos(None if cif == "-1" else cif)
+    except bd.DatabaseError as e:
+        mostrar_error(e)
+        return
 
-    if cif == "-1":
-        cursor.execute("""
-        SELECT p.cif, p.correo, p.telefono, p.nombre, pp.id, pp.estado, pp.fecha
-        FROM proveedor p
-        JOIN asociado a ON a.cif = p.cif
-        JOIN pedido_proveedor pp ON a.id = pp.id
-        ORDER BY p.nombre
-        """)
-    else:
-        cursor.execute("""
-        SELECT p.cif, p.correo, p.telefono, p.nombre, pp.id, pp.estado, pp.fecha
-        FROM proveedor p
-        JOIN asociado a ON a.cif = p.cif
-        JOIN pedido_proveedor pp ON a.id = pp.id
-        WHERE p.cif = :cif
-        ORDER BY pp.id
-        """, {"cif": cif})
-    
     # Mostrar los resultados
     print ("\n\t CIF | CORREO | TELÉFONO | NOMBRE | ID_PEDIDO | ESTADO | FECHA")
-    for row in cursor:
-        print("\t", row)
+    for pedido in pedidos:
+        print("\t", tuple(pedido))
 
 #----------------------------------------------------------------------------------------
 # HACER PEDIDO A UN PROVEEDOR
 
 def hacer_pedido(conn):
+    # Verificar si el usuario es jefe (en memoria, con la sesión iniciada)
+    sesion_jefe = requiere_jefe(conn)
+    if sesion_jefe is None:
+        return
 
-    try:
-        
-        cursor = conn.cursor()
+    cif = input("CIF: ")
 
-        dni = input("Introduzca dni (JEFE): ")
-        # Verificar si el usuario es jefe
-        cursor.execute("SELECT cargo FROM empleado WHERE dni = :dni", {"dni": dni})
-        resultado = cursor.fetchone()
+    # Las líneas se piden todas antes de ir a la BD
+    lineas = []
+    cod_prod = 1
+    while (cod_prod != "-1"):
 
-        if not resultado or resultado[0] != 'JEFE':
-            print("Solo un empleado con cargo JEFE puede realizar esta acción.")
-            return
+        aniadir = input ("Decida como añadir el producto: \na) Por nombre\nb) Por código\n---> ")
+        while (aniadir != 'a' and aniadir != 'b'):
+            aniadir = input ("Decida como añadir el producto: \na) Por nombre\nb) Por código\n---> ")
 
-        cif = input("CIF: ")
-        cursor.execute("SELECT MAX(id) + 1 FROM pedido_proveedor")
-        id_pedido = cursor.fetchone()[0]
-        estado = 'ACTIVO'
+        if (aniadir == 'a'):
 
-        cursor.execute("INSERT INTO pedido_proveedor (id, estado, fecha) VALUES (:1, :2, SYSDATE)", (id_pedido, estado))
-        cursor.execute("INSERT INTO asociado (cif, id) VALUES (:1, :2)", (cif, id_pedido))
-        cursor.execute("INSERT INTO hace (id, dni) VALUES (:1, :2)", (id_pedido, dni))
+            nombre = input("Introduzca el nombre del producto: ")
+            cantidad = pedir_entero("Cantidad del producto: ")
+            while (cantidad <= 0): cantidad = pedir_entero("Introduzca cantidad positiva: ")
+            cod = catalogo.codigo_viveres(conn, nombre)
+            if cod :
+                lineas.append((cod, cantidad))
+            else :
+                print ("Producto no encontrado")
 
-        cod_prod = 1
-        while (cod_prod != "-1"):
+        elif (aniadir == 'b'):
 
-            aniadir = input ("Decida como añadir el producto: \na) Por nombre\nb) Por código\n---> ")
-            while (aniadir != 'a' and aniadir != 'b'):
-                aniadir = input ("Decida como añadir el producto: \na) Por nombre\nb) Por código\n---> ")
-
-            if (aniadir == 'a'):
-                
-                nombre = input("Introduzca el nombre del producto: ")
-                cantidad = int( input("Cantidad del producto: "))
-                while (cantidad <= 0): cantidad = int(input("Introduzca cantidad positiva: "))
-                cursor.execute("SELECT codigo FROM viveres WHERE nombre = :nombre ", {"nombre": nombre})
-                cod_prod = cursor.fetchone()
-                if cod_prod :
-                    cod = cod_prod[0]
-                    # disparador comprueba que el producto existe
-                    cursor.execute("INSERT INTO tiene (id, codigo, cantidad) VALUES (:1, :2, :3)",(id_pedido, cod, cantidad))
-                else :
-                    print ("Producto no encontrado")
-
-            elif (aniadir == 'b'):
-
-                cod_prod = input("Introduzca el código del producto: ")
-                cantidad = int( input("Cantidad del producto: "))
-                while (cantidad < 0): cantidad = int(input("Introduzca cantidad positiva: "))
-                # disparador comprueba que el producto existe
-                cursor.execute("INSERT INTO tiene (id, codigo, cantidad) VALUES (:1, :2, :3)",(id_pedido, cod_prod, cantidad))
-
-            cod_prod = input ("Para salir introduzca -1, para seguir 0: ")
-        
+            # disparador comprueba que el producto existe
+            cod = pedir_entero("Introduzca el código del producto: ")
+            cantidad = pedir_entero("Cantidad del producto: ")
+            while (cantidad < 0): cantidad = pedir_entero("Introduzca cantidad positiva: ")
+            lineas.append((cod, cantidad))
+
+        cod_prod = input ("Para salir introduzca -1, para seguir 0: ")
+
+    try:
+        id_pedido = ServicioProveedores(conn).hacer_pedido(sesion_jefe.dni, cif, lineas)
         print ("Su pedido tiene identificador :", id_pedido)
-        conn.commit()
-        
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
-        
+    except bd.DatabaseError as e:
+        mostrar_error(e)
+
 
 #----------------------------------------------------------------------------------------
 # CANCELAR PEDIDO DE UN PROVEEDOR
 
 def cancelar_pedido(conn):
+    # Verificar si el usuario es jefe (en memoria, con la sesión iniciada)
+    if requiere_jefe(conn) is None:
+        return
 
+    identificador = pedir_entero("Identificador del pedido a cancelar: ")
     try:
-        
-        cursor = conn.cursor()
-
-        dni = input("Introduzca dni (JEFE): ")
-        # Verificar si el usuario es jefe
-        cursor.execute("SELECT cargo FROM empleado WHERE dni = :dni", {"dni": dni})
-        resultado = cursor.fetchone()
-
-        if not resultado or resultado[0] != 'JEFE':
-            print("Solo un empleado con cargo JEFE puede realizar esta acción.")
-            return
-       
-        identificador = input ("Identificador del pedido a cancelar: ")
-
-        # debe haber un disparador que comprueba que la fecha límite no se ha pasado (no se implementa)
-        # diparador comprueba que dicho pedido existe
-        
-        nuevo_estado = 'FINALIZADO'
-        cursor.execute("""
-        UPDATE pedido_proveedor
-        SET estado = :1
-        WHERE id = :2""", (nuevo_estado, identificador))
-        
-        conn.commit()
-        
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
+        ServicioProveedores(conn).cancelar_pedido(identificador)
+        print("Se ha cancelado el pedido")
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
 
 #========================================================================================
@@ -1890,140 +1792,84 @@ def cancelar_pedido(conn):
 #----------------------------------------------------------------------------------------
 #DAR DE ALTA USUARIO
 def dar_de_alta_usuario(conn):
-    try:
-        cursor = conn.cursor()
-        telefono = input("Telefono: ")
-        correo = input("Correo electronico: ")
-        nombre = input ("Nombre: ")
-        apellido = input ("Apellido: ")
-        
-        permiso = input("¿Está de acuerdo con que sus datos sean registrados en nuestra base de datos? (S/N)")
-        if (permiso == 'S' or permiso == 's'):
-            cursor.execute("INSERT INTO usuario (telefono, correo, nombre, apellido) VALUES (:1, :2, :3, :4)", (telefono, correo, nombre, apellido))
-            print ("Usuario registrado con éxito")
-            conn.commit()
+    telefono = input("Telefono: ")
+    correo = input("Correo electronico: ")
+    nombre = input ("Nombre: ")
+    apellido = input ("Apellido: ")
 
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
+    permiso = input("¿Está de acuerdo con que sus datos sean registrados en nuestra base de datos? (S/N)")
+    if (permiso != 'S' and permiso != 's'):
+        return
+
+    try:
+        ServicioPedidosOnline(conn).alta_usuario(telefono, correo, nombre, apellido)
+        print ("Usuario registrado con éxito")
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
 #----------------------------------------------------------------------------------------
 #DAR DE BAJA USUARIO
 def dar_de_baja_usuario(conn):
+    telefono = input("Telefono: ")
     try:
-        cursor = conn.cursor()
-        telefono = input("Telefono: ")
-        #disparador para comprobar que el teléfono está en la base de datos
         #aqui actúa un disparador para comprobar que no se borra un cliente con pedidos activos
-        cursor.execute("DELETE FROM usuario WHERE telefono = :telefono", {"telefono":telefono})
-        
+        ServicioPedidosOnline(conn).baja_usuario(telefono)
         print("Se ha eliminado el usuario")
-        conn.commit()
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
 #----------------------------------------------------------------------------------------
 #HACER PEDIDO ONLINE
 def hacer_pedido_online(conn):
-    try:
-        
-        cursor = conn.cursor()
-        telefono = input("Telefono: ")
-        direccion = input("Direccion: ")
-        cursor.execute("SELECT COUNT (*) FROM pedido")
-        id_pedido = cursor.fetchone()[0]+1
-        estado = "PENDIENTE"
-        cursor.execute("INSERT INTO pedido (id_pedido, estado, direccion) VALUES (:1, :2,:3)", (id_pedido,estado,direccion))
-        
+    telefono = input("Telefono: ")
+    direccion = input("Direccion: ")
+
+    lineas = []
+    cod_pro = pedir_entero("Codigo producto. Para salir pulse 0: ")
+    while (cod_pro != 0):
+        cantidad = pedir_entero("Introduzca cantidad positiva: ")
+        while (cantidad <0):
+            cantidad = pedir_entero("Introduzca cantidad positiva: ")
+        #disparador que controla que los productos existen
+        lineas.append((cod_pro, cantidad))
+        cod_pro = pedir_entero("Codigo producto. Para salir pulse 0: ")
 
-        cursor.execute("INSERT INTO realiza (telefono, id_pedido) VALUES (:1, :2)", (telefono, id_pedido))
+    try:
+        id_pedido = ServicioPedidosOnline(conn).hacer_pedido(telefono, direccion, lineas)
         print ("Su pedido tiene identificador :", id_pedido)
-        cod_pro = input ("Codigo producto. Para salir pulse 0: ")
-        
-        while (cod_pro != "0"):
-            #disparador que controla que los productos existen
-            cantidad = int(input("Introduzca cantidad positiva: "))
-            
-            while (cantidad <0):
-                cantidad = int(input("Introduzca cantidad positiva: "))
-            #disparador que controla que los productos existen
-            cursor.execute("INSERT INTO contiene (id_pedido, id_producto, cantidad) VALUES (:1, :2, :3)",(id_pedido, cod_pro, cantidad))
-            cod_pro = input ("Codigo producto. Para salir pulse 0: ")
-            
-
-        cursor.execute("""SELECT COUNT(*) FROM contiene WHERE (id_pedido = :id_pedido)""", {"id_pedido": id_pedido} )
-        if (cursor.fetchone()[0]==0):
-            conn.rollback()
-        else:
-            conn.commit()
-        
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
-        
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
 
 def listado_por_filtros(conn):
-    cursor = conn.cursor()
     cod_ped = input("Introduzca código pedido. Si no existe el pedido, no saldrá nada. Si quiere verlos todos, introduzca -1: ")
-    
-    if cod_ped == "-1":
-        # Mostrar todos los pedidos y los productos que contienen
-        cursor.execute("""
-        SELECT p.id_pedido, pr.nombre, pr.precio, c.cantidad
-        FROM pedido p
-        JOIN contiene c ON p.id_pedido = c.id_pedido
-        JOIN producto pr ON c.id_producto = pr.id_producto
-        ORDER BY p.id_pedido
-        """)
-    else:
-        # Mostrar un pedido específico y los productos que contiene
-        cursor.execute("""
-        SELECT p.id_pedido, pr.nombre, pr.precio, c.cantidad
-        FROM pedido p
-        JOIN contiene c ON p.id_pedido = c.id_pedido
-        JOIN producto pr ON c.id_producto = pr.id_producto
-        WHERE p.id_pedido = :cod_ped
-        ORDER BY p.id_pedido
-        """, {"cod_ped": int(cod_ped)})
-    
-    # Mostrar los resultados
-    for row in cursor:
+    try:
+        lineas = ServicioPedidosOnline(conn).listar(None if cod_ped == "-1" else int(cod_ped))
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
+        return
+
+    # Mostrar los resultados (nombre y precio desde la caché del catálogo)
+    for linea in lineas:
         print ("\tid_pedido|nombre_producto|precio|cantidad")
-        print("\t", row)
-    
-    
+        print("\t", (linea.id_pedido, linea.nombre, linea.precio, linea.cantidad))
+
+
 #----------------------------------------------------------------------------------------
 #ASIGNAR REPARTIDOR
 def asignar_repartidor(conn):
-    try:
-        cursor = conn.cursor()
-        dni= input("Introduza su DNI: ")
-         # Solicitar datos al usuario
-
-        # Verificar si el usuario es jefe
-        cursor.execute("SELECT cargo FROM empleado WHERE dni = :dni", {"dni": dni})
-        resultado = cursor.fetchone()
-
-        if not resultado or resultado[0] != 'JEFE':
-            print("Solo un empleado con cargo JEFE puede realizar esta acción.")
-            return
+    # Verificar si el usuario es jefe (en memoria, con la sesión iniciada)
+    if requiere_jefe(conn) is None:
+        return
 
-        dni_empleado = input("DNI repartidor: ")
-        #disparador que controle si corresponde a un repartidor
-        #disparador que compruebe si es empleado
-        #disparador que compruebe si existe el pedido
-        #disparador que compruebe que el pedido no tiene repartidores asignados
-        id_pedido = input("id_pedido: ")
-        cursor.callproc("comprobar_pedido", [id_pedido])
-        cursor.execute("INSERT INTO reparte(id_pedido,dni)VALUES (:1,:2)",(id_pedido,dni_empleado))
+    dni_empleado = input("DNI repartidor: ")
+    id_pedido = pedir_entero("id_pedido: ")
+    try:
+        ServicioPedidosOnline(conn).asignar_repartidor(id_pedido, dni_empleado)
         print ("el pedido " ,id_pedido, " será repartido por el empleado con dni " , dni_empleado)
-        conn.commit()
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
-        
+    except bd.DatabaseError as e:
+        mostrar_error(e)
+
 
 ############################################################################################
 #========================================================================================
@@ -2032,293 +1878,108 @@ def asignar_repartidor(conn):
 ############################################################################################
 
 def activar_mesa(conn):
+    # Para activar una mesa, solamente se debe meter el identificador de la mesa que se quiera activar
+    numero = pedir_entero("Por favor, introduzca el número de la mesa: ")
     try:
-        cursor = conn.cursor()
-
-        # Para activar una mesa, solamente se debe meter el identificador de la mesa que se quiera activar
-        numero = input("Por favor, introduzca el número de la mesa: ")
-
-        cursor.execute("""
-            UPDATE mesa
-            SET estado = 'OCUPADA'
-            WHERE id_mesa = :identif
-        """, {"identif": numero})
-
-        cursor.execute("""
-            SELECT COUNT (*)
-            FROM comanda
-        """)
-
-        numero_comanda = cursor.fetchone()[0]+1
-
-        cursor.execute("""
-            INSERT INTO comanda (id_comanda, id_mesa, estado, fecha_entrada)
-            VALUES (:1, :2, :3, SYSDATE)   
-        """, (numero_comanda, numero, 'ACTIVO'))
-
+        ServicioMesas(conn).activar(numero)
         print("Se ha activado la mesa correctamente")
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error en la base de datos: {error.message}")
-    
-    finally:
-        cursor.close()
-
-    # HACER DISPARADOR QUE IMPIDA QUE SE ACTIVE DOS MESAS OCUPADAS
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e, "Error en la base de datos")
 
 ############################################################################################
 
 def aniadir_pedido(conn):
+    # Añadir pedido funciona de la siguiente forma: se introduce el número de la mesa, el identificador de la comida que se vaya a tomar nota y
+    # el número de consumiciones de esta
+    numero_mesa = pedir_entero("Por favor, introduzca el número de la mesa: ")
+    comida = pedir_entero("Por favor, introduzca el ID de la comida: ")
+    n_cons = pedir_entero("Por favor, introduzca el número de consumiciones a pedir: ")
     try:
-        cursor = conn.cursor()
-
-        # Añadir pedido funciona de la siguiente forma: se introduce el número de la mesa, el identificador de la comida que se vaya a tomar nota y
-        # el número de consumiciones de esta
-
-        numero_mesa = input("Por favor, introduzca el número de la mesa: ")
-        comida = input("Por favor, introduzca el ID de la comida: ")
-        n_cons = input("Por favor, introduzca el número de consumiciones a pedir: ")
-
-        cursor.execute("""
-            SELECT id_comanda
-            FROM comanda
-            WHERE (id_mesa = :identif AND estado = 'ACTIVO')
-        """, {"identif": numero_mesa})
-
-        comprobador = cursor.fetchone()
-        if (comprobador is None):
-            print("No hay ninguna comanda activa en esta mesa")
-            return
-        
-        numero_comanda = comprobador[0]
-        cursor.execute("""
-            SELECT id_entrada, num_consumidores
-            FROM entrada_comanda NATURAL JOIN (SELECT * FROM formado_por WHERE id_producto = :identif_producto)
-            WHERE (id_mesa = :identif_mesa AND id_comanda = :identif_comanda)
-        """, {"identif_mesa": numero_mesa, "identif_comanda": numero_comanda, "identif_producto": comida})
-
-        resultado = cursor.fetchone()
- 
-        if (resultado is None):
-
-            cursor.execute("""
-                SELECT id_entrada
-                FROM entrada_comanda
-                WHERE id_entrada = (SELECT MAX(id_entrada) FROM entrada_comanda WHERE (id_mesa = :identif_mesa AND id_comanda = :identif_com))
-            """, {"identif_mesa": numero_mesa, "identif_com": numero_comanda})
-
-            comprobador = cursor.fetchone()
-            if (comprobador is None):
-                num_entrada = 1
-            else:
-                num_entrada = int(comprobador[0])+1
+        ServicioMesas(conn).aniadir(numero_mesa, comida, n_cons)
+        print("El pedido se ha añadido correctamente")
+    except bd.DatabaseError as e:
+        mostrar_error(e, "Error en la base de datos")
 
-            cursor.execute("""
-                INSERT INTO entrada_comanda (id_mesa, id_comanda, id_entrada, num_consumidores)
-                VALUES (:1, :2, :3, :4)
-            """, (numero_mesa, numero_comanda, num_entrada, n_cons))
+############################################################################################
 
-            cursor.execute("""
-                INSERT INTO formado_por (id_entrada, id_mesa, id_comanda, id_producto)
-                VALUES (:1, :2, :3, :4)
-            """, (num_entrada, numero_mesa, numero_comanda, comida))
-        
-        else:
-            num_entrada, num_cons_act = resultado
+def aniadir_varios_pedidos(conn):
+    numero_mesa = pedir_entero("Por favor, introduzca el número de la mesa: ")
 
-            cursor.execute("""
-                UPDATE entrada_comanda
-                SET num_consumidores = :nuevo_valor
-                WHERE (id_mesa = :identif_mesa AND id_comanda = :identif_com AND id_entrada = :identif_ent)
-            """, {"nuevo_valor": num_cons_act+int(n_cons), "identif_mesa": numero_mesa, "identif_com": numero_comanda, "identif_ent": num_entrada})
+    lineas = []
+    comida = pedir_entero("Por favor, introduzca el ID de la comida (0 para terminar): ")
+    while (comida != 0):
+        n_cons = pedir_entero("Por favor, introduzca el número de consumiciones a pedir: ")
+        lineas.append((comida, n_cons))
+        comida = pedir_entero("Por favor, introduzca el ID de la comida (0 para terminar): ")
 
-        print("El pedido se ha añadido correctamente")
+    if not lineas:
+        print("No se ha añadido ningún plato")
+        return
 
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error en la base de datos: {error.message}")
-    
-    finally:
-        cursor.close()
+    try:
+        num_productos = ServicioMesas(conn).aniadir_varios(numero_mesa, lineas)
+        print(f"Se han añadido {num_productos} productos a la comanda")
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e, "Error en la base de datos")
 
 ############################################################################################
 
 def eliminar_pedido(conn):
+    numero_mesa = pedir_entero("Por favor, introduzca el número de la mesa: ")
+    comida = pedir_entero("Por favor, introduzca el ID de la comida: ")
+    n_consumiciones = pedir_entero("Por favor, introduzca el número de consumiciones a eliminar: ")
     try:
-        cursor = conn.cursor()
-
-        numero_mesa = input("Por favor, introduzca el número de la mesa: ")
-        comida = input("Por favor, introduzca el ID de la comida: ")
-        n_consumiciones = input("Por favor, introduzca el número de consumiciones a eliminar: ")
-
-        cursor.execute("""
-            SELECT id_comanda
-            FROM comanda
-            WHERE (id_mesa = :identif AND estado = 'ACTIVO')
-        """, {"identif": numero_mesa})
-
-        comprobador = cursor.fetchone()
-        if (comprobador is None):
-            print("No hay ninguna comanda activa en esta mesa")
-            return
-        
-        numero_comanda = comprobador[0]
-
-        cursor.execute("""
-            SELECT id_entrada, num_consumidores
-            FROM entrada_comanda NATURAL JOIN (SELECT * FROM formado_por WHERE id_producto = :ident_prod)
-            WHERE (id_mesa = :identif_mesa AND id_comanda = :identif_comanda)
-        """, {"identif_mesa": numero_mesa, "identif_comanda": numero_comanda, "ident_prod": comida})
-
-        resultado = cursor.fetchone()
-
-        if (resultado is not None):
-            n_entrada, n_cons_act = resultado
-
-            cursor.execute("""
-                UPDATE entrada_comanda
-                SET num_consumidores = :nuevo_numero
-                WHERE (id_mesa = :ident_mesa AND id_comanda = :ident_com AND id_entrada = :ident_ent)
-            """, {"nuevo_numero": n_cons_act-int(n_consumiciones), "ident_mesa": numero_mesa, "ident_com": numero_comanda, "ident_ent": n_entrada})
-
-            print("Se ha eliminado correctamente el producto")
-
-        else:
-            print("Dicho producto no ha sido pedido")
+        ServicioMesas(conn).eliminar(numero_mesa, comida, n_consumiciones)
+        print("Se ha eliminado correctamente el producto")
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e, "Error en la base de datos")
 
     # HACER UN DISPARADOR QUE COMPRUEBE QUE CUANDO UN PEDIDO ES 0, BORRE LAS TUPLAS
 
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error en la base de datos: {error.message}")
-    
-    finally:
-        cursor.close()
-
 ############################################################################################
 
 def consultar_pedido(conn):
-    try:
-        cursor = conn.cursor()
-
-        numero = input("Por favor, introduzca el número de la mesa: ")
-        decision = input("¿Quiere ver todos los pedidos de esta mesa? (Marcar S/s para sí o N/n para ver solo el actual (si es posible)): ")
-
-        if (decision.upper() == 'S'):
-            cursor.execute("""
-                SELECT to_char(c.fecha_entrada, 'DD/MON/YYYY HH24:MI:SS'), c.id_mesa, c.id_comanda, e.id_entrada, e.num_consumidores, p.id_producto, p.nombre, p.precio
-                FROM comanda c
-                JOIN entrada_comanda e ON c.id_mesa = e.id_mesa and c.id_comanda = e.id_comanda
-                JOIN formado_por f ON e.id_mesa = f.id_mesa AND e.id_comanda = f.id_comanda AND e.id_entrada = f.id_entrada
-                JOIN producto p ON p.id_producto = f.id_producto
-                WHERE (c.id_mesa = :ident_mesa AND e.num_consumidores != 0)
-            """, {"ident_mesa": numero})
-
-        elif (decision.upper() == 'N'):
-            cursor.execute("""
-                SELECT to_char(c.fecha_entrada, 'DD/MON/YYYY HH24:MI:SS'), c.id_mesa, c.id_comanda, e.id_entrada, e.num_consumidores, p.id_producto, p.nombre, p.precio
-                FROM comanda c
-                JOIN entrada_comanda e ON c.id_mesa = e.id_mesa and c.id_comanda = e.id_comanda
-                JOIN formado_por f ON e.id_mesa = f.id_mesa AND e.id_comanda = f.id_comanda AND e.id_entrada = f.id_entrada
-                JOIN producto p ON p.id_producto = f.id_producto
-                WHERE (c.id_mesa = :ident_mesa AND c.estado = 'ACTIVO' AND e.num_consumidores != 0)
-            """, {"ident_mesa": numero})
+    numero = pedir_entero("Por favor, introduzca el número de la mesa: ")
+    decision = input("¿Quiere ver todos los pedidos de esta mesa? (Marcar S/s para sí o N/n para ver solo el actual (si es posible)): ")
+    if decision.upper() not in ('S', 'N'):
+        return
 
-        for row in cursor:
-            print(row)
+    try:
+        lineas = ServicioMesas(conn).consultar(numero, todas=decision.upper() == 'S')
+    except bd.DatabaseError as e:
+        mostrar_error(e, "Error en la base de datos")
+        return
 
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error en la base de datos: {error.message}")
-    
-    finally:
-        cursor.close()
+    # nombre y precio del producto salen de la caché del catálogo
+    for linea in lineas:
+        print(tuple(linea))
 
 ############################################################################################
 
 def solicitar_cuenta(conn):
+    numero_mesa = pedir_entero("Por favor, introduzca el número de la mesa solicitante de la cuenta: ")
     try:
-        cursor = conn.cursor()
-
-        numero_mesa = input("Por favor, introduzca el número de la mesa solicitante de la cuenta: ")
-
-        cursor.execute("""
-            SELECT id_comanda, to_char(fecha_entrada, 'DD/MON/YYYY HH24:MI:SS')
-            FROM comanda
-            WHERE (id_mesa = :identif AND estado = 'ACTIVO')
-        """, {"identif": numero_mesa})
+        recibo = ServicioMesas(conn).cuenta(numero_mesa)
+    except bd.DatabaseError as e:
+        mostrar_error(e, "Error en la base de datos")
+        return
 
-        comprobador = cursor.fetchone()
+    if (recibo is None):
+        print("No hay ninguna comanda activa para esta mesa")
+        return
 
-        if (comprobador is None):
-            print("No hay ninguna comanda activa para esta mesa")
-            return
-        
-        else:
-            numero_comanda, fecha = comprobador
-            print(fecha)
-            print(f"Recibo de la mesa {numero_mesa}")
-            print(f"ID recibo {numero_comanda}")
-
-            print("Nº \tNombre \t\tPrecio \tConsum. \tSubtotal")
-
-            cursor.execute("""
-                SELECT p.nombre, p.precio, e.num_consumidores
-                FROM entrada_comanda e
-                JOIN formado_por f ON e.id_mesa = f.id_mesa AND e.id_comanda = f.id_comanda AND e.id_entrada = f.id_entrada
-                JOIN producto p ON f.id_producto = p.id_producto
-                WHERE (e.id_mesa = :ident_mesa AND e.id_comanda = :ident_comanda AND e.num_consumidores != 0)
-            """, {"ident_mesa": numero_mesa, "ident_comanda": numero_comanda})
-
-            i = 1
-            importe_total = 0
-            for row in cursor:
-                num_tabs = len(row[0])/8
-                tabulacion = "\t" * (2-int(num_tabs))
-
-                print(f"{i} \t{row[0]}{tabulacion}{row[1]} \t{row[2]} \t\t{row[2]*row[1]}")
-                i+=1
-                importe_total+=row[2]*row[1]
-
-            print(f"\nTOTAL: {importe_total}")
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error en la base de datos: {error.message}")
-    
-    finally:
-        cursor.close()
+    print(recibo)
 
 ############################################################################################
 
 def registrar_pago(conn):
+    # Al registrar el pago de una mesa, tenemos que poner el identificador de la mesa que debe pagar
+    numero = pedir_entero("Por favor, introduzca el número de la mesa: ")
     try:
-        cursor = conn.cursor()
-
-        # Al registrar el pago de una mesa, tenemos que poner el identificador de la mesa que debe pagar
-        numero = input("Por favor, introduzca el número de la mesa: ")
-
-        cursor.execute("""
-            UPDATE mesa
-            SET estado = 'Disponible'
-            WHERE id_mesa = :identif
-        """, {"identif": numero})
-
-        cursor.execute("""
-            UPDATE comanda
-            SET estado = 'PAGADO'
-            WHERE (estado = 'ACTIVO' AND id_mesa = :identif)
-        """, {"identif": numero})
-
+        ServicioMesas(conn).registrar_pago(numero)
         print("El pago ha sido registrado correctamente")
-
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error en la base de datos: {error.message}")
-    
-    finally:
-        cursor.close()
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e, "Error en la base de datos")
 
 
 ############################################################################################
@@ -2328,307 +1989,134 @@ def registrar_pago(conn):
 ############################################################################################
 
 def crear_reserva(conn):
-    try:
-        cursor = conn.cursor()
-        
-        # Pedir datos al usuario
-        nombre = input("Nombre: ")
-        apellido = input("Apellido: ")
-        telefono = input("Teléfono: ")
-        fecha = input("Fecha (formato ejemplo 24-12-2003): ")
-        hora = input("Hora (formato HH:MM, ejemplo 14:30): ")
-        numero = input("Número de personas: ")
-        lugar = input("Dentro o fuera (0 o 1): ")
-        
-        # Validar permiso del usuario
-        permiso = input("¿Está de acuerdo con que sus datos sean registrados en nuestra base de datos? (S/N): ")
-        if permiso.upper() != 'S':
-            print("Debe aceptar los términos para realizar una reserva.")
-            return
-        
-        # Validar y transformar la fecha y hora
-        try:
-            # Validar fecha
-            fecha_formateada = datetime.datetime.strptime(fecha, "%d-%m-%Y").strftime("%d-%m-%Y")
-            
-            # Validar hora
-            hora_formateada = datetime.datetime.strptime(hora, "%H:%M").strftime("%H:%M")
-            
-            # Combinar fecha y hora
-            fecha_hora = f"{fecha_formateada} {hora_formateada}"
-        except ValueError:
-            print("La fecha o la hora ingresadas no son válidas. Asegúrate de usar los formatos DD-MM-YYYY y HH:MM.")
-            return
-        
-        # Validar número y lugar como enteros
-        try:
-            numero = int(numero)
-            lugar = int(lugar)
-        except ValueError:
-            print("Número de personas y lugar deben ser valores numéricos.")
-            return
-        
-        sql = """
-            INSERT INTO reserva (fecha, telefono, nombre, apellido, numero_personas, lugar) 
-            VALUES (TO_DATE(:fecha_hora, 'DD-MM-YYYY HH24:MI'), :telefono, :nombre, :apellido, :numero_personas, :lugar)
-        """
-        cursor.execute(sql, {
-            'fecha_hora': fecha_hora,
-            'telefono': telefono,
-            'nombre': nombre,
-            'apellido': apellido,
-            'numero_personas': numero,
-            'lugar': lugar
-        })
-        conn.commit()
-        print("Reserva creada con éxito.")
-    
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error en la base de datos: {error.message}")
-    
-    finally:
-        cursor.close()
+    # Pedir datos al usuario
+    nombre = input("Nombre: ")
+    apellido = input("Apellido: ")
+    telefono = input("Teléfono: ")
+    fecha = input("Fecha (formato ejemplo 24-12-2003): ")
+    hora = input("Hora (formato HH:MM, ejemplo 14:30): ")
+    numero = input("Número de personas: ")
+    lugar = input("Dentro o fuera (0 o 1): ")
+
+    # Validar permiso del usuario
+    permiso = input("¿Está de acuerdo con que sus datos sean registrados en nuestra base de datos? (S/N): ")
+    if permiso.upper() != 'S':
+        print("Debe aceptar los términos para realizar una reserva.")
+        return
 
+    fecha_hora = leer_fecha_hora(fecha, hora)
+    if fecha_hora is None:
+        return
 
-def modificar_reserva(conn):
+    # Validar número y lugar como enteros
     try:
-        cursor = conn.cursor()
-        telefono = input("Teléfono: ")
-        fecha = input("Fecha (formato ejemplo 24-12-2003): ")
-        hora = input("Hora (formato HH:MM, ejemplo 14:30): ")
-        # Validar y transformar la fecha y hora
-        try:
-            # Validar fecha
-            fecha_formateada = datetime.datetime.strptime(fecha, "%d-%m-%Y").strftime("%d-%m-%Y")
-            
-            # Validar hora
-            hora_formateada = datetime.datetime.strptime(hora, "%H:%M").strftime("%H:%M")
-            
-            # Combinar fecha y hora
-            fecha_hora = f"{fecha_formateada} {hora_formateada}"
-        except ValueError:
-            print("La fecha o la hora ingresadas no son válidas. Asegúrate de usar los formatos DD-MM-YYYY y HH:MM.")
-            return
-        
-        comprobacion_nombre = input("¿Quiere modificar el nombre asociado a la reserva? (S sí, N no): ")
-        if comprobacion_nombre.lower() == "s":
-            nombre = input("Introduzca el nuevo nombre: ")
-            cursor.execute("""
-            UPDATE reserva
-            SET nombre = :nuevo_nombre
-            WHERE telefono = :telefono AND fecha = TO_DATE(:fecha_hora_formateada, 'DD-MM-YYYY HH24:MI')
-            """, {
-                "nuevo_nombre": nombre,
-                "telefono": telefono,
-                "fecha_hora_formateada": fecha_hora
-            })
-
-        comprobacion_apellido = input("¿Quiere modificar el apellido asociado a la reserva? (S sí, N no): ")
-        if comprobacion_apellido.lower() == "s":
-            apellido_nuevo = input("Introduzca el nuevo apellido: ")
-            cursor.execute("""
-            UPDATE reserva
-            SET apellido = :apellido_nuevo
-            WHERE telefono = :telefono AND fecha = TO_DATE(:fecha_hora_formateada, 'DD-MM-YYYY HH24:MI')
-            """, {
-                "apellido_nuevo": apellido_nuevo,
-                "telefono": telefono,
-                "fecha_hora_formateada": fecha_hora
-            })
-
-        comprobacion_num_personas = input("¿Quiere modificar el num_personas asociado a la reserva? (S sí, N no): ")
-        if comprobacion_num_personas.lower() == "s":
-            num_personas_nuevo = input("Introduzca el nuevo num_personas: ")
-            cursor.execute("""
-            UPDATE reserva
-            SET numero_personas = :num_personas_nuevo
-            WHERE telefono = :telefono AND fecha = TO_DATE(:fecha_hora_formateada, 'DD-MM-YYYY HH24:MI')
-            """, {
-                "num_personas_nuevo": num_personas_nuevo,
-                "telefono": telefono,
-                "fecha_hora_formateada": fecha_hora
-            })
-
-        conn.commit()
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error: {error.message}")
+        numero = int(numero)
+        lugar = int(lugar)
+    except ValueError:
+        print("Número de personas y lugar deben ser valores numéricos.")
+        return
 
-def anular_reserva(conn):
     try:
-        cursor = conn.cursor()
+        ServicioReservas(conn).crear(fecha_hora, telefono, nombre, apellido, numero, lugar)
+        print("Reserva creada con éxito.")
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e, "Error en la base de datos")
 
-        # Solicitar datos al usuario
-        telefono = input("Introduzca el número de teléfono asociado a la reserva: ").strip()
-        fecha = input("Introduzca la fecha de la reserva (formato DD-MM-YYYY): ").strip()
-        hora = input("Hora (formato HH:MM, ejemplo 14:30): ").strip()
 
-        # Validar y transformar la fecha y hora
-        try:
-            fecha_formateada = datetime.datetime.strptime(fecha, "%d-%m-%Y").strftime("%d-%m-%Y")
-            hora_formateada = datetime.datetime.strptime(hora, "%H:%M").strftime("%H:%M")
-            fecha_hora = f"{fecha_formateada} {hora_formateada}"
-        except ValueError:
-            print("La fecha o la hora ingresadas no son válidas. Asegúrate de usar los formatos DD-MM-YYYY y HH:MM.")
-            return
+def modificar_reserva(conn):
+    telefono = input("Teléfono: ")
+    fecha = input("Fecha (formato ejemplo 24-12-2003): ")
+    hora = input("Hora (formato HH:MM, ejemplo 14:30): ")
+    fecha_hora = leer_fecha_hora(fecha, hora)
+    if fecha_hora is None:
+        return
 
-        # Confirmar que la reserva existe
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM reserva
-            WHERE telefono = :telefono AND fecha = TO_DATE(:fecha_hora, 'DD-MM-YYYY HH24:MI')
-        """, {"telefono": telefono, "fecha_hora": fecha_hora})
+    cambios = {}
+    comprobacion_nombre = input("¿Quiere modificar el nombre asociado a la reserva? (S sí, N no): ")
+    if comprobacion_nombre.lower() == "s":
+        cambios["nombre"] = input("Introduzca el nuevo nombre: ")
 
-        if cursor.fetchone()[0] == 0:
-            print("La reserva no existe. Verifique los datos ingresados.")
-            return
+    comprobacion_apellido = input("¿Quiere modificar el apellido asociado a la reserva? (S sí, N no): ")
+    if comprobacion_apellido.lower() == "s":
+        cambios["apellido"] = input("Introduzca el nuevo apellido: ")
 
-        # Eliminar la reserva
-        cursor.execute("""
-            DELETE FROM encargado_de
-            WHERE tlf = :telefono AND fecha = TO_DATE(:fecha_hora, 'DD-MM-YYYY HH24:MI')
-        """, {"telefono": telefono, "fecha_hora": fecha_hora})
+    comprobacion_num_personas = input("¿Quiere modificar el num_personas asociado a la reserva? (S sí, N no): ")
+    if comprobacion_num_personas.lower() == "s":
+        cambios["numero_personas"] = pedir_entero("Introduzca el nuevo num_personas: ")
 
-        cursor.execute("""
-            DELETE FROM reserva
-            WHERE telefono = :telefono AND fecha = TO_DATE(:fecha_hora, 'DD-MM-YYYY HH24:MI')
-        """, {"telefono": telefono, "fecha_hora": fecha_hora})
+    try:
+        ServicioReservas(conn).modificar(telefono, fecha_hora, **cambios)
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e)
 
-        conn.commit()
+def anular_reserva(conn):
+    # Solicitar datos al usuario
+    telefono = input("Introduzca el número de teléfono asociado a la reserva: ").strip()
+    fecha = input("Introduzca la fecha de la reserva (formato DD-MM-YYYY): ").strip()
+    hora = input("Hora (formato HH:MM, ejemplo 14:30): ").strip()
+    fecha_hora = leer_fecha_hora(fecha, hora)
+    if fecha_hora is None:
+        return
+
+    try:
+        ServicioReservas(conn).anular(telefono, fecha_hora)
         print("Reserva anulada con éxito.")
-    
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error al anular la reserva: {error.message}")
-        conn.rollback()
-    
-    finally:
-        cursor.close()
+    except (bd.DatabaseError, ValueError) as e:
+        mostrar_error(e, "Error al anular la reserva")
 
 def asignar_empleado(conn):
-    try:
-        cursor = conn.cursor()
-        
-        # Solicitar datos al usuario
-        dni_jefe = input("Introduzca el DNI del USUARIO REALIZANDO LA ASIGNACION: ").strip()
+    # Verificar si el usuario es jefe (en memoria, con la sesión iniciada)
+    if requiere_jefe(conn) is None:
+        return
 
-        # Verificar si el usuario es jefe
-        cursor.execute("SELECT cargo FROM empleado WHERE dni = :dni", {"dni": dni_jefe})
-        resultado = cursor.fetchone()
+    telefono = input("Introduzca el número de teléfono asociado a la reserva: ").strip()
+    fecha = input("Introduzca la fecha de la reserva (formato DD-MM-YYYY): ").strip()
+    hora = input("Hora (formato HH:MM, ejemplo 14:30): ").strip()
+    dni_empleado = input("Introduzca el DNI del empleado a asignar: ").strip()
+    fecha_hora = leer_fecha_hora(fecha, hora)
+    if fecha_hora is None:
+        return
 
-        if not resultado or resultado[0] != 'JEFE':
-            print("Solo un empleado con cargo JEFE puede realizar esta acción.")
-            return
+    try:
+        ServicioReservas(conn).asignar_empleado(telefono, fecha_hora, dni_empleado)
+        print("Empleado asignado correctamente.")
+    except bd.DatabaseError as e:
+        mostrar_error(e, "Error al asignar empleado")
 
-        telefono = input("Introduzca el número de teléfono asociado a la reserva: ").strip()
-        fecha = input("Introduzca la fecha de la reserva (formato DD-MM-YYYY): ").strip()
-        hora = input("Hora (formato HH:MM, ejemplo 14:30): ").strip()
-        dni_empleado = input("Introduzca el DNI del empleado a asignar: ").strip()
+def listado_reserva(conn):
+    # Pedir al usuario si quiere filtrar por teléfono
+    filtro_telefono = input("¿Desea filtrar por teléfono? (S/N): ").strip().upper()
 
-        
-        # Validar y transformar la fecha y hora
-        try:
-            # Validar fecha
-            fecha_formateada = datetime.datetime.strptime(fecha, "%d-%m-%Y").strftime("%d-%m-%Y")
-            
-            # Validar hora
-            hora_formateada = datetime.datetime.strptime(hora, "%H:%M").strftime("%H:%M")
-            
-            # Combinar fecha y hora
-            fecha_hora = f"{fecha_formateada} {hora_formateada}"
-        except ValueError:
-            print("La fecha o la hora ingresadas no son válidas. Asegúrate de usar los formatos DD-MM-YYYY y HH:MM.")
+    if filtro_telefono == 'N':
+        filtro_telefono_fecha = input("¿Desea filtrar por teléfono Y fecha? (S/N): ").strip().upper()
+    else:
+        filtro_telefono_fecha = 'N'
+
+    telefono = None
+    fecha_hora = None
+    if filtro_telefono == 'S':
+        telefono = input("Introduzca el número de teléfono: ")
+    elif filtro_telefono_fecha == 'S':
+        telefono = input("Introduzca el número de teléfono: ")
+        fecha = input("Fecha (formato ejemplo 24-12-2003): ")
+        hora = input("Hora (formato HH:MM, ejemplo 14:30): ")
+        fecha_hora = leer_fecha_hora(fecha, hora)
+        if fecha_hora is None:
             return
-        # Intentar la inserción en la tabla encargado_de
-        cursor.execute("""
-            INSERT INTO encargado_de (dni_empleado, fecha, tlf)
-            VALUES (:dni_empleado, TO_DATE(:fecha, 'DD-MM-YYYY HH24:MI'), :telefono)
-        """, {"dni_empleado": dni_empleado, "fecha": fecha_hora, "telefono": telefono})
-        
-        # Confirmar cambios
-        conn.commit()
-        print("Empleado asignado correctamente.")
-    
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error al asignar empleado: {error.message}")
-        conn.rollback()
-    finally:
-        cursor.close()
 
-def listado_reserva(conn):
     try:
-        cursor = conn.cursor()
-        # Pedir al usuario si quiere filtrar por teléfono
-        filtro_telefono = input("¿Desea filtrar por teléfono? (S/N): ").strip().upper()
-        
-        if filtro_telefono == 'N':
-            filtro_telefono_fecha = input("¿Desea filtrar por teléfono Y fecha? (S/N): ").strip().upper()
-        else:
-            filtro_telefono_fecha = 'N'
-
-        if filtro_telefono == 'S':
-            telefono = input("Introduzca el número de teléfono: ")
-            # Consulta con filtro por teléfono
-            cursor.execute("""
-                SELECT r.fecha, r.telefono, r.nombre, r.apellido, r.numero_personas, 
-                       r.lugar, e.dni_empleado
-                FROM reserva r
-                LEFT JOIN encargado_de e ON r.fecha = e.fecha AND r.telefono = e.tlf
-                WHERE r.telefono = :telefono
-                ORDER BY r.fecha
-            """, {"telefono": telefono})
-        elif filtro_telefono_fecha == 'S':
-            telefono = input("Introduzca el número de teléfono: ")
-            fecha = input("Fecha (formato ejemplo 24-12-2003): ")
-            hora = input("Hora (formato HH:MM, ejemplo 14:30): ")
-            # Validar y transformar la fecha y hora
-            try:
-                # Validar fecha
-                fecha_formateada = datetime.datetime.strptime(fecha, "%d-%m-%Y").strftime("%d-%m-%Y")
-                
-                # Validar hora
-                hora_formateada = datetime.datetime.strptime(hora, "%H:%M").strftime("%H:%M")
-                
-                # Combinar fecha y hora
-                fecha_hora = f"{fecha_formateada} {hora_formateada}"
-            except ValueError:
-                print("La fecha o la hora ingresadas no son válidas. Asegúrate de usar los formatos DD-MM-YYYY y HH:MM.")
-                return
-            cursor.execute("""
-            SELECT r.fecha, r.telefono, r.nombre, r.apellido, r.numero_personas, 
-                r.lugar, e.dni_empleado
-            FROM reserva r
-            LEFT JOIN encargado_de e ON r.fecha = e.fecha AND r.telefono = e.tlf
-            WHERE r.telefono = :telefono AND r.fecha = TO_DATE(:fecha, 'DD-MM-YYYY HH24:MI')
-            ORDER BY r.fecha
-            """, {"telefono": telefono, "fecha": fecha_hora})
+        reservas = ServicioReservas(conn).listar(telefono, fecha_hora)
+    except bd.DatabaseError as e:
+        mostrar_error(e, "Error al listar reservas")
+        return
 
-        else:
-            # Consulta sin filtro
-            cursor.execute("""
-                SELECT r.fecha, r.telefono, r.nombre, r.apellido, r.numero_personas, 
-                       r.lugar, e.dni_empleado
-                FROM reserva r
-                LEFT JOIN encargado_de e ON r.fecha = e.fecha AND r.telefono = e.tlf
-                ORDER BY r.fecha
-            """)
-
-        # Imprimir resultados
-        print("\nListado de Reservas:")
-        print("Fecha | Teléfono | Nombre | Apellido | Número de Personas | Lugar | DNI Empleado Encargado")
-        print("-" * 80)
-        for row in cursor:
-            fecha, telefono, nombre, apellido, num_personas, lugar, dni_encargado = row
-            lugar_str = "Dentro" if lugar == 0 else "Fuera"
-            print(f"{fecha} | {telefono} | {nombre} | {apellido} | {num_personas} | {lugar_str} | {dni_encargado or 'N/A'}")
-    
-    except oracledb.DatabaseError as e:
-        error, = e.args
-        print(f"Error al listar reservas: {error.message}")
-    finally:
-        cursor.close()
+    # Imprimir resultados
+    print("\nListado de Reservas:")
+    print("Fecha | Teléfono | Nombre | Apellido | Número de Personas | Lugar | DNI Empleado Encargado")
+    print("-" * 80)
+    for reserva in reservas:
+        lugar_str = "Dentro" if reserva.lugar == 0 else "Fuera"
+        print(f"{reserva.fecha} | {reserva.telefono} | {reserva.nombre} | {reserva.apellido} | {reserva.numero_personas} | {lugar_str} | {reserva.dni_encargado or 'N/A'}")
 
 
 #========================================================================================
@@ -2656,7 +2144,8 @@ def gestion_empleado(conn):
         elif opcion == '5':
             reporta_incidencia(conn)
         elif opcion =='6':
-            conn.commit()
+            # Se confirman las operaciones de mesa que queden pendientes
+            confirmar_pendientes(conn)
             return
         else:
             print("Opción no válida.")
@@ -2686,7 +2175,8 @@ def gestion_proveedor(conn):
         elif opcion == '6':
             cancelar_pedido(conn)
         elif opcion =='7':
-            conn.commit()
+            # Se confirman las operaciones de mesa que queden pendientes
+            confirmar_pendientes(conn)
             return
         else:
             print("Opción no válida.")
@@ -2713,7 +2203,8 @@ def gestion_pedidos_online(conn):
         elif opcion == '5':
             asignar_repartidor(conn)
         elif opcion == '6':
-            conn.commit()
+            # Se confirman las operaciones de mesa que queden pendientes
+            confirmar_pendientes(conn)
             return
         else:
             print("Opción no válida.")
@@ -2728,7 +2219,8 @@ def gestion_mesas(conn):
         print("4. Consultar pedido")
         print("5. Solicitar cuenta")
         print("6. Registrar pago")
-        print("7. Salir")
+        print("7. Aniadir varios platos")
+        print("8. Salir")
         opcion = input("Seleccione una opción: ")
         if opcion == '1':
             activar_mesa(conn)
@@ -2743,7 +2235,10 @@ def gestion_mesas(conn):
         elif opcion == '6':
             registrar_pago(conn)
         elif opcion == '7':
-            conn.commit()
+            aniadir_varios_pedidos(conn)
+        elif opcion == '8':
+            # Se confirman las operaciones de mesa que queden pendientes
+            confirmar_pendientes(conn)
             return
         else:
             print("Opción no válida.")
@@ -2770,7 +2265,8 @@ def gestion_reservas(conn):
         elif opcion == '5':
             listado_reserva(conn)
         elif opcion == '6':
-            conn.commit()
+            # Se confirman las operaciones de mesa que queden pendientes
+            confirmar_pendientes(conn)
             return
         else:
             print("Opción no válida.")
@@ -2893,7 +2389,7 @@ def mostrar_tablas(conn):
             print(row)
         
 
-    except oracledb.DatabaseError as e:
+    except bd.DatabaseError as e:
         print("Error al mostrar el contenido de las tablas:", e)
 
 #============================================================================
@@ -2901,12 +2397,7 @@ def mostrar_tablas(conn):
 #============================================================================
 def mostrar_triggers(conn):
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT trigger_name, trigger_type, triggering_event, table_name, status
-        FROM user_triggers
-    """)
-
-    for row in cursor:
+    for row in bd.backend.listar_disparadores(cursor):
         print(f"Nombre: {row[0]} // Evento activante: {row[2]} // Tabla: {row[3]} // Estado: {row[4]}")
 
 
@@ -2921,7 +2412,8 @@ def menu_principal(conn):
         print("5. RESERVAS")
         print("6. Mostrar Tablas")
         print("7. Eliminar y crear tablas")
-        print("8. Salir")
+        print("8. Cambiar de empleado")
+        print("9. Salir")
         opcion = input("Seleccione una opción: ")
 
 
@@ -2943,8 +2435,13 @@ def menu_principal(conn):
         elif opcion == '6':
             mostrar_tablas(conn)
         elif opcion == '7':
-            crear_tablas(conn)
+            inicializar_esquema(conn, reiniciar=True)
         elif opcion == '8':
+            cambiar_de_empleado(conn)
+        elif opcion == '9':
+            sesion.cerrar_sesion()
+            confirmar_pendientes(conn)
+            mostrar_estadisticas_commit()
             conn.close()
             print("Conexión cerrada. Salir del programa.")
             break
@@ -2953,9 +2450,22 @@ def menu_principal(conn):
             print("Opción no válida.")
 
 if __name__ == "__main__":
-    conn = conectar_bd()
-    if conn:
-        crear_tablas(conn)
-        crear_triggers(conn)
-        mostrar_tablas(conn)
-        menu_principal(conn)
\ No newline at end of file
+    # python codigo.py --reiniciar borra y recrea todo el esquema con los datos iniciales
+    reiniciar = "--reiniciar" in sys.argv
+    if config.usar_pool:
+        pool = crear_pool()
+        if pool:
+            with conexion_pool(pool) as conn:
+                inicializar_esquema(conn, reiniciar)
+                catalogo.cargar(conn)
+                mostrar_tablas(conn)
+                menu_principal(conn)
+            mostrar_estadisticas_pool(pool)
+            pool.close()
+    else:
+        conn = conectar_bd()
+        if conn:
+            inicializar_esquema(conn, reiniciar)
+            catalogo.cargar(conn)
+            mostrar_tablas(conn)
+            menu_principal(conn)
\ No newline at end of file
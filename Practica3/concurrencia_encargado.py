@@ -0,0 +1,117 @@
+import bd
+import datetime
+import sys
+import threading
+import time
+
+from codigo import conectar_bd, crear_tablas, restriccion_encargado_unico, mensaje_error
+
+#===================================================================================
+# CARRERA EN LA ASIGNACIÓN DE ENCARGADO DE UNA RESERVA
+#===================================================================================
+# Dos terminales asignan a la vez un empleado distinto a la misma reserva.
+#   - Con el disparador antiguo (SELECT COUNT(*)), cada sesión ve 0 filas porque la
+#     inserción de la otra aún no está confirmada: las dos pasan y la reserva acaba
+#     con dos encargados.
+#   - Con el índice único uq_encargado_reserva, la segunda inserción espera a que
+#     la primera confirme y falla con ORA-00001, que se muestra como el -20043.
+# Con el backend SQLite (bd.py) solo escribe una sesión a la vez: la segunda espera
+# al COMMIT de la primera y el disparador ya ve su fila, así que no hay carrera.
+#
+# Uso: python concurrencia_encargado.py [rondas]
+
+TRIGGER_ANTIGUO_SQL = """
+CREATE OR REPLACE TRIGGER validar_empleado_asignado
+BEFORE INSERT OR UPDATE ON encargado_de
+FOR EACH ROW
+DECLARE
+    contador_empleados NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO contador_empleados
+    FROM encargado_de
+    WHERE fecha = :NEW.fecha
+    AND tlf = :NEW.tlf;
+
+    IF contador_empleados > 0 THEN
+        RAISE_APPLICATION_ERROR(-20043, 'La reserva ya tiene un empleado asignado.');
+    END IF;
+END;
+"""
+
+EMPLEADOS = ['12345678A', '87654321B']
+TELEFONO = '999999999'
+
+def terminal(dni, fecha, barrera, errores):
+    conn = conectar_bd()
+    cursor = conn.cursor()
+    try:
+        barrera.wait()
+        cursor.execute("INSERT INTO encargado_de (dni_empleado, fecha, tlf) VALUES (:1, :2, :3)", (dni, fecha, TELEFONO))
+        # el operador tarda un poco en confirmar: la otra sesión inserta mientras tanto
+        time.sleep(0.3)
+        conn.commit()
+    except bd.DatabaseError as e:
+        error, = e.args
+        errores.append(mensaje_error(error).splitlines()[0])
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+
+def carrera(conn, rondas):
+    cursor = conn.cursor()
+    duplicadas = 0
+    errores = []
+    for ronda in range(rondas):
+        fecha = datetime.datetime.now().replace(second=0, microsecond=0) + datetime.timedelta(days=1, hours=ronda)
+        cursor.execute("""
+            INSERT INTO reserva (fecha, telefono, nombre, apellido, numero_personas, lugar)
+            VALUES (:1, :2, 'Nombre1', 'Apellido1', 2, 0)""", (fecha, TELEFONO))
+        conn.commit()
+
+        barrera = threading.Barrier(len(EMPLEADOS))
+        hilos = [threading.Thread(target=terminal, args=(dni, fecha, barrera, errores)) for dni in EMPLEADOS]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        cursor.execute("SELECT COUNT(*) FROM encargado_de WHERE fecha = :1 AND tlf = :2", (fecha, TELEFONO))
+        if cursor.fetchone()[0] > 1:
+            duplicadas += 1
+    cursor.close()
+    return duplicadas, errores
+
+def prueba_concurrencia(conn, rondas=10):
+    crear_tablas(conn)
+    cursor = conn.cursor()
+
+    # Con el disparador antiguo y sin índice único
+    cursor.execute("ALTER TABLE encargado_de DROP CONSTRAINT uq_encargado_reserva")
+    cursor.execute(TRIGGER_ANTIGUO_SQL)
+    duplicadas, errores = carrera(conn, rondas)
+    print(f"\nDisparador COUNT(*): {duplicadas} de {rondas} reservas con dos encargados, {len(errores)} asignaciones rechazadas")
+
+    # Con el índice único (restriccion_encargado_unico quita el disparador)
+    cursor.execute("DELETE FROM encargado_de")
+    cursor.execute("DELETE FROM reserva WHERE fecha > SYSDATE")
+    conn.commit()
+    restriccion_encargado_unico(conn)
+    duplicadas, errores = carrera(conn, rondas)
+    print(f"Índice único: {duplicadas} de {rondas} reservas con dos encargados, {len(errores)} asignaciones rechazadas")
+    if errores:
+        print(f"\t{errores[0]}")
+    cursor.close()
+
+if __name__ == "__main__":
+    rondas = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    conn = conectar_bd()
+    if conn:
+        try:
+            prueba_concurrencia(conn, rondas)
+        except bd.DatabaseError as e:
+            error, = e.args
+            print(f"Error en la prueba: {error.message}")
+        conn.close()
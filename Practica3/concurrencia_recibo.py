@@ -0,0 +1,82 @@
+import bd
+import re
+import subprocess
+import sys
+
+from codigo import conectar_bd, inicializar_esquema, mensaje_error
+from servicios import ServicioMesas
+from transaccion import confirmar_pendientes
+
+#===================================================================================
+# RECIBO EN CACHÉ FRENTE A CAMBIOS DE OTRO PROCESO
+#===================================================================================
+# generar_recibo guarda el texto del recibo con una firma (nº de entradas y
+# MAX(ORA_ROWSCN) de la comanda). Si otro proceso (api.py, lotes.py u otro terminal)
+# suma consumiciones a una entrada que ya existe, el nº de entradas no cambia: solo
+# ORA_ROWSCN avisa de que el recibo guardado ya no vale.
+#
+#   1. Este proceso saca la cuenta de una mesa con comanda activa (queda en caché).
+#   2. Otro proceso suma consumiciones a un producto que ya está en la comanda y
+#      confirma.
+#   3. Este proceso vuelve a sacar la cuenta: el total tiene que ser el nuevo.
+#
+# Uso: python concurrencia_recibo.py [consumiciones]
+# Termina con código 1 si el segundo recibo sigue siendo el antiguo.
+
+def total_recibo(texto):
+    return re.search(r"TOTAL: (\S+)", texto).group(1)
+
+# Lo que hace el segundo proceso: python concurrencia_recibo.py --aniadir mesa producto consumiciones
+def aniadir_otro_proceso(id_mesa, id_producto, consumiciones):
+    conn = conectar_bd()
+    if conn:
+        ServicioMesas(conn).aniadir(id_mesa, id_producto, consumiciones)
+        confirmar_pendientes(conn)
+        conn.close()
+
+def prueba_recibo(conn, consumiciones=5):
+    inicializar_esquema(conn)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT c.id_mesa, f.id_producto
+        FROM comanda c
+        JOIN formado_por f ON c.id_mesa = f.id_mesa AND c.id_comanda = f.id_comanda
+        WHERE (c.estado = 'ACTIVO' AND ROWNUM = 1)
+    """)
+    fila = cursor.fetchone()
+    cursor.close()
+    if fila is None:
+        print("No hay ninguna comanda activa con productos: no hay nada que probar")
+        return False
+    id_mesa, id_producto = fila
+
+    mesas = ServicioMesas(conn)
+    antes = total_recibo(mesas.cuenta(id_mesa))
+    print(f"\nMesa {id_mesa}, total antes: {antes}")
+
+    subprocess.run([sys.executable, __file__, "--aniadir", str(id_mesa), str(id_producto), str(consumiciones)],
+                   check=True)
+
+    despues = total_recibo(mesas.cuenta(id_mesa))
+    ok = despues != antes
+    print(f"Otro proceso añade {consumiciones} del producto {id_producto}; total después: {despues} "
+          f"({'OK' if ok else 'recibo obsoleto de la caché'})")
+    return ok
+
+if __name__ == "__main__":
+    if "--aniadir" in sys.argv:
+        id_mesa, id_producto, consumiciones = map(int, sys.argv[sys.argv.index("--aniadir") + 1:][:3])
+        aniadir_otro_proceso(id_mesa, id_producto, consumiciones)
+        sys.exit(0)
+
+    consumiciones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    ok = False
+    conn = conectar_bd()
+    if conn:
+        try:
+            ok = prueba_recibo(conn, consumiciones)
+        except bd.DatabaseError as e:
+            error, = e.args
+            print(f"Error en la prueba: {mensaje_error(error)}")
+        conn.close()
+    sys.exit(0 if ok else 1)
@@ -3,4 +3,42 @@ password = 'x9095945'
 dsn = 'oracle0.ugr.es'
 port = 1521
 encoding = 'UTF-8'
-service_name = 'practbd'
\ No newline at end of file
+service_name = 'practbd'
+
+# Pool de conexiones (varios terminales contra el mismo esquema)
+usar_pool = False
+pool_min = 2
+pool_max = 10
+pool_increment = 1
+pool_wait_timeout = 5000 # milisegundos que se espera por una conexión libre
+
+# Segundos que se confía en el cargo guardado en la sesión antes de volver a leerlo
+ttl_rol = 300
+
+# Cómo se validan formatos y existencias: 'triggers' (disparadores PL/SQL) o
+# 'declarativo' (restricciones CHECK / FOREIGN KEY con los mismos mensajes)
+modo_restricciones = 'triggers'
+
+# Commit agrupado de las operaciones de mesa (ver transaccion.py): un COMMIT por
+# ventana en lugar de uno por operación. Se pueden perder las operaciones de la
+# última ventana si el programa cae antes de confirmarlas.
+commit_agrupado = False
+ventana_commit = 0.2        # segundos
+max_commit_agrupado = 20    # operaciones por COMMIT como máximo
+
+# Modo por lotes (lotes.py): filas por executemany y registros por COMMIT
+tam_lote = 500
+commit_cada = 5000
+
+# API HTTP (api.py): peticiones trabajando a la vez contra la BD (no más que
+# pool_max) y cuántas más pueden esperar antes de responder 503
+api_host = '127.0.0.1'
+api_puerto = 8080
+api_concurrencia = 8
+api_cola = 64
+
+# Base de datos (ver bd.py): 'oracle' o 'sqlite' (embebida, sin red). La variable de
+# entorno PRACTICA3_BD manda sobre este valor.
+backend = 'oracle'
+sqlite_fichero = 'practica3.db'   # relativo a Practica3; PRACTICA3_SQLITE manda sobre él
+sqlite_espera = 30                # segundos que espera un terminal a que acabe otra escritura
@@ -0,0 +1,308 @@
+import bd
+import datetime
+import decimal
+import itertools
+import random
+import sys
+import time
+
+from catalogo import catalogo
+from codigo import conectar_bd, crear_tablas, crear_secuencias, DATOS_INICIALES
+
+#===================================================================================
+# GENERADOR DE DATOS SINTÉTICOS
+#===================================================================================
+# Rellena todo el esquema de Practica3 con datos coherentes a una escala
+# configurable, para ver cómo se comportan las consultas con volumen real.
+#
+# Todas las filas se generan con generadores de Python y se insertan por lotes
+# con executemany: nunca se construye en memoria la tabla completa.
+# Las filas dependientes (entrada_comanda / formado_por, pedido / contiene...)
+# se calculan con un Random sembrado por clave, así cada tabla se puede generar
+# por separado y sigue siendo coherente con las demás.
+#
+# Se respetan las claves externas y las reglas de los disparadores:
+#   - DNI con 8 números y letra mayúscula, teléfonos con solo dígitos (9 en reservas)
+#   - salarios positivos, reparte solo con empleados REPARTIDOR y pedidos PENDIENTE
+#   - una sola comanda ACTIVO por mesa, y solo en mesas OCUPADA
+#   - reservas con fecha posterior a la actual, numero_personas >= 1, lugar 0 o 1
+#   - como mucho un empleado encargado por reserva
+#
+# Uso: python generador.py [escala] [tamaño_lote]
+# Con escala 1 se generan unas 100.000 filas de formado_por; con escala 200, unos 20 millones.
+
+# Número de filas de cada entidad con escala 1
+VOLUMENES_BASE = {
+    "empleado": 50,
+    "proveedor": 20,
+    "viveres": 100,
+    "pedido_proveedor": 500,
+    "usuario": 2000,
+    "pedido": 5000,
+    "producto": 60,
+    "mesa": 40,
+    "comanda": 20000,
+    "reserva": 3000,
+    "incidencia": 200,
+}
+
+# Máximo de líneas por comanda / pedido / pedido a proveedor
+MAX_ENTRADAS_COMANDA = 9
+MAX_PRODUCTOS_PEDIDO = 4
+MAX_VIVERES_PEDIDO_PROVEEDOR = 5
+
+LETRAS_DNI = "TRWAGMYFPDXBNJZSQVHLCKE"
+N = bd.DB_TYPE_NUMBER
+D = bd.DB_TYPE_DATE
+
+def calcular_volumenes(escala):
+    volumenes = {tabla: max(1, int(n * escala)) for tabla, n in VOLUMENES_BASE.items()}
+    # Las mesas crecen más despacio que las comandas (un local no tiene 10.000 mesas)
+    volumenes["mesa"] = max(3, int(VOLUMENES_BASE["mesa"] * escala ** 0.5))
+    # Al menos un JEFE y un REPARTIDOR (ver cargo_empleado) a cualquier escala
+    volumenes["empleado"] = max(2, volumenes["empleado"])
+    return volumenes
+
+# Random propio de cada fila: depende solo de la semilla, la tabla y la clave
+def _rng(semilla, tabla, clave):
+    return random.Random(semilla * 1_000_003 + tabla * 7_919 + clave)
+
+#-----------------------------------------------------------------------------------
+# Reglas que se comparten entre tablas
+#-----------------------------------------------------------------------------------
+def dni_empleado(i):
+    return f"{i:08d}{LETRAS_DNI[i % 23]}"
+
+# El primer empleado y uno de cada diez son JEFE; el segundo y cuatro de cada diez
+# REPARTIDOR, para que haya repartidores aunque solo se generen dos empleados
+def cargo_empleado(i):
+    if i == 1 or i % 10 == 0:
+        return 'JEFE'
+    if i == 2 or i % 10 in (1, 3, 5, 7):
+        return 'REPARTIDOR'
+    return 'CAMARERO'
+
+def telefono_usuario(i):
+    return f"7{i:08d}"
+
+# Las mesas múltiplo de 3 están ocupadas y su última comanda está activa
+def estado_mesa(id_mesa):
+    if id_mesa % 3 == 0:
+        return 'OCUPADA'
+    if id_mesa % 3 == 1:
+        return 'DISPONIBLE'
+    return 'RESERVADA'
+
+# Las comandas se reparten entre las mesas por turnos
+def mesa_de_comanda(id_comanda, vol):
+    return (id_comanda - 1) % vol["mesa"] + 1
+
+def comanda_activa(id_comanda, vol):
+    ultima_ronda = id_comanda > vol["comanda"] - vol["mesa"]
+    return ultima_ronda and estado_mesa(mesa_de_comanda(id_comanda, vol)) == 'OCUPADA'
+
+def pedido_pendiente(id_pedido):
+    return id_pedido % 4 == 0
+
+#-----------------------------------------------------------------------------------
+# Generadores de filas (una función por tabla, en el orden de DATOS_INICIALES)
+#-----------------------------------------------------------------------------------
+def filas_proveedor(vol, semilla):
+    for i in range(1, vol["proveedor"] + 1):
+        yield (f"B{i:08d}", f"prov{i}@proveedores.es", f"+34{900000000 + i}", f"Proveedor{i}")
+
+def filas_pedido_proveedor(vol, semilla):
+    hoy = datetime.datetime.now().replace(microsecond=0)
+    for i in range(1, vol["pedido_proveedor"] + 1):
+        estado = 'ACTIVO' if i > vol["pedido_proveedor"] * 0.9 else 'FINALIZADO'
+        yield (i, estado, hoy - datetime.timedelta(hours=vol["pedido_proveedor"] - i))
+
+def filas_asociado(vol, semilla):
+    for i in range(1, vol["pedido_proveedor"] + 1):
+        yield (f"B{(i - 1) % vol['proveedor'] + 1:08d}", i)
+
+def filas_usuario(vol, semilla):
+    for i in range(1, vol["usuario"] + 1):
+        yield (telefono_usuario(i), f"u{i}@correo.es", f"Nombre{i}", f"Apellido{i}")
+
+def filas_pedido(vol, semilla):
+    for i in range(1, vol["pedido"] + 1):
+        estado = 'PENDIENTE' if pedido_pendiente(i) else 'ENTREGADO'
+        yield (i, estado, f"Calle {_rng(semilla, 1, i).randint(1, 500)}, Granada")
+
+def filas_realiza(vol, semilla):
+    for i in range(1, vol["pedido"] + 1):
+        yield (i, telefono_usuario((i - 1) % vol["usuario"] + 1))
+
+def filas_empleado(vol, semilla):
+    for i in range(1, vol["empleado"] + 1):
+        rng = _rng(semilla, 2, i)
+        salario = rng.randint(1100, 1600) if cargo_empleado(i) != 'JEFE' else rng.randint(1800, 3000)
+        yield (dni_empleado(i), f"Empleado{i}", f"Apellido{i}", cargo_empleado(i), f"6{i:08d}", f"{i:012d}", salario)
+
+def filas_hace(vol, semilla):
+    jefes = [i for i in range(1, vol["empleado"] + 1) if cargo_empleado(i) == 'JEFE']
+    for i in range(1, vol["pedido_proveedor"] + 1):
+        yield (i, dni_empleado(jefes[i % len(jefes)]))
+
+def _fecha_reserva(i):
+    manana = datetime.datetime.now().replace(hour=13, minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+    return manana + datetime.timedelta(minutes=15 * i)
+
+def filas_reserva(vol, semilla):
+    for i in range(1, vol["reserva"] + 1):
+        rng = _rng(semilla, 3, i)
+        usuario = (i - 1) % vol["usuario"] + 1
+        yield (_fecha_reserva(i), telefono_usuario(usuario), f"Nombre{usuario}", f"Apellido{usuario}", rng.randint(1, 12), rng.randint(0, 1))
+
+def filas_encargado_de(vol, semilla):
+    for i in range(1, vol["reserva"] + 1, 2):
+        yield (dni_empleado((i - 1) % vol["empleado"] + 1), _fecha_reserva(i), telefono_usuario((i - 1) % vol["usuario"] + 1))
+
+def filas_reparte(vol, semilla):
+    repartidores = [i for i in range(1, vol["empleado"] + 1) if cargo_empleado(i) == 'REPARTIDOR']
+    if not repartidores:
+        return
+    for i in range(1, vol["pedido"] + 1):
+        if pedido_pendiente(i) and i % 8 == 0:
+            yield (i, dni_empleado(repartidores[i % len(repartidores)]))
+
+def filas_viveres(vol, semilla):
+    for i in range(1, vol["viveres"] + 1):
+        yield (f"V{i:05d}", f"Vivere{i}")
+
+def filas_tiene(vol, semilla):
+    for i in range(1, vol["pedido_proveedor"] + 1):
+        rng = _rng(semilla, 4, i)
+        num = rng.randint(1, min(MAX_VIVERES_PEDIDO_PROVEEDOR, vol["viveres"]))
+        for codigo in rng.sample(range(1, vol["viveres"] + 1), num):
+            yield (i, f"V{codigo:05d}", rng.randint(1, 100))
+
+def filas_incidencia(vol, semilla):
+    hoy = datetime.datetime.now().replace(microsecond=0)
+    for i in range(1, vol["incidencia"] + 1):
+        yield (i, hoy - datetime.timedelta(days=i), f"Incidencia sintética número {i}")
+
+def filas_reporta(vol, semilla):
+    for i in range(1, vol["incidencia"] + 1):
+        yield (dni_empleado((i - 1) % vol["empleado"] + 1), i)
+
+def filas_producto(vol, semilla):
+    for i in range(1, vol["producto"] + 1):
+        precio = decimal.Decimal(_rng(semilla, 5, i).randint(150, 2500)) / 100
+        yield (i, f"Producto{i}", precio)
+
+def filas_contiene(vol, semilla):
+    for i in range(1, vol["pedido"] + 1):
+        rng = _rng(semilla, 6, i)
+        num = rng.randint(1, min(MAX_PRODUCTOS_PEDIDO, vol["producto"]))
+        for id_producto in rng.sample(range(1, vol["producto"] + 1), num):
+            yield (i, id_producto, rng.randint(1, 5))
+
+def filas_mesa(vol, semilla):
+    for i in range(1, vol["mesa"] + 1):
+        yield (i, estado_mesa(i))
+
+def filas_asignado(vol, semilla):
+    for i in range(1, vol["mesa"] + 1):
+        yield (i, dni_empleado((i - 1) % vol["empleado"] + 1))
+
+def filas_comanda(vol, semilla):
+    ahora = datetime.datetime.now().replace(microsecond=0)
+    for i in range(1, vol["comanda"] + 1):
+        estado = 'ACTIVO' if comanda_activa(i, vol) else 'PAGADO'
+        yield (i, mesa_de_comanda(i, vol), estado, ahora - datetime.timedelta(minutes=vol["comanda"] - i))
+
+# Productos de cada comanda: una entrada por producto distinto, como hace aniadir_pedido
+def _lineas_comanda(i, vol, semilla):
+    rng = _rng(semilla, 7, i)
+    num = rng.randint(1, min(MAX_ENTRADAS_COMANDA, vol["producto"]))
+    productos = rng.sample(range(1, vol["producto"] + 1), num)
+    return [(entrada, id_producto, rng.randint(1, 4)) for entrada, id_producto in enumerate(productos, start=1)]
+
+def filas_entrada_comanda(vol, semilla):
+    for i in range(1, vol["comanda"] + 1):
+        mesa = mesa_de_comanda(i, vol)
+        for entrada, _, consumiciones in _lineas_comanda(i, vol, semilla):
+            yield (entrada, i, mesa, consumiciones)
+
+def filas_formado_por(vol, semilla):
+    for i in range(1, vol["comanda"] + 1):
+        mesa = mesa_de_comanda(i, vol)
+        for entrada, id_producto, _ in _lineas_comanda(i, vol, semilla):
+            yield (entrada, i, mesa, id_producto)
+
+# Sentencias propias cuando la de DATOS_INICIALES usa fechas fijas o SYSDATE
+SQL_CON_FECHA = {
+    "pedido_proveedor": ("INSERT INTO pedido_proveedor (id, estado, fecha) VALUES (:1, :2, :3)", (N, 50, D)),
+    "reserva": ("""INSERT INTO reserva (fecha, telefono, nombre, apellido, numero_personas, lugar)
+                   VALUES (:1, :2, :3, :4, :5, :6)""", (D, 20, 20, 20, N, N)),
+    "encargado_de": ("INSERT INTO encargado_de (dni_empleado, fecha, tlf) VALUES (:1, :2, :3)", (9, D, 20)),
+    "incidencia": ("INSERT INTO incidencia (id_incidencia, fecha, descripcion) VALUES (:1, :2, :3)", (N, D, 500)),
+    "comanda": ("""INSERT INTO comanda (id_comanda, id_mesa, estado, fecha_entrada)
+                   VALUES (:1, :2, :3, :4)""", (N, N, 10, D)),
+}
+
+#-----------------------------------------------------------------------------------
+# Carga
+#-----------------------------------------------------------------------------------
+def insertar_por_lotes(conn, cursor, sql, tamanios, filas, tam_lote):
+    total = 0
+    while True:
+        lote = list(itertools.islice(filas, tam_lote))
+        if not lote:
+            return total
+        cursor.setinputsizes(*tamanios)
+        cursor.executemany(sql, lote)
+        # Commit por lote para no acumular deshacer (undo) de millones de filas
+        conn.commit()
+        total += len(lote)
+
+def vaciar_tablas(conn):
+    cursor = conn.cursor()
+    # De hijas a padres: orden inverso al de inserción
+    for tabla, *_ in reversed(DATOS_INICIALES):
+        cursor.execute(f"DELETE FROM {tabla}")
+    conn.commit()
+    cursor.close()
+
+def generar_datos(conn, escala=1, tam_lote=10000, semilla=2024):
+    vol = calcular_volumenes(escala)
+    generadores = globals()
+    inicio_total = time.perf_counter()
+
+    try:
+        vaciar_tablas(conn)
+        cursor = conn.cursor()
+
+        print(f"\nGenerando datos con escala {escala} (lotes de {tam_lote} filas)")
+        for tabla, sql, tamanios, _ in DATOS_INICIALES:
+            sql, tamanios = SQL_CON_FECHA.get(tabla, (sql, tamanios))
+            filas = generadores[f"filas_{tabla}"](vol, semilla)
+
+            inicio = time.perf_counter()
+            total = insertar_por_lotes(conn, cursor, sql, tamanios, filas, tam_lote)
+            segundos = time.perf_counter() - inicio
+
+            velocidad = total / segundos if segundos > 0 else 0
+            print(f"\t{tabla:<20} {total:>12} filas {segundos:9.2f} s ({velocidad:,.0f} filas/s)")
+
+        # Los identificadores generados se han insertado a mano: recolocar las secuencias
+        crear_secuencias(conn)
+        catalogo.invalidar()
+        print(f"\tTOTAL {time.perf_counter() - inicio_total:.2f} s")
+
+    except bd.DatabaseError as e:
+        error, = e.args
+        print(f"Error al generar los datos: {error.message}")
+        conn.rollback()
+
+if __name__ == "__main__":
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    tam_lote = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    conn = conectar_bd()
+    if conn:
+        crear_tablas(conn)
+        generar_datos(conn, escala, tam_lote)
+        conn.close()
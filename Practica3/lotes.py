@@ -0,0 +1,320 @@
+import bd
+import csv
+import datetime
+import decimal
+import json
+import re
+import sys
+import time
+
+import config
+import validacion
+from codigo import conectar_bd, mensaje_error
+from transaccion import unidad_de_trabajo
+
+#===================================================================================
+# MODO POR LOTES
+#===================================================================================
+# Ejecuta operaciones leídas de un fichero JSONL o CSV (o de la entrada estándar)
+# sin pasar por los menús. Cada registro es una operación:
+#
+#     {"op": "crear_reserva", "fecha": "24-12-2030 14:30", "telefono": "600111222",
+#      "nombre": "Ana", "apellido": "Ruiz", "numero_personas": 4, "lugar": 0}
+#
+# En CSV, una columna "op" y una columna por campo (los que no use la operación se
+# dejan vacíos). Las fechas van como en los menús (DD-MM-YYYY HH:MM) o en ISO.
+#
+# - Los registros seguidos de la misma operación se envían juntos, config.tam_lote
+#   por executemany, con batcherrors=True: una fila rechazada no para las demás.
+# - Las reglas de validacion.py se comprueban antes; lo que no las cumple no va a la BD.
+# - Se hace COMMIT cada config.commit_cada registros (y al final). Si el programa
+#   cae, se pierde como mucho lo que iba desde el último COMMIT.
+# - Al terminar se muestra el error de cada registro rechazado, con su línea.
+#
+# Uso: python lotes.py [fichero|-] [--csv] [--tam-lote=N] [--commit-cada=N]
+# Termina con código 1 si algún registro ha fallado.
+
+FORMATO_FECHA = "%d-%m-%Y %H:%M"
+
+def _fecha(valor):
+    if isinstance(valor, datetime.datetime):
+        return valor
+    try:
+        return datetime.datetime.strptime(valor, FORMATO_FECHA)
+    except ValueError:
+        return datetime.datetime.fromisoformat(valor)
+
+def _numero(valor):
+    try:
+        return decimal.Decimal(str(valor).strip())
+    except decimal.InvalidOperation:
+        raise ValueError(f"'{valor}' no es un número")
+
+# Operación -> (campos (nombre, conversión), validación de validacion.py o None,
+#               sentencias en orden, índice de la sentencia que tiene que afectar a
+#               alguna fila o None, mensaje si no afecta a ninguna)
+# Los binds de cada sentencia son los campos del registro con el mismo nombre.
+#
+# Cada operación repite el SQL del método de servicios.py indicado encima, con las
+# mismas comprobaciones y mensajes: si se cambia uno hay que cambiar el otro.
+OPERACIONES = {
+    # ServicioEmpleados.alta
+    "alta_empleado": (
+        [("dni", str), ("nombre", str), ("apellido", str), ("cargo", str), ("telefono", str),
+         ("num_ss", str), ("salario", _numero)],
+        validacion.validar_empleado,
+        ["""INSERT INTO empleado (dni, nombre, apellido, cargo, telefono, num_ss, salario)
+            VALUES (:dni, :nombre, :apellido, :cargo, :telefono, :num_ss, :salario)"""],
+        None, None),
+    # ServicioProveedores.alta
+    "alta_proveedor": (
+        [("cif", str), ("correo", str), ("telefono", str), ("nombre", str)],
+        validacion.validar_proveedor,
+        ["INSERT INTO proveedor (cif, correo, telefono, nombre) VALUES (:cif, :correo, :telefono, :nombre)"],
+        None, None),
+    # ServicioProveedores.baja
+    "baja_proveedor": (
+        [("cif", str)],
+        None,
+        ["DELETE FROM asociado WHERE cif = :cif",
+         "DELETE FROM proveedor WHERE cif = :cif"],
+        1, "El CIF introducido no corresponde a ningún proveedor."),
+    # ServicioPedidosOnline.alta_usuario
+    "alta_usuario": (
+        [("telefono", str), ("correo", str), ("nombre", str), ("apellido", str)],
+        validacion.validar_usuario,
+        ["INSERT INTO usuario (telefono, correo, nombre, apellido) VALUES (:telefono, :correo, :nombre, :apellido)"],
+        None, None),
+    # ServicioReservas.crear
+    "crear_reserva": (
+        [("fecha", _fecha), ("telefono", str), ("nombre", str), ("apellido", str),
+         ("numero_personas", int), ("lugar", int)],
+        validacion.validar_reserva,
+        ["""INSERT INTO reserva (fecha, telefono, nombre, apellido, numero_personas, lugar)
+            VALUES (:fecha, :telefono, :nombre, :apellido, :numero_personas, :lugar)"""],
+        None, None),
+    # ServicioReservas.anular
+    "anular_reserva": (
+        [("telefono", str), ("fecha", _fecha)],
+        None,
+        ["DELETE FROM encargado_de WHERE tlf = :telefono AND fecha = :fecha",
+         "DELETE FROM reserva WHERE telefono = :telefono AND fecha = :fecha"],
+        1, "La reserva no existe. Verifique los datos ingresados."),
+    # ServicioReservas.asignar_empleado
+    "asignar_empleado": (
+        [("telefono", str), ("fecha", _fecha), ("dni", str)],
+        None,
+        ["INSERT INTO encargado_de (dni_empleado, fecha, tlf) VALUES (:dni, :fecha, :telefono)"],
+        None, None),
+    # ServicioMesas.activar
+    "activar_mesa": (
+        [("mesa", int)],
+        None,
+        ["UPDATE mesa SET estado = 'OCUPADA' WHERE id_mesa = :mesa",
+         """INSERT INTO comanda (id_comanda, id_mesa, estado, fecha_entrada)
+            VALUES (seq_comanda.NEXTVAL, :mesa, 'ACTIVO', SYSDATE)"""],
+        0, "La mesa no existe."),
+    # ServicioMesas.registrar_pago: primero la comanda, que es la que tiene que existir
+    "registrar_pago": (
+        [("mesa", int)],
+        None,
+        ["UPDATE comanda SET estado = 'PAGADO' WHERE estado = 'ACTIVO' AND id_mesa = :mesa",
+         "UPDATE mesa SET estado = 'Disponible' WHERE id_mesa = :mesa"],
+        0, "No hay ninguna comanda activa en esta mesa"),
+}
+
+_patron_bind = re.compile(r"(?<!:):(\w+)")
+
+def binds(sql):
+    return list(dict.fromkeys(_patron_bind.findall(sql)))
+
+#-----------------------------------------------------------------------------------
+# Lectura
+#-----------------------------------------------------------------------------------
+# Devuelve (línea, registro) por cada registro; registro es un dict, o la excepción
+# si la línea no se puede leer
+def leer_registros(fichero, formato):
+    if formato == "csv":
+        # la línea 1 es la cabecera; las celdas vacías son NULL
+        for linea, fila in enumerate(csv.DictReader(fichero), start=2):
+            yield linea, {campo: (valor if valor != "" else None) for campo, valor in fila.items()}
+    else:
+        for linea, texto in enumerate(fichero, start=1):
+            if not texto.strip():
+                continue
+            try:
+                yield linea, json.loads(texto)
+            except ValueError as e:
+                yield linea, e
+
+# Registro leído -> (operación, binds). ValueError con el motivo si no es válido
+def preparar(registro):
+    if isinstance(registro, Exception):
+        raise ValueError(f"JSON no válido: {registro}")
+    if not isinstance(registro, dict):
+        raise ValueError("El registro tiene que ser un objeto JSON")
+    operacion = registro.get("op")
+    if not isinstance(operacion, str) or operacion not in OPERACIONES:
+        raise ValueError(f"Operación desconocida: {operacion}")
+    campos, validar, _, _, _ = OPERACIONES[operacion]
+
+    datos = {}
+    for campo, convertir in campos:
+        if campo not in registro:
+            raise ValueError(f"Falta el campo {campo}")
+        valor = registro[campo]
+        # solo los textos pueden ir vacíos
+        if valor is None and convertir is not str:
+            raise ValueError(f"Falta el campo {campo}")
+        try:
+            datos[campo] = None if valor is None else convertir(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"Valor no válido para {campo}: {valor!r}")
+
+    if validar is not None:
+        errores = validar(**datos)
+        if errores:
+            raise ValueError("; ".join(f"ORA{codigo}: {mensaje}" for codigo, mensaje in errores))
+    return operacion, datos
+
+#-----------------------------------------------------------------------------------
+# Ejecución
+#-----------------------------------------------------------------------------------
+# Ejecuta un lote de registros de la misma operación. filas: [(línea, binds)]
+# Devuelve (registros hechos, {línea: error}).
+#
+# Cada sentencia va en un executemany con batcherrors; las filas que fallan en una
+# sentencia ya no se envían en las siguientes. Si una fila falla en la segunda
+# sentencia o después, lo que ya había hecho la primera hay que deshacerlo: se
+# vuelve al SAVEPOINT del lote y se repite sin las filas que han fallado.
+def ejecutar_lote(cursor, operacion, filas):
+    _, _, sentencias, obligatoria, mensaje_sin_filas = OPERACIONES[operacion]
+    errores = {}
+    pendientes = filas
+
+    while pendientes:
+        cursor.execute("SAVEPOINT lote")
+        activas = pendientes
+        repetir = False
+        for i, sql in enumerate(sentencias):
+            nombres = binds(sql)
+            cursor.executemany(sql, [{nombre: datos[nombre] for nombre in nombres} for _, datos in activas],
+                               batcherrors=True, arraydmlrowcounts=(i == obligatoria))
+            nuevos = {activas[error.offset][0]: mensaje_error(error) for error in cursor.getbatcherrors()}
+            if i == obligatoria:
+                filas_afectadas = cursor.getarraydmlrowcounts()
+                if len(filas_afectadas) == len(activas):
+                    for (linea, _), afectadas in zip(activas, filas_afectadas):
+                        if afectadas == 0 and linea not in nuevos:
+                            nuevos[linea] = mensaje_sin_filas
+
+            errores.update(nuevos)
+            if nuevos and i > 0:
+                cursor.execute("ROLLBACK TO SAVEPOINT lote")
+                pendientes = [fila for fila in pendientes if fila[0] not in errores]
+                repetir = True
+                break
+            activas = [fila for fila in activas if fila[0] not in nuevos]
+            if not activas:
+                break
+
+        if not repetir:
+            return len(activas), errores
+
+    return 0, errores
+
+class Informe:
+
+    def __init__(self):
+        self.registros = 0
+        self.hechos = 0
+        self.commits = 0
+        self.errores = []   # (línea, operación, mensaje)
+        self.inicio = time.perf_counter()
+
+    def fallo(self, linea, operacion, mensaje):
+        self.errores.append((linea, operacion, mensaje))
+
+    def mostrar(self):
+        segundos = time.perf_counter() - self.inicio
+        for linea, operacion, mensaje in sorted(self.errores, key=lambda e: e[0]):
+            print(f"Línea {linea} ({operacion or '?'}): {mensaje}")
+        print(f"\nRegistros: {self.registros}  hechos: {self.hechos}  con error: {len(self.errores)}")
+        print(f"COMMIT: {self.commits}  tiempo: {segundos:.2f} s  ({self.registros / segundos if segundos else 0:,.0f} registros/s)")
+
+# Agrupa los registros seguidos de la misma operación en lotes de hasta tam_lote.
+# Los que no se pueden preparar quedan en el informe y no se envían.
+def lotes(registros, tam_lote, informe):
+    operacion_lote = None
+    lote = []
+    for linea, registro in registros:
+        informe.registros += 1
+        try:
+            operacion, datos = preparar(registro)
+        except ValueError as e:
+            operacion = registro.get("op") if isinstance(registro, dict) else None
+            informe.fallo(linea, operacion, str(e))
+            continue
+
+        if lote and (operacion != operacion_lote or len(lote) >= tam_lote):
+            yield operacion_lote, lote
+            lote = []
+        operacion_lote = operacion
+        lote.append((linea, datos))
+    if lote:
+        yield operacion_lote, lote
+
+def ejecutar(conn, registros, tam_lote, commit_cada):
+    informe = Informe()
+    cursor = conn.cursor()
+    pendientes = lotes(registros, tam_lote, informe)
+    try:
+        terminado = False
+        while not terminado:
+            # Una unidad de trabajo por intervalo de COMMIT
+            with unidad_de_trabajo(conn) as ut:
+                sin_commit = 0
+                terminado = True
+                for operacion, filas in pendientes:
+                    hechos, errores = ejecutar_lote(cursor, operacion, filas)
+                    informe.hechos += hechos
+                    for linea, mensaje in errores.items():
+                        informe.fallo(linea, operacion, mensaje)
+                    sin_commit += len(filas)
+                    if sin_commit >= commit_cada:
+                        terminado = False
+                        break
+                if sin_commit:
+                    ut.commit()
+                    informe.commits += 1
+    finally:
+        cursor.close()
+    return informe
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opciones = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "") for a in sys.argv[1:] if a.startswith("--"))
+    nombre = argumentos[0] if argumentos else "-"
+    formato = "csv" if "csv" in opciones or nombre.endswith(".csv") else "jsonl"
+    tam_lote = int(opciones.get("tam-lote", config.tam_lote))
+    commit_cada = int(opciones.get("commit-cada", config.commit_cada))
+
+    conn = conectar_bd()
+    if not conn:
+        sys.exit(1)
+
+    fichero = sys.stdin if nombre == "-" else open(nombre, newline="", encoding="utf-8")
+    try:
+        informe = ejecutar(conn, leer_registros(fichero, formato), tam_lote, commit_cada)
+    except bd.DatabaseError as e:
+        error, = e.args
+        print(f"Error: {mensaje_error(error)}")
+        print("Se ha deshecho lo que iba desde el último COMMIT.")
+        sys.exit(1)
+    finally:
+        if fichero is not sys.stdin:
+            fichero.close()
+        conn.close()
+
+    informe.mostrar()
+    sys.exit(1 if informe.errores else 0)
@@ -0,0 +1,35 @@
+import time
+
+#===================================================================================
+# Utilidades de medida para los benchmarks
+#===================================================================================
+
+# Percentil p (0-100) de una lista de valores, por el método del rango más cercano
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicion = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[posicion]
+
+# Ejecuta funcion() 'repeticiones' veces y devuelve la latencia de cada llamada en segundos
+def medir(funcion, repeticiones):
+    latencias = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+def resumen_latencias(latencias):
+    return {
+        "n": len(latencias),
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "max_ms": max(latencias) * 1000 if latencias else 0.0,
+    }
+
+def mostrar_resumen(nombre, latencias):
+    r = resumen_latencias(latencias)
+    print(f"\t{nombre:<40} n={r['n']:<6} p50={r['p50_ms']:8.3f} ms  p95={r['p95_ms']:8.3f} ms  p99={r['p99_ms']:8.3f} ms  max={r['max_ms']:8.3f} ms")
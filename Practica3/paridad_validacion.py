@@ -0,0 +1,168 @@
+import bd
+import config
+import datetime
+import re
+import sys
+
+import codigo
+import validacion
+from codigo import conectar_bd, inicializar_esquema, mensaje_error
+
+#===================================================================================
+# PARIDAD ENTRE validacion.py Y LOS DISPARADORES
+#===================================================================================
+# Comprueba que las reglas de validacion.py siguen siendo las de los disparadores
+# (y las restricciones CHECK del modo declarativo):
+#
+#   1. Sin BD: cada patrón, condición y mensaje de Python aparece tal cual en el
+#      código SQL, y los tamaños de columna coinciden con la DDL de TABLAS.
+#   2. Con BD (--bd): cada valor de prueba se valida en Python y se inserta de
+#      verdad (deshaciendo después); el error tiene que ser el mismo en los dos.
+#      Se pasa una vez con disparadores y otra con restricciones declarativas, y
+#      al final se deja el esquema en el modo de config.py.
+#
+# Uso: python paridad_validacion.py [--bd]
+# Termina con código 1 si alguna comprobación falla.
+
+CHECK = {nombre: condicion for nombre, _, condicion, _ in codigo.RESTRICCIONES_CHECK}
+
+# (regla, texto de Python que tiene que aparecer, SQL donde se busca)
+FRAGMENTOS = [
+    ("patrón DNI", f"'{validacion.PATRON_DNI}'",
+        [codigo.TRIGGER_VERIFICAR_FORMATO_DNI, CHECK["ck_empleado_dni"]]),
+    ("patrón teléfono empleado", f"'{validacion.PATRON_TELEFONO_EMPLEADO}'",
+        [codigo.TRIGGER_VERIFICAR_FORMATO_TLF_EMPLEADO, CHECK["ck_empleado_telefono"]]),
+    ("patrón teléfono proveedor", f"'{validacion.PATRON_TELEFONO_PROVEEDOR}'",
+        [codigo.TRIGGER_VERIFICAR_FORMATO_TELEFONO_PROVEEDOR, CHECK["ck_proveedor_telefono"]]),
+    ("patrón teléfono reserva", f"'{validacion.PATRON_TELEFONO_RESERVA}'",
+        [codigo.TRIGGER_VALIDAR_FORMATO_TELEFONO_RESERVA, CHECK["ck_reserva_telefono"]]),
+    ("salario negativo", ":NEW.salario < 0", [codigo.TRIGGER_VERIFICAR_SALARIO_POSITIVO]),
+    ("salario negativo", "salario >= 0", [CHECK["ck_empleado_salario"]]),
+    ("correo sin @", "INSTR(:NEW.correo, '@') = 0", [codigo.TRIGGER_VERIFICAR_FORMATO_CORREO_PROVEEDOR]),
+    ("posición de la @", "INSTR(:NEW.correo, '@') = 1 OR INSTR(:NEW.correo, '@') = LENGTH(:NEW.correo)",
+        [codigo.TRIGGER_VERIFICAR_FORMATO_CORREO_PROVEEDOR]),
+    ("número de personas", ":NEW.numero_personas < 1", [codigo.TRIGGER_VALIDAR_NUMERO_PERSONAS_RESERVA]),
+    ("número de personas", "numero_personas >= 1", [CHECK["ck_reserva_personas"]]),
+    ("lugar", ":NEW.lugar NOT IN (0, 1)", [codigo.TRIGGER_VALIDAR_VALORES_LUGAR_RESERVA]),
+    ("lugar", "lugar IN (0, 1)", [CHECK["ck_reserva_lugar"]]),
+    ("fecha de reserva", ":NEW.fecha <= SYSDATE", [codigo.TRIGGER_VALIDAR_FECHA_RESERVA_POSTERIOR]),
+]
+
+def comprobar_sql():
+    fallos = []
+
+    for regla, texto, sqls in FRAGMENTOS:
+        for sql in sqls:
+            if texto not in sql:
+                fallos.append(f"{regla}: '{texto}' no aparece en el SQL")
+
+    # Mensajes: el mismo RAISE_APPLICATION_ERROR en algún disparador (de los dos modos)
+    todos = "\n".join(sql for nombre, sql in vars(codigo).items() if nombre.startswith("TRIGGER_"))
+    for clave, (codigo_error, mensaje) in validacion.MENSAJES.items():
+        if f"RAISE_APPLICATION_ERROR({codigo_error}, '{mensaje}')" not in todos:
+            fallos.append(f"mensaje '{clave}' ({codigo_error}) distinto del del disparador")
+
+    # Y el mismo mensaje que muestra el modo declarativo
+    mensajes = set(validacion.MENSAJES.values())
+    for nombre in CHECK:
+        if codigo.MENSAJES_RESTRICCIONES[nombre.upper()] not in mensajes:
+            fallos.append(f"la restricción {nombre} no tiene regla en validacion.py")
+
+    # Tamaño de las columnas
+    ddl = dict(codigo.TABLAS)
+    for tabla, columnas in validacion.LONGITUDES.items():
+        tamanos = {c: int(n) for c, n in re.findall(r"(\w+) VARCHAR\((\d+)\)", ddl[tabla])}
+        for columna, maximo in columnas.items():
+            if tamanos.get(columna) != maximo:
+                fallos.append(f"{tabla}.{columna}: {maximo} en Python, {tamanos.get(columna)} en la DDL")
+
+    return fallos
+
+#-----------------------------------------------------------------------------------
+# Comprobación contra la BD
+#-----------------------------------------------------------------------------------
+MANIANA = datetime.datetime.now().replace(microsecond=0) + datetime.timedelta(days=30)
+
+# tabla -> (función de validación, fila válida, valores de prueba (columna, valor))
+CASOS = {
+    "empleado": (validacion.validar_empleado,
+        {"dni": "99999999Z", "nombre": "Prueba", "apellido": "Paridad", "cargo": "CAMARERO",
+         "telefono": "600111222", "num_ss": "281234567890", "salario": "1200"},
+        [("dni", "11111111H"), ("dni", "1234567A"), ("dni", "12345678a"), ("dni", "123456789"),
+         ("dni", ""),
+         ("telefono", "+34600111222"), ("telefono", "+"), ("telefono", "600-111"), ("telefono", ""),
+         ("salario", "0"), ("salario", "-1"), ("salario", "")]),
+    "proveedor": (validacion.validar_proveedor,
+        {"cif": "Z9999999", "correo": "a@b.es", "telefono": "+34911222333", "nombre": "Prueba"},
+        [("telefono", "911222333"), ("telefono", "+"), ("telefono", "91-122"), ("telefono", ""),
+         ("telefono", "+3491 122"), ("correo", "ab"), ("correo", "@b"), ("correo", "a@"),
+         ("correo", "a@b@c"), ("correo", ""), ("nombre", "x" * 21)]),
+    "usuario": (validacion.validar_usuario,
+        {"telefono": "699999999", "correo": "p@p.es", "nombre": "Prueba", "apellido": "Paridad"},
+        [("correo", "x" * 20), ("correo", "x" * 21), ("nombre", "ñ" * 11)]),
+    "reserva": (validacion.validar_reserva,
+        {"fecha": MANIANA, "telefono": "699999999", "nombre": "Prueba", "apellido": "Paridad",
+         "numero_personas": 2, "lugar": 0},
+        [("numero_personas", 1), ("numero_personas", 0), ("numero_personas", -3),
+         ("lugar", 1), ("lugar", 2), ("lugar", -1),
+         ("telefono", "60011122"), ("telefono", "6001112223"), ("telefono", "60011122a"), ("telefono", ""),
+         ("telefono", "600111222\n"),
+         ("fecha", datetime.datetime(2000, 1, 1))]),
+}
+
+# Código del error tal y como lo ve el usuario (en modo declarativo, el del disparador)
+def codigo_bd(error):
+    encontrado = re.match(r"ORA(-\d+)", mensaje_error(error))
+    return int(encontrado.group(1)) if encontrado else -error.code
+
+def comprobar_bd(conn):
+    fallos = []
+    cursor = conn.cursor()
+    for tabla, (validar, base, pruebas) in CASOS.items():
+        columnas = list(base)
+        sql = f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join(':' + c for c in columnas)})"
+        for columna, valor in [(None, None)] + pruebas:
+            fila = dict(base)
+            if columna:
+                fila[columna] = valor
+            errores = validar(**fila)
+            en_python = errores[0][0] if errores else None
+            try:
+                cursor.execute(sql, fila)
+                en_bd = None
+            except bd.DatabaseError as e:
+                error, = e.args
+                en_bd = codigo_bd(error)
+            finally:
+                conn.rollback()
+            if en_python != en_bd:
+                fallos.append(f"{tabla}.{columna} = {valor!r}: Python {en_python}, BD {en_bd}")
+    cursor.close()
+    return fallos
+
+def mostrar_fallos(titulo, fallos):
+    print(f"{titulo}: {'OK' if not fallos else f'{len(fallos)} diferencias'}")
+    for fallo in fallos:
+        print(f"\t{fallo}")
+
+if __name__ == "__main__":
+    fallos = comprobar_sql()
+    mostrar_fallos("Reglas frente al SQL", fallos)
+
+    if "--bd" in sys.argv:
+        conn = conectar_bd()
+        if conn:
+            modo_configurado = config.modo_restricciones
+            try:
+                for modo in ("triggers", "declarativo"):
+                    config.modo_restricciones = modo
+                    inicializar_esquema(conn)
+                    fallos_bd = comprobar_bd(conn)
+                    mostrar_fallos(f"Reglas frente a la BD ({modo})", fallos_bd)
+                    fallos += fallos_bd
+            finally:
+                config.modo_restricciones = modo_configurado
+                inicializar_esquema(conn)
+                conn.close()
+
+    sys.exit(1 if fallos else 0)
@@ -0,0 +1,742 @@
+import datetime
+import decimal
+import threading
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import bd
+import validacion
+from catalogo import catalogo
+from transaccion import unidad_de_trabajo
+
+#===================================================================================
+# SERVICIOS
+#===================================================================================
+# Las operaciones de cada subsistema sin input() ni print(): reciben argumentos ya
+# leídos, hacen el trabajo en la BD dentro de una unidad de trabajo y devuelven el
+# resultado. Los menús de codigo.py solo piden los datos, llaman al servicio y
+# muestran lo que devuelve; los scripts y benchmarks llaman a los servicios directamente.
+#
+#     mesas = ServicioMesas(conn)
+#     id_comanda = mesas.activar(3)
+#     mesas.aniadir(3, id_producto=12, consumiciones=2)
+#
+# Errores:
+# - bd.DatabaseError: lo que rechaza la BD (disparadores, claves, ...). Se
+#   muestra con mensaje_error de codigo.py.
+# - DatosNoValidos: las reglas de validacion.py, antes de ir a la BD.
+# - ValueError: lo que no existe o no se puede hacer (mesa sin comanda activa, ...).
+#
+# Las comprobaciones de cargo (solo un JEFE puede...) son de la sesión del terminal y
+# las hacen los menús antes de llamar al servicio.
+
+class DatosNoValidos(ValueError):
+
+    def __init__(self, errores):
+        self.errores = errores
+        super().__init__("\n".join(f"Error: ORA{codigo}: {mensaje}" for codigo, mensaje in errores))
+
+def _validar(errores):
+    if errores:
+        raise DatosNoValidos(errores)
+
+#-----------------------------------------------------------------------------------
+# Resultados
+#-----------------------------------------------------------------------------------
+class Empleado(NamedTuple):
+    dni: str
+    nombre: str
+    apellido: str
+    cargo: str
+    telefono: str
+    num_ss: str
+    salario: int
+
+class Proveedor(NamedTuple):
+    cif: str
+    correo: str
+    telefono: str
+    nombre: str
+
+class PedidoDeProveedor(NamedTuple):
+    cif: str
+    correo: str
+    telefono: str
+    nombre: str
+    id_pedido: int
+    estado: str
+    fecha: datetime.datetime
+
+class LineaPedido(NamedTuple):
+    id_pedido: int
+    id_producto: int
+    nombre: str
+    precio: decimal.Decimal
+    cantidad: int
+
+class LineaComanda(NamedTuple):
+    fecha_entrada: str
+    id_mesa: int
+    id_comanda: int
+    id_entrada: int
+    num_consumidores: int
+    id_producto: int
+    nombre: str
+    precio: decimal.Decimal
+
+class Reserva(NamedTuple):
+    fecha: datetime.datetime
+    telefono: str
+    nombre: str
+    apellido: str
+    numero_personas: int
+    lugar: int
+    dni_encargado: Optional[str]
+
+#===================================================================================
+# EMPLEADOS
+#===================================================================================
+class ServicioEmpleados:
+
+    # Columnas que se pueden modificar con modificar()
+    MODIFICABLES = ("telefono", "nombre", "apellido", "salario")
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def buscar(self, dni: str) -> Optional[Empleado]:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT dni, nombre, apellido, cargo, telefono, num_ss, salario
+                FROM empleado
+                WHERE dni = :dni
+            """, {"dni": dni})
+            fila = cursor.fetchone()
+            return Empleado(*fila) if fila else None
+        finally:
+            cursor.close()
+
+    def alta(self, dni: str, nombre: str, apellido: str, cargo: str, telefono: str,
+             num_ss: str, salario) -> None:
+        # Las reglas de los disparadores se comprueban antes de ir a la BD
+        _validar(validacion.validar_empleado(dni, nombre, apellido, cargo, telefono, num_ss, salario))
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            cursor.execute("INSERT INTO empleado (dni, nombre, apellido, cargo, telefono, num_ss, salario) VALUES (:1, :2, :3, :4, :5, :6, :7)",
+                           (dni, nombre, apellido, cargo, telefono, num_ss, salario))
+            ut.commit()
+
+    def baja(self, dni: str) -> None:
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            # borrado en cascada manual
+            cursor.execute("DELETE FROM hace WHERE dni = :dni", {"dni": dni})
+            cursor.execute("DELETE FROM encargado_de WHERE dni_empleado = :dni", {"dni": dni})
+            cursor.execute("DELETE FROM reporta WHERE dni = :dni", {"dni": dni})
+
+            # los disparadores comprueban que el empleado no tenga repartos ni mesas asignados
+            cursor.execute("DELETE FROM empleado WHERE dni = :dni", {"dni": dni})
+            if cursor.rowcount == 0:
+                raise ValueError("El DNI introducido no corresponde a ningún empleado.")
+            ut.commit()
+
+    # cambios: columna -> valor nuevo, solo de MODIFICABLES. Todo en un UPDATE
+    def modificar(self, dni: str, **cambios) -> None:
+        desconocidas = [columna for columna in cambios if columna not in self.MODIFICABLES]
+        if desconocidas:
+            raise ValueError(f"No se puede modificar: {', '.join(desconocidas)}")
+        if not cambios:
+            return
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            # se ejecutan los triggers correspondientes de formato de tlf y de salario
+            asignaciones = ", ".join(f"{columna} = :{columna}" for columna in cambios)
+            cursor.execute(f"UPDATE empleado SET {asignaciones} WHERE dni = :dni", {**cambios, "dni": dni})
+            if cursor.rowcount == 0:
+                raise ValueError("El DNI introducido no corresponde a ningún empleado.")
+            ut.commit()
+
+    # Sin filtros, todos los empleados; ordenados por apellido
+    def listar(self, cargo: Optional[str] = None, salario_minimo=None) -> List[Empleado]:
+        condiciones = []
+        parametros = {}
+        if cargo is not None:
+            condiciones.append("cargo = :cargo")
+            parametros["cargo"] = cargo
+        if salario_minimo is not None:
+            condiciones.append("salario > :salario")
+            parametros["salario"] = salario_minimo
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT dni, nombre, apellido, cargo, telefono, num_ss, salario
+                FROM empleado
+                {donde}
+                ORDER BY apellido
+            """, parametros)
+            return [Empleado(*fila) for fila in cursor]
+        finally:
+            cursor.close()
+
+    # Devuelve el identificador de la incidencia
+    def reportar_incidencia(self, dni: str, descripcion: str) -> int:
+        # la incidencia y quién la reporta se guardan juntas
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            # el identificador lo da la secuencia y se recupera con RETURNING
+            id_var = cursor.var(int)
+            cursor.execute("""
+            INSERT INTO incidencia (id_incidencia, fecha, descripcion)
+            VALUES (seq_incidencia.NEXTVAL, SYSDATE, :descripcion)
+            RETURNING id_incidencia INTO :id_incidencia
+            """, {"descripcion": descripcion, "id_incidencia": id_var})
+            id_incidencia = id_var.getvalue()[0]
+            cursor.execute("INSERT INTO reporta VALUES(:1, :2)", (dni, id_incidencia))
+            ut.commit()
+        return id_incidencia
+
+#===================================================================================
+# PROVEEDORES
+#===================================================================================
+class ServicioProveedores:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def alta(self, cif: str, correo: str, telefono: str, nombre: str) -> None:
+        _validar(validacion.validar_proveedor(cif, correo, telefono, nombre))
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            # un disparador comprueba el formato del correo
+            cursor.execute("INSERT INTO proveedor (cif, correo, telefono, nombre) VALUES (:1, :2, :3, :4)",
+                           (cif, correo, telefono, nombre))
+            ut.commit()
+
+    def baja(self, cif: str) -> None:
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            # un disparador debería comprobar que no existan pedidos activos de dicho proveedor
+            # pero está comentado, no logré que funcionara
+            cursor.execute("DELETE FROM asociado WHERE cif = :cif", {"cif": cif})
+            cursor.execute("DELETE FROM proveedor WHERE cif = :cif", {"cif": cif})
+            if cursor.rowcount == 0:
+                raise ValueError("El CIF introducido no corresponde a ningún proveedor.")
+            ut.commit()
+
+    # Sin CIF, todos los proveedores por nombre
+    def listar(self, cif: Optional[str] = None) -> List[Proveedor]:
+        cursor = self.conn.cursor()
+        try:
+            if cif is None:
+                cursor.execute("""
+                SELECT p.cif, p.correo, p.telefono, p.nombre
+                FROM proveedor p
+                ORDER BY p.nombre
+                """)
+            else:
+                cursor.execute("""
+                SELECT p.cif, p.correo, p.telefono, p.nombre
+                FROM proveedor p
+                WHERE p.cif = :cif
+                """, {"cif": cif})
+            return [Proveedor(*fila) for fila in cursor]
+        finally:
+            cursor.close()
+
+    def listar_pedidos(self, cif: Optional[str] = None) -> List[PedidoDeProveedor]:
+        cursor = self.conn.cursor()
+        try:
+            if cif is None:
+                cursor.execute("""
+                SELECT p.cif, p.correo, p.telefono, p.nombre, pp.id, pp.estado, pp.fecha
+                FROM proveedor p
+                JOIN asociado a ON a.cif = p.cif
+                JOIN pedido_proveedor pp ON a.id = pp.id
+                ORDER BY p.nombre
+                """)
+            else:
+                cursor.execute("""
+                SELECT p.cif, p.correo, p.telefono, p.nombre, pp.id, pp.estado, pp.fecha
+                FROM proveedor p
+                JOIN asociado a ON a.cif = p.cif
+                JOIN pedido_proveedor pp ON a.id = pp.id
+                WHERE p.cif = :cif
+                ORDER BY pp.id
+                """, {"cif": cif})
+            return [PedidoDeProveedor(*fila) for fila in cursor]
+        finally:
+            cursor.close()
+
+    # lineas: (código del víver, cantidad). Devuelve el identificador del pedido
+    def hacer_pedido(self, dni_jefe: str, cif: str, lineas: Sequence[Tuple[int, int]]) -> int:
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            id_var = cursor.var(int)
+            cursor.execute("""
+            INSERT INTO pedido_proveedor (id, estado, fecha)
+            VALUES (seq_pedido_proveedor.NEXTVAL, :estado, SYSDATE)
+            RETURNING id INTO :id""", {"estado": 'ACTIVO', "id": id_var})
+            id_pedido = id_var.getvalue()[0]
+            cursor.execute("INSERT INTO asociado (cif, id) VALUES (:1, :2)", (cif, id_pedido))
+            cursor.execute("INSERT INTO hace (id, dni) VALUES (:1, :2)", (id_pedido, dni_jefe))
+
+            if lineas:
+                # disparador comprueba que el producto existe
+                cursor.executemany("INSERT INTO tiene (id, codigo, cantidad) VALUES (:1, :2, :3)",
+                                   [(id_pedido, codigo, cantidad) for codigo, cantidad in lineas])
+            ut.commit()
+        return id_pedido
+
+    def cancelar_pedido(self, id_pedido: int) -> None:
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            # debe haber un disparador que comprueba que la fecha límite no se ha pasado (no se implementa)
+            cursor.execute("""
+            UPDATE pedido_proveedor
+            SET estado = :1
+            WHERE id = :2""", ('FINALIZADO', id_pedido))
+            if cursor.rowcount == 0:
+                raise ValueError("No existe ningún pedido con ese identificador.")
+            ut.commit()
+
+#===================================================================================
+# PEDIDOS ONLINE
+#===================================================================================
+class ServicioPedidosOnline:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def alta_usuario(self, telefono: str, correo: str, nombre: str, apellido: str) -> None:
+        _validar(validacion.validar_usuario(telefono, correo, nombre, apellido))
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            cursor.execute("INSERT INTO usuario (telefono, correo, nombre, apellido) VALUES (:1, :2, :3, :4)",
+                           (telefono, correo, nombre, apellido))
+            ut.commit()
+
+    def baja_usuario(self, telefono: str) -> None:
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            #aqui actúa un disparador para comprobar que no se borra un cliente con pedidos activos
+            cursor.execute("DELETE FROM usuario WHERE telefono = :telefono", {"telefono": telefono})
+            if cursor.rowcount == 0:
+                raise ValueError("El teléfono introducido no corresponde a ningún usuario.")
+            ut.commit()
+
+    # lineas: (id_producto, cantidad). Devuelve el identificador del pedido
+    def hacer_pedido(self, telefono: str, direccion: str, lineas: Sequence[Tuple[int, int]]) -> int:
+        # un pedido sin productos no se guarda
+        if not lineas:
+            raise ValueError("El pedido no tiene ningún producto.")
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            id_var = cursor.var(int)
+            cursor.execute("""
+            INSERT INTO pedido (id_pedido, estado, direccion)
+            VALUES (seq_pedido.NEXTVAL, :estado, :direccion)
+            RETURNING id_pedido INTO :id_pedido""", {"estado": "PENDIENTE", "direccion": direccion, "id_pedido": id_var})
+            id_pedido = id_var.getvalue()[0]
+
+            cursor.execute("INSERT INTO realiza (telefono, id_pedido) VALUES (:1, :2)", (telefono, id_pedido))
+            #disparador que controla que los productos existen
+            cursor.executemany("INSERT INTO contiene (id_pedido, id_producto, cantidad) VALUES (:1, :2, :3)",
+                               [(id_pedido, id_producto, cantidad) for id_producto, cantidad in lineas])
+            ut.commit()
+        return id_pedido
+
+    # Productos de un pedido (o de todos); nombre y precio desde la caché del catálogo
+    def listar(self, id_pedido: Optional[int] = None) -> List[LineaPedido]:
+        cursor = self.conn.cursor()
+        try:
+            if id_pedido is None:
+                cursor.execute("""
+                SELECT c.id_pedido, c.id_producto, c.cantidad
+                FROM contiene c
+                ORDER BY c.id_pedido
+                """)
+            else:
+                cursor.execute("""
+                SELECT c.id_pedido, c.id_producto, c.cantidad
+                FROM contiene c
+                WHERE c.id_pedido = :cod_ped
+                ORDER BY c.id_pedido
+                """, {"cod_ped": id_pedido})
+            filas = cursor.fetchall()
+        finally:
+            cursor.close()
+        return [LineaPedido(id_pedido, id_producto, *(catalogo.producto(self.conn, id_producto) or (None, None)), cantidad)
+                for id_pedido, id_producto, cantidad in filas]
+
+    def asignar_repartidor(self, id_pedido: int, dni: str) -> None:
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            #disparadores: es repartidor, es empleado y el pedido no tiene repartidor
+            cursor.callproc("comprobar_pedido", [id_pedido])
+            cursor.execute("INSERT INTO reparte(id_pedido,dni)VALUES (:1,:2)", (id_pedido, dni))
+            ut.commit()
+
+#===================================================================================
+# MESAS
+#===================================================================================
+# Recibos ya generados: (mesa, comanda) -> (firma, texto del recibo)
+# La firma son el nº de entradas y el ORA_ROWSCN más alto de entrada_comanda de esa
+# comanda: si otro terminal la modifica, la firma cambia y el recibo se vuelve a generar.
+# Los cambios de esta sesión (aún sin commit) se invalidan a mano con invalidar_recibos_mesa.
+_cache_recibos = {}
+_cerrojo_recibos = threading.Lock()
+
+def invalidar_recibos_mesa(numero_mesa):
+    with _cerrojo_recibos:
+        for clave in [clave for clave in _cache_recibos if clave[0] == str(numero_mesa).strip()]:
+            del _cache_recibos[clave]
+
+def _numeros_como_decimal(cursor, metadata):
+    if metadata.type_code is bd.DB_TYPE_NUMBER:
+        return cursor.var(decimal.Decimal, arraysize=cursor.arraysize)
+
+# Devuelve el texto del recibo de la comanda activa de la mesa, o None si no hay ninguna
+def generar_recibo(conn, numero_mesa):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT c.id_comanda, to_char(c.fecha_entrada, 'DD/MON/YYYY HH24:MI:SS'),
+                   (SELECT COUNT(*) FROM entrada_comanda e WHERE e.id_mesa = c.id_mesa AND e.id_comanda = c.id_comanda),
+                   (SELECT MAX(ORA_ROWSCN) FROM entrada_comanda e WHERE e.id_mesa = c.id_mesa AND e.id_comanda = c.id_comanda)
+            FROM comanda c
+            WHERE (c.id_mesa = :identif AND c.estado = 'ACTIVO')
+        """, {"identif": numero_mesa})
+
+        comprobador = cursor.fetchone()
+        if (comprobador is None):
+            return None
+
+        numero_comanda, fecha, num_entradas, scn = comprobador
+        clave = (str(numero_mesa).strip(), numero_comanda)
+        firma = (num_entradas, scn, catalogo.version)
+
+        with _cerrojo_recibos:
+            en_cache = _cache_recibos.get(clave)
+        if en_cache is not None and en_cache[0] == firma:
+            return en_cache[1]
+
+        # Nombre, precio y subtotales salen de producto en la misma consulta, y el total
+        # lo suma la BD: el recibo nunca depende de la caché del catálogo
+        cursor.outputtypehandler = _numeros_como_decimal
+        cursor.execute("""
+            SELECT p.nombre, p.precio, e.num_consumidores,
+                   p.precio * e.num_consumidores,
+                   SUM(p.precio * e.num_consumidores) OVER ()
+            FROM entrada_comanda e
+            JOIN formado_por f ON e.id_mesa = f.id_mesa AND e.id_comanda = f.id_comanda AND e.id_entrada = f.id_entrada
+            JOIN producto p ON f.id_producto = p.id_producto
+            WHERE (e.id_mesa = :ident_mesa AND e.id_comanda = :ident_comanda AND e.num_consumidores != 0)
+            ORDER BY e.id_entrada
+        """, {"ident_mesa": numero_mesa, "ident_comanda": numero_comanda})
+
+        lineas = [fecha, f"Recibo de la mesa {numero_mesa}", f"ID recibo {numero_comanda}",
+                  "Nº \tNombre \t\tPrecio \tConsum. \tSubtotal"]
+        importe_total = decimal.Decimal("0.00")
+        for i, (nombre, precio, consumiciones, subtotal, total) in enumerate(cursor, start=1):
+            num_tabs = len(nombre)/8
+            tabulacion = "\t" * (2-int(num_tabs))
+            lineas.append(f"{i} \t{nombre}{tabulacion}{precio:.2f} \t{consumiciones} \t\t{subtotal:.2f}")
+            importe_total = total
+        lineas.append(f"\nTOTAL: {importe_total:.2f}")
+
+        texto = "\n".join(lineas)
+        with _cerrojo_recibos:
+            _cache_recibos[clave] = (firma, texto)
+        return texto
+
+    finally:
+        cursor.close()
+
+# Las operaciones de comanda son pequeñas y frecuentes: van con commit agrupado
+# (ver transaccion.py). El pago no se agrupa.
+class ServicioMesas:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    # Ocupa la mesa y abre su comanda. Devuelve el identificador de la comanda
+    def activar(self, id_mesa: int) -> int:
+        with unidad_de_trabajo(self.conn, agrupar=True) as ut:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE mesa
+                SET estado = 'OCUPADA'
+                WHERE id_mesa = :identif
+            """, {"identif": id_mesa})
+            if cursor.rowcount == 0:
+                raise ValueError("La mesa no existe.")
+
+            id_var = cursor.var(int)
+            cursor.execute("""
+                INSERT INTO comanda (id_comanda, id_mesa, estado, fecha_entrada)
+                VALUES (seq_comanda.NEXTVAL, :1, :2, SYSDATE)
+                RETURNING id_comanda INTO :3
+            """, (id_mesa, 'ACTIVO', id_var))
+            ut.commit()
+        return id_var.getvalue()[0]
+
+    def aniadir(self, id_mesa: int, id_producto: int, consumiciones: int) -> None:
+        with unidad_de_trabajo(self.conn, agrupar=True) as ut:
+            cursor = self.conn.cursor()
+            # El procedimiento busca la comanda activa, suma las consumiciones si el producto
+            # ya está en la comanda o crea una entrada nueva, todo en un solo viaje a la BD
+            cursor.callproc("aniadir_a_comanda", [id_mesa, id_producto, consumiciones])
+            ut.commit()
+        invalidar_recibos_mesa(id_mesa)
+
+    # Añade varios platos a la comanda activa de una mesa en una sola transacción.
+    # lineas es una lista de (id_producto, consumiciones). La comanda se busca una vez,
+    # los números de entrada se asignan de golpe y las escrituras van con executemany.
+    # Devuelve el número de productos distintos añadidos o actualizados.
+    def aniadir_varios(self, id_mesa: int, lineas: Sequence[Tuple[int, int]]) -> int:
+        cursor = self.conn.cursor()
+        try:
+            with unidad_de_trabajo(self.conn, agrupar=True) as ut:
+                cursor.execute("""
+                    SELECT id_comanda
+                    FROM comanda
+                    WHERE (id_mesa = :identif AND estado = 'ACTIVO' AND ROWNUM = 1)
+                    FOR UPDATE
+                """, {"identif": id_mesa})
+
+                comprobador = cursor.fetchone()
+                if (comprobador is None):
+                    raise ValueError("No hay ninguna comanda activa en esta mesa")
+                numero_comanda = comprobador[0]
+
+                # Entradas ya existentes de la comanda: producto -> entrada
+                cursor.execute("""
+                    SELECT f.id_producto, e.id_entrada
+                    FROM entrada_comanda e
+                    LEFT JOIN formado_por f ON e.id_mesa = f.id_mesa AND e.id_comanda = f.id_comanda AND e.id_entrada = f.id_entrada
+                    WHERE (e.id_mesa = :identif_mesa AND e.id_comanda = :identif_com)
+                """, {"identif_mesa": id_mesa, "identif_com": numero_comanda})
+
+                entradas = {}
+                ultima_entrada = 0
+                for id_producto, id_entrada in cursor:
+                    if id_producto is not None:
+                        entradas[int(id_producto)] = id_entrada
+                    ultima_entrada = max(ultima_entrada, id_entrada)
+
+                # Si el mismo producto aparece varias veces se suman sus consumiciones
+                consumiciones = {}
+                for id_producto, n_cons in lineas:
+                    consumiciones[int(id_producto)] = consumiciones.get(int(id_producto), 0) + int(n_cons)
+
+                actualizar = []
+                nuevas = []
+                for id_producto, n_cons in consumiciones.items():
+                    if id_producto in entradas:
+                        actualizar.append((n_cons, id_mesa, numero_comanda, entradas[id_producto]))
+                    else:
+                        ultima_entrada += 1
+                        nuevas.append((ultima_entrada, id_producto, n_cons))
+
+                if actualizar:
+                    cursor.executemany("""
+                        UPDATE entrada_comanda
+                        SET num_consumidores = num_consumidores + :1
+                        WHERE (id_mesa = :2 AND id_comanda = :3 AND id_entrada = :4)
+                    """, actualizar)
+
+                if nuevas:
+                    cursor.executemany("""
+                        INSERT INTO entrada_comanda (id_mesa, id_comanda, id_entrada, num_consumidores)
+                        VALUES (:1, :2, :3, :4)
+                    """, [(id_mesa, numero_comanda, entrada, n_cons) for entrada, _, n_cons in nuevas])
+
+                    cursor.executemany("""
+                        INSERT INTO formado_por (id_entrada, id_mesa, id_comanda, id_producto)
+                        VALUES (:1, :2, :3, :4)
+                    """, [(entrada, id_mesa, numero_comanda, id_producto) for entrada, id_producto, _ in nuevas])
+
+                ut.commit()
+        finally:
+            cursor.close()
+        invalidar_recibos_mesa(id_mesa)
+        return len(consumiciones)
+
+    def eliminar(self, id_mesa: int, id_producto: int, consumiciones: int) -> None:
+        with unidad_de_trabajo(self.conn, agrupar=True) as ut:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT id_comanda
+                FROM comanda
+                WHERE (id_mesa = :identif AND estado = 'ACTIVO')
+            """, {"identif": id_mesa})
+
+            comprobador = cursor.fetchone()
+            if (comprobador is None):
+                raise ValueError("No hay ninguna comanda activa en esta mesa")
+            numero_comanda = comprobador[0]
+
+            cursor.execute("""
+                SELECT id_entrada, num_consumidores
+                FROM entrada_comanda NATURAL JOIN (SELECT * FROM formado_por WHERE id_producto = :ident_prod)
+                WHERE (id_mesa = :identif_mesa AND id_comanda = :identif_comanda)
+            """, {"identif_mesa": id_mesa, "identif_comanda": numero_comanda, "ident_prod": id_producto})
+
+            resultado = cursor.fetchone()
+            if (resultado is None):
+                raise ValueError("Dicho producto no ha sido pedido")
+            n_entrada, n_cons_act = resultado
+
+            cursor.execute("""
+                UPDATE entrada_comanda
+                SET num_consumidores = :nuevo_numero
+                WHERE (id_mesa = :ident_mesa AND id_comanda = :ident_com AND id_entrada = :ident_ent)
+            """, {"nuevo_numero": n_cons_act-int(consumiciones), "ident_mesa": id_mesa, "ident_com": numero_comanda, "ident_ent": n_entrada})
+            ut.commit()
+        invalidar_recibos_mesa(id_mesa)
+
+    # Líneas de la comanda activa de la mesa, o de todas sus comandas
+    def consultar(self, id_mesa: int, todas: bool = False) -> List[LineaComanda]:
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT to_char(c.fecha_entrada, 'DD/MON/YYYY HH24:MI:SS'), c.id_mesa, c.id_comanda, e.id_entrada, e.num_consumidores, f.id_producto
+                FROM comanda c
+                JOIN entrada_comanda e ON c.id_mesa = e.id_mesa and c.id_comanda = e.id_comanda
+                JOIN formado_por f ON e.id_mesa = f.id_mesa AND e.id_comanda = f.id_comanda AND e.id_entrada = f.id_entrada
+                WHERE (c.id_mesa = :ident_mesa {"" if todas else "AND c.estado = 'ACTIVO'"} AND e.num_consumidores != 0)
+            """, {"ident_mesa": id_mesa})
+            filas = cursor.fetchall()
+        finally:
+            cursor.close()
+        # nombre y precio del producto salen de la caché del catálogo (se recarga si
+        # el producto es nuevo; None si se ha borrado mientras tanto)
+        return [LineaComanda(*fila, *(catalogo.producto(self.conn, fila[5]) or (None, None))) for fila in filas]
+
+    # Texto del recibo de la comanda activa, o None si la mesa no tiene ninguna
+    def cuenta(self, id_mesa: int) -> Optional[str]:
+        return generar_recibo(self.conn, id_mesa)
+
+    # Primero la comanda, que es la que tiene que existir: sin comanda activa no se
+    # toca la mesa
+    def registrar_pago(self, id_mesa: int) -> None:
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE comanda
+                SET estado = 'PAGADO'
+                WHERE (estado = 'ACTIVO' AND id_mesa = :identif)
+            """, {"identif": id_mesa})
+            if cursor.rowcount == 0:
+                raise ValueError("No hay ninguna comanda activa en esta mesa")
+
+            cursor.execute("""
+                UPDATE mesa
+                SET estado = 'Disponible'
+                WHERE id_mesa = :identif
+            """, {"identif": id_mesa})
+
+            # El pago no se agrupa: se confirma enseguida (y con él lo pendiente)
+            ut.commit()
+        invalidar_recibos_mesa(id_mesa)
+
+#===================================================================================
+# RESERVAS
+#===================================================================================
+# Una reserva se identifica por el teléfono y la fecha (con hora, sin segundos)
+class ServicioReservas:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def crear(self, fecha: datetime.datetime, telefono: str, nombre: str, apellido: str,
+              numero_personas: int, lugar: int) -> None:
+        # Las reglas de los disparadores se comprueban antes de ir a la BD
+        _validar(validacion.validar_reserva(fecha, telefono, nombre, apellido, numero_personas, lugar))
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO reserva (fecha, telefono, nombre, apellido, numero_personas, lugar)
+                VALUES (:fecha, :telefono, :nombre, :apellido, :numero_personas, :lugar)
+            """, {
+                'fecha': fecha,
+                'telefono': telefono,
+                'nombre': nombre,
+                'apellido': apellido,
+                'numero_personas': numero_personas,
+                'lugar': lugar
+            })
+            ut.commit()
+
+    # Solo cambian los datos que se pasan, en un solo UPDATE
+    def modificar(self, telefono: str, fecha: datetime.datetime, nombre: Optional[str] = None,
+                  apellido: Optional[str] = None, numero_personas: Optional[int] = None) -> None:
+        cambios = {columna: valor for columna, valor in
+                   (("nombre", nombre), ("apellido", apellido), ("numero_personas", numero_personas))
+                   if valor is not None}
+        if not cambios:
+            return
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            asignaciones = ", ".join(f"{columna} = :{columna}" for columna in cambios)
+            cursor.execute(f"""
+                UPDATE reserva
+                SET {asignaciones}
+                WHERE telefono = :telefono AND fecha = :fecha
+            """, {**cambios, "telefono": telefono, "fecha": fecha})
+            if cursor.rowcount == 0:
+                raise ValueError("La reserva no existe. Verifique los datos ingresados.")
+            ut.commit()
+
+    def anular(self, telefono: str, fecha: datetime.datetime) -> None:
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                DELETE FROM encargado_de
+                WHERE tlf = :telefono AND fecha = :fecha
+            """, {"telefono": telefono, "fecha": fecha})
+
+            cursor.execute("""
+                DELETE FROM reserva
+                WHERE telefono = :telefono AND fecha = :fecha
+            """, {"telefono": telefono, "fecha": fecha})
+            if cursor.rowcount == 0:
+                raise ValueError("La reserva no existe. Verifique los datos ingresados.")
+            ut.commit()
+
+    def asignar_empleado(self, telefono: str, fecha: datetime.datetime, dni: str) -> None:
+        with unidad_de_trabajo(self.conn) as ut:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO encargado_de (dni_empleado, fecha, tlf)
+                VALUES (:dni_empleado, :fecha, :telefono)
+            """, {"dni_empleado": dni, "fecha": fecha, "telefono": telefono})
+            ut.commit()
+
+    # Filtros opcionales: teléfono, o teléfono y fecha
+    def listar(self, telefono: Optional[str] = None, fecha: Optional[datetime.datetime] = None) -> List[Reserva]:
+        condiciones = []
+        parametros = {}
+        if telefono is not None:
+            condiciones.append("r.telefono = :telefono")
+            parametros["telefono"] = telefono
+        if fecha is not None:
+            condiciones.append("r.fecha = :fecha")
+            parametros["fecha"] = fecha
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT r.fecha, r.telefono, r.nombre, r.apellido, r.numero_personas,
+                       r.lugar, e.dni_empleado
+                FROM reserva r
+                LEFT JOIN encargado_de e ON r.fecha = e.fecha AND r.telefono = e.tlf
+                {donde}
+                ORDER BY r.fecha
+            """, parametros)
+            return [Reserva(*fila) for fila in cursor]
+        finally:
+            cursor.close()
@@ -0,0 +1,64 @@
+import bd
+import config
+import time
+
+#===================================================================================
+# SESIÓN DEL EMPLEADO
+#===================================================================================
+# Se crea una vez al identificarse el empleado y guarda su DNI, nombre y cargo.
+# Las operaciones reservadas al JEFE comprueban el cargo en memoria en lugar de
+# pedir el DNI y consultar empleado cada vez. El cargo se vuelve a leer de la BD
+# cuando pasan config.ttl_rol segundos, para enterarse de bajas o cambios de cargo.
+
+class Sesion:
+
+    def __init__(self, dni, nombre, cargo):
+        self.dni = dni
+        self.nombre = nombre
+        self._cargo = cargo
+        self._caduca = time.monotonic() + config.ttl_rol
+
+    def cargo(self, conn):
+        if time.monotonic() >= self._caduca:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT cargo FROM empleado WHERE dni = :dni", {"dni": self.dni})
+                resultado = cursor.fetchone()
+            finally:
+                cursor.close()
+            # si el empleado se ha dado de baja se queda sin cargo
+            self._cargo = resultado[0] if resultado else None
+            self._caduca = time.monotonic() + config.ttl_rol
+        return self._cargo
+
+    def es_jefe(self, conn):
+        return self.cargo(conn) == 'JEFE'
+
+    # Fuerza a releer el cargo en la próxima comprobación
+    def invalidar(self):
+        self._caduca = 0
+
+# Devuelve la sesión del empleado con ese DNI, o None si no existe
+def iniciar_sesion(conn, dni):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT nombre, cargo FROM empleado WHERE dni = :dni", {"dni": dni})
+        resultado = cursor.fetchone()
+    except bd.DatabaseError as e:
+        error, = e.args
+        print(f"Error al iniciar sesión: {error.message}")
+        return None
+    finally:
+        cursor.close()
+
+    if not resultado:
+        return None
+    nombre, cargo = resultado
+    return Sesion(dni, nombre, cargo)
+
+# Sesión del terminal (el menú es de un solo usuario)
+sesion_actual = None
+
+def cerrar_sesion():
+    global sesion_actual
+    sesion_actual = None
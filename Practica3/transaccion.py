@@ -0,0 +1,168 @@
+import contextlib
+import threading
+import time
+
+import config
+
+#===================================================================================
+# UNIDAD DE TRABAJO
+#===================================================================================
+# Toda operación que escribe en la BD se ejecuta dentro de una unidad de trabajo:
+#
+#     with unidad_de_trabajo(conn) as ut:
+#         cursor = conn.cursor()
+#         ...
+#         ut.commit()
+#
+# - ut.commit() confirma lo hecho en la unidad y ut.rollback() lo deshace.
+# - Si sale una excepción, la unidad se deshace y la excepción sigue su camino.
+# - Si la unidad termina sin commit ni rollback también se deshace: nada queda a
+#   medias esperando a que otra operación haga commit.
+#
+# COMMIT AGRUPADO (unidad_de_trabajo(conn, agrupar=True) con config.commit_agrupado)
+# Para las operaciones de mesa, pequeñas y muy frecuentes durante el servicio.
+# ut.commit() no confirma enseguida: la unidad queda pendiente y un solo COMMIT
+# confirma todas las pendientes de la conexión cuando han pasado
+# config.ventana_commit segundos desde la primera o cuando se juntan
+# config.max_commit_agrupado. Menos COMMIT son menos esperas a que el redo se
+# escriba en disco.
+#
+# Garantías en modo agrupado:
+# - Atomicidad: igual que sin agrupar. Si hay unidades pendientes, la nueva empieza
+#   con un SAVEPOINT y su rollback solo deshace lo suyo.
+# - Durabilidad: la operación se da por hecha antes de que su COMMIT llegue a disco.
+#   Si el programa o la conexión caen dentro de la ventana se pierden, como mucho,
+#   las operaciones de esa ventana (config.ventana_commit segundos o
+#   config.max_commit_agrupado operaciones).
+# - Visibilidad: las demás sesiones no ven los cambios, y las filas siguen
+#   bloqueadas, hasta el COMMIT del grupo.
+# - Una unidad sin agrupar (un pago, por ejemplo) confirma antes lo pendiente.
+#   confirmar_pendientes(conn) hace lo mismo y se llama al salir de cada submenú y
+#   antes de devolver una conexión al pool.
+
+# Unidades terminadas y COMMIT reales enviados a la BD
+_estadisticas = {"unidades": 0, "commits": 0}
+_cerrojo_estadisticas = threading.Lock()
+
+def _contar(clave):
+    with _cerrojo_estadisticas:
+        _estadisticas[clave] += 1
+
+def estadisticas_commit():
+    with _cerrojo_estadisticas:
+        return dict(_estadisticas)
+
+def mostrar_estadisticas_commit():
+    estadisticas = estadisticas_commit()
+    print(f"\nUnidades de trabajo confirmadas: {estadisticas['unidades']}")
+    print(f"COMMIT enviados a la BD: {estadisticas['commits']}")
+
+#-----------------------------------------------------------------------------------
+# Estado del commit agrupado de cada conexión
+#-----------------------------------------------------------------------------------
+class _Grupo:
+
+    def __init__(self, conn):
+        self.conn = conn
+        # Lo tiene la unidad activa de principio a fin; el temporizador no confirma
+        # nunca en mitad de una unidad
+        self.cerrojo = threading.RLock()
+        self.pendientes = 0
+        self.primera = None
+        self.temporizador = None
+
+    def confirmar(self):
+        with self.cerrojo:
+            if self.temporizador is not None:
+                self.temporizador.cancel()
+                self.temporizador = None
+            if self.pendientes:
+                self.conn.commit()
+                _contar("commits")
+                self.pendientes = 0
+                self.primera = None
+
+    def aniadir(self):
+        self.pendientes += 1
+        if self.primera is None:
+            self.primera = time.monotonic()
+        transcurrido = time.monotonic() - self.primera
+        if self.pendientes >= config.max_commit_agrupado or transcurrido >= config.ventana_commit:
+            self.confirmar()
+        elif self.temporizador is None:
+            self.temporizador = threading.Timer(config.ventana_commit - transcurrido, self.confirmar)
+            self.temporizador.daemon = True
+            self.temporizador.start()
+
+_grupos = {}
+_cerrojo_grupos = threading.Lock()
+
+def _grupo(conn):
+    with _cerrojo_grupos:
+        if id(conn) not in _grupos:
+            _grupos[id(conn)] = _Grupo(conn)
+        return _grupos[id(conn)]
+
+def confirmar_pendientes(conn):
+    with _cerrojo_grupos:
+        grupo = _grupos.pop(id(conn), None)
+    if grupo is not None:
+        grupo.confirmar()
+
+#-----------------------------------------------------------------------------------
+# Unidad de trabajo
+#-----------------------------------------------------------------------------------
+class UnidadDeTrabajo:
+
+    def __init__(self, conn, agrupar=False):
+        self.conn = conn
+        self.agrupar = agrupar and config.commit_agrupado
+        self.grupo = _grupo(conn)
+        self.terminada = False
+        self.savepoint = False
+
+    def _empezar(self):
+        self.grupo.cerrojo.acquire()
+        if self.grupo.pendientes:
+            if self.agrupar:
+                cursor = self.conn.cursor()
+                cursor.execute("SAVEPOINT unidad_de_trabajo")
+                cursor.close()
+                self.savepoint = True
+            else:
+                self.grupo.confirmar()
+
+    def commit(self):
+        if self.agrupar:
+            self.grupo.aniadir()
+        else:
+            self.conn.commit()
+            _contar("commits")
+        _contar("unidades")
+        self.terminada = True
+
+    def rollback(self):
+        if self.savepoint:
+            cursor = self.conn.cursor()
+            cursor.execute("ROLLBACK TO SAVEPOINT unidad_de_trabajo")
+            cursor.close()
+        # Sin transacción abierta no hace falta ir a la BD
+        elif getattr(self.conn, "transaction_in_progress", True):
+            self.conn.rollback()
+        self.terminada = True
+
+    def _terminar(self):
+        try:
+            if not self.terminada:
+                self.rollback()
+        finally:
+            self.grupo.cerrojo.release()
+
+@contextlib.contextmanager
+def unidad_de_trabajo(conn, agrupar=False):
+    unidad = UnidadDeTrabajo(conn, agrupar)
+    unidad._empezar()
+    try:
+        yield unidad
+    finally:
+        unidad._terminar()
@@ -0,0 +1,145 @@
+import re
+import datetime
+import decimal
+
+#===================================================================================
+# VALIDACIÓN EN EL CLIENTE
+#===================================================================================
+# Las mismas reglas que los disparadores de Practica3 (y que las restricciones CHECK
+# del modo declarativo), comprobadas en Python antes de enviar el INSERT. Un dato mal
+# escrito se rechaza sin ir a la BD, con el mismo código y mensaje que daría el
+# disparador. Los disparadores se mantienen: son los que garantizan las reglas.
+#
+# Los patrones se escriben igual que en REGEXP_LIKE y paridad_validacion.py comprueba
+# que siguen siendo los mismos que los del SQL.
+#
+# Cada función validar_* devuelve la lista de errores (código, mensaje); vacía si todo
+# es correcto.
+
+# Patrones tal cual aparecen en los disparadores
+PATRON_DNI = r'^[0-9]{8}[A-Z]$'
+PATRON_TELEFONO_EMPLEADO = r'^\+?[0-9]{1,3}?[0-9]{1,20}$'
+PATRON_TELEFONO_PROVEEDOR = r'^\+?\d+$'
+PATRON_TELEFONO_RESERVA = r'^[0-9]{9}$'
+
+# En REGEXP_LIKE '$' es el final de la cadena; en Python casa también antes de un
+# salto de línea final, así que se cambia por \Z. \d solo son los dígitos ASCII.
+def _compilar(patron):
+    if patron.endswith('$'):
+        patron = patron[:-1] + r'\Z'
+    return re.compile(patron, re.ASCII)
+
+RE_DNI = _compilar(PATRON_DNI)
+RE_TELEFONO_EMPLEADO = _compilar(PATRON_TELEFONO_EMPLEADO)
+RE_TELEFONO_PROVEEDOR = _compilar(PATRON_TELEFONO_PROVEEDOR)
+RE_TELEFONO_RESERVA = _compilar(PATRON_TELEFONO_RESERVA)
+
+# Código y mensaje de cada disparador
+MENSAJES = {
+    "salario": (-20012, 'El salario no puede ser negativo.'),
+    "dni": (-20013, 'Error: El DNI debe tener 8 números seguidos de 1 letra mayúscula.'),
+    "telefono_empleado": (-20014, 'Error: El teléfono debe ser un número válido con un prefijo opcional.'),
+    "telefono_proveedor": (-20015, 'Error: El número debe comenzar con un "+" opcional, seguido solo de dígitos.'),
+    "correo_arroba": (-20021, 'Error: El correo debe contener un carácter @.'),
+    "correo_posicion": (-20022, 'Error: El correo debe contener al menos un carácter antes y después del @.'),
+    "numero_personas": (-20038, 'El número de personas en una reserva debe ser mayor o igual a 1.'),
+    "fecha_reserva": (-20039, 'La fecha de la reserva debe ser posterior a la fecha actual.'),
+    "telefono_reserva": (-20041, 'El teléfono debe tener exactamente 9 dígitos.'),
+    "lugar": (-20042, 'El valor de lugar debe ser 0 (dentro) o 1 (fuera).'),
+}
+
+# Tamaño de las columnas de texto (ORA-12899 si se supera)
+LONGITUDES = {
+    "empleado": {"dni": 9, "nombre": 20, "apellido": 20, "cargo": 20, "telefono": 20, "num_ss": 12},
+    "proveedor": {"cif": 9, "correo": 30, "telefono": 20, "nombre": 20},
+    "usuario": {"telefono": 20, "correo": 20, "nombre": 20, "apellido": 20},
+    "reserva": {"telefono": 20, "nombre": 20, "apellido": 20},
+}
+
+# En Oracle la cadena vacía es NULL
+def _nulo(valor):
+    return valor is None or valor == ''
+
+def _longitudes(tabla, valores):
+    errores = []
+    for columna, valor in valores.items():
+        maximo = LONGITUDES[tabla][columna]
+        # VARCHAR(n) cuenta bytes
+        if not _nulo(valor) and len(str(valor).encode()) > maximo:
+            errores.append((-12899, f'El valor de {tabla}.{columna} es demasiado largo (máximo {maximo}).'))
+    return errores
+
+#-----------------------------------------------------------------------------------
+# Reglas sueltas (una por disparador)
+#-----------------------------------------------------------------------------------
+def dni_valido(dni):
+    return not _nulo(dni) and RE_DNI.match(dni) is not None
+
+def telefono_empleado_valido(telefono):
+    return not _nulo(telefono) and RE_TELEFONO_EMPLEADO.match(telefono) is not None
+
+# REGEXP_LIKE(NULL, ...) es NULL y el disparador deja pasar el valor
+def telefono_proveedor_valido(telefono):
+    return _nulo(telefono) or RE_TELEFONO_PROVEEDOR.match(telefono) is not None
+
+def telefono_reserva_valido(telefono):
+    return not _nulo(telefono) and RE_TELEFONO_RESERVA.match(telefono) is not None
+
+# None si el correo es correcto; si no, la clave del mensaje del disparador
+def error_correo(correo):
+    if _nulo(correo):
+        return None
+    posicion = correo.find('@') + 1   # como INSTR
+    if posicion == 0:
+        return "correo_arroba"
+    if posicion == 1 or posicion == len(correo):
+        return "correo_posicion"
+    return None
+
+#-----------------------------------------------------------------------------------
+# Validación de cada alta
+#-----------------------------------------------------------------------------------
+def validar_empleado(dni, nombre, apellido, cargo, telefono, num_ss, salario):
+    errores = _longitudes("empleado", {"dni": dni, "nombre": nombre, "apellido": apellido,
+                                       "cargo": cargo, "telefono": telefono, "num_ss": num_ss})
+    if not _nulo(salario):
+        try:
+            if decimal.Decimal(str(salario).strip()) < 0:
+                errores.append(MENSAJES["salario"])
+        except decimal.InvalidOperation:
+            errores.append((-1722, 'El salario debe ser un número.'))
+    if not dni_valido(dni):
+        errores.append(MENSAJES["dni"])
+    if not telefono_empleado_valido(telefono):
+        errores.append(MENSAJES["telefono_empleado"])
+    return errores
+
+def validar_proveedor(cif, correo, telefono, nombre):
+    errores = _longitudes("proveedor", {"cif": cif, "correo": correo, "telefono": telefono, "nombre": nombre})
+    if not telefono_proveedor_valido(telefono):
+        errores.append(MENSAJES["telefono_proveedor"])
+    clave = error_correo(correo)
+    if clave:
+        errores.append(MENSAJES[clave])
+    return errores
+
+# usuario no tiene disparadores de formato: solo el tamaño de las columnas
+def validar_usuario(telefono, correo, nombre, apellido):
+    return _longitudes("usuario", {"telefono": telefono, "correo": correo, "nombre": nombre, "apellido": apellido})
+
+# fecha es un datetime; se compara con el reloj local, el disparador usa SYSDATE
+def validar_reserva(fecha, telefono, nombre, apellido, numero_personas, lugar):
+    errores = _longitudes("reserva", {"telefono": telefono, "nombre": nombre, "apellido": apellido})
+    if fecha <= datetime.datetime.now():
+        errores.append(MENSAJES["fecha_reserva"])
+    if numero_personas < 1:
+        errores.append(MENSAJES["numero_personas"])
+    if not telefono_reserva_valido(telefono):
+        errores.append(MENSAJES["telefono_reserva"])
+    if lugar not in (0, 1):
+        errores.append(MENSAJES["lugar"])
+    return errores
+
+def mostrar_errores(errores):
+    for codigo, mensaje in errores:
+        print(f"Error: ORA{codigo}: {mensaje}")
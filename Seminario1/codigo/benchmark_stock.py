@@ -0,0 +1,140 @@
+import oracledb
+import random
+import sys
+import threading
+import time
+
+import config
+from codigo import conectar_bd, crear_tablas, descontar_stock
+
+#===================================================================================
+# BENCHMARK DE CONCURRENCIA SOBRE STOCK
+#===================================================================================
+# N hilos, cada uno con su propia conexión, venden a la vez unidades de unos pocos
+# productos. Se compara:
+#
+#   - leer y actualizar: SELECT cantidad y, si llega, UPDATE en otra sentencia
+#     (como hacía nuevo_pedido antes). Dos terminales pueden leer el mismo stock
+#     y vender los dos: el stock queda negativo.
+#   - UPDATE condicional: descontar_stock, una sola sentencia con RETURNING.
+#
+# Para cada variante se muestra el rendimiento (ventas/s), las esperas por bloqueo
+# de fila y la sobreventa (unidades vendidas por encima del stock inicial).
+# Las esperas se leen de v$session_event si el usuario tiene permiso; si no, se
+# cuentan los UPDATE que han tardado más de UMBRAL_ESPERA.
+#
+# Uso: python benchmark_stock.py [hilos] [ventas_por_hilo] [productos] [stock_inicial]
+# (productos no puede ser mayor que los que crea crear_tablas)
+
+UMBRAL_ESPERA = 0.005   # segundos
+
+# Implementación anterior de nuevo_pedido, como referencia
+def descontar_leyendo(cursor, cproducto, cantidad):
+    cursor.execute("SELECT cantidad FROM stock WHERE cproducto = :1", [cproducto])
+    fila = cursor.fetchone()
+    if fila is None or cantidad > fila[0]:
+        return None
+    cursor.execute("UPDATE stock SET cantidad = cantidad - :1 WHERE cproducto = :2", (cantidad, cproducto))
+    return fila[0] - cantidad
+
+def conectar():
+    return oracledb.connect(user=config.username, password=config.password, host=config.dsn,
+                            port=config.port, service_name=config.service_name)
+
+# Esperas por bloqueo de fila de la sesión: (número, segundos), o None sin permiso
+def esperas_bloqueo(cursor):
+    try:
+        cursor.execute("""
+            SELECT NVL(SUM(total_waits), 0), NVL(SUM(time_waited_micro), 0) / 1e6
+            FROM v$session_event
+            WHERE sid = SYS_CONTEXT('USERENV', 'SID')
+            AND event = 'enq: TX - row lock contention'
+        """)
+        return cursor.fetchone()
+    except oracledb.DatabaseError:
+        return None
+
+def trabajador(descontar, ventas, productos, barrera, resultado):
+    try:
+        conn = conectar()
+    except oracledb.DatabaseError:
+        barrera.abort()   # para que los demás hilos no se queden esperando
+        raise
+    cursor = conn.cursor()
+    rng = random.Random(threading.get_ident())
+    inicial = esperas_bloqueo(cursor)
+    vendido = {}
+    lentos = 0
+    barrera.wait()
+
+    for _ in range(ventas):
+        cproducto = rng.randint(1, productos)
+        cantidad = rng.randint(1, 3)
+        inicio = time.perf_counter()
+        restante = descontar(cursor, cproducto, cantidad)
+        if time.perf_counter() - inicio > UMBRAL_ESPERA:
+            lentos += 1
+        conn.commit()
+        if restante is not None:
+            vendido[cproducto] = vendido.get(cproducto, 0) + cantidad
+
+    final = esperas_bloqueo(cursor)
+    if inicial is not None and final is not None:
+        esperas = (final[0] - inicial[0], final[1] - inicial[1])
+    else:
+        esperas = None
+    resultado.append((vendido, lentos, esperas))
+    cursor.close()
+    conn.close()
+
+def ejecutar(conn, nombre, descontar, hilos, ventas, productos, stock_inicial):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE stock SET cantidad = :1 WHERE cproducto <= :2", (stock_inicial, productos))
+    conn.commit()
+
+    resultado = []
+    barrera = threading.Barrier(hilos + 1)
+    trabajadores = [threading.Thread(target=trabajador, args=(descontar, ventas, productos, barrera, resultado))
+                    for _ in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for t in trabajadores:
+        t.join()
+    segundos = time.perf_counter() - inicio
+
+    # Sobreventa: lo vendido por encima del stock inicial
+    vendido = {}
+    for parcial, _, _ in resultado:
+        for cproducto, cantidad in parcial.items():
+            vendido[cproducto] = vendido.get(cproducto, 0) + cantidad
+    sobreventa = sum(max(0, cantidad - stock_inicial) for cantidad in vendido.values())
+    cursor.execute("SELECT COUNT(*) FROM stock WHERE cproducto <= :1 AND cantidad < 0", [productos])
+    negativos, = cursor.fetchone()
+    cursor.close()
+
+    lentos = sum(r[1] for r in resultado)
+    esperas = [r[2] for r in resultado]
+    print(f"\n{nombre}:")
+    print(f"\t{'Rendimiento':<24} {hilos * ventas / segundos:10,.0f} ventas/s ({segundos:.2f} s)")
+    if all(e is not None for e in esperas):
+        print(f"\t{'Esperas por bloqueo':<24} {sum(e[0] for e in esperas):10,.0f} ({sum(e[1] for e in esperas):.2f} s)")
+    else:
+        print(f"\t{'Ventas > ' + str(int(UMBRAL_ESPERA * 1000)) + ' ms':<24} {lentos:10,d} (sin permiso sobre v$session_event)")
+    print(f"\t{'Unidades vendidas':<24} {sum(vendido.values()):10,d}")
+    print(f"\t{'Sobreventa':<24} {sobreventa:10,d} unidades ({negativos} productos con stock negativo)")
+
+if __name__ == "__main__":
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    ventas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    productos = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    stock_inicial = int(sys.argv[4]) if len(sys.argv) > 4 else 100
+
+    conn = conectar_bd()
+    if conn:
+        crear_tablas(conn)
+        print(f"{hilos} hilos x {ventas} ventas sobre {productos} productos con {stock_inicial} unidades")
+        ejecutar(conn, "Leer y actualizar", descontar_leyendo, hilos, ventas, productos, stock_inicial)
+        ejecutar(conn, "UPDATE condicional", descontar_stock, hilos, ventas, productos, stock_inicial)
+        conn.close()
@@ -1,5 +1,7 @@
 import oracledb
 import config
+import datetime
+import random
 
 # Función para conectarse a la base de datos Oracle
 def conectar_bd():
@@ -11,6 +13,54 @@ def conectar_bd():
         print("Error al conectarse a la base de datos", e)
         return None
 
+# Inserta las filas de un generador en lotes de tam_lote con executemany, con un
+# commit por lote: nunca se tiene la tabla entera en memoria
+def insertar_por_lotes(conn, sql, filas, tam_lote):
+    cursor = conn.cursor()
+    lote = []
+    total = 0
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) == tam_lote:
+            cursor.executemany(sql, lote)
+            conn.commit()
+            total += len(lote)
+            lote = []
+    if lote:
+        cursor.executemany(sql, lote)
+        conn.commit()
+        total += len(lote)
+    cursor.close()
+    return total
+
+# Producto i con (i mod 100) * 10 unidades: los 10 primeros son las tuplas de siempre
+def filas_stock(productos):
+    for cproducto in range(1, productos + 1):
+        yield (cproducto, ((cproducto - 1) % 100 + 1) * 10)
+
+# Histórico de pedidos repartido en los últimos tres años, del más antiguo al más nuevo
+def filas_pedido(pedidos, rng):
+    ahora = datetime.datetime.now()
+    for cpedido in range(1, pedidos + 1):
+        fecha = ahora - datetime.timedelta(days=3 * 365 * (pedidos - cpedido) / pedidos)
+        yield (cpedido, rng.randint(1, 9999), fecha)
+
+def filas_detalle(pedidos, productos, lineas_por_pedido, rng):
+    for cpedido in range(1, pedidos + 1):
+        for cproducto in rng.sample(range(1, productos + 1), min(lineas_por_pedido, productos)):
+            yield (cpedido, cproducto, rng.randint(1, 5))
+
+# Rellena las tablas (vacías) con 'productos' filas de stock y un histórico de
+# 'pedidos' pedidos con sus detalles. Siempre genera los mismos datos.
+def poblar_tablas(conn, productos=10, pedidos=0, lineas_por_pedido=3, tam_lote=10000):
+    rng = random.Random(2024)
+    insertar_por_lotes(conn, "INSERT INTO stock (cproducto, cantidad) VALUES (:1, :2)",
+                       filas_stock(productos), tam_lote)
+    insertar_por_lotes(conn, "INSERT INTO pedido (cpedido, ccliente, fecha_pedido) VALUES (:1, :2, :3)",
+                       filas_pedido(pedidos, rng), tam_lote)
+    insertar_por_lotes(conn, "INSERT INTO detalle_pedido (cpedido, cproducto, cantidad) VALUES (:1, :2, :3)",
+                       filas_detalle(pedidos, productos, lineas_por_pedido, rng), tam_lote)
+
 # Función para crear tablas y predefinir datos
 def crear_tablas(conn):
     try:
@@ -32,14 +82,14 @@ def crear_tablas(conn):
         # cursor.execute nos permite ejecutar sentencias SQL
         cursor.execute("""
         CREATE TABLE stock (
-            cproducto NUMBER(4) CONSTRAINT Cproducto PRIMARY KEY,
+            cproducto NUMBER(8) CONSTRAINT Cproducto PRIMARY KEY,
             cantidad NUMBER(4) CONSTRAINT Cantidad NOT NULL
-        )""")
+        ) ROWDEPENDENCIES""")
         
         cursor.execute("""
         CREATE TABLE pedido (
-            cpedido NUMBER(4) CONSTRAINT cpedido_clave_primaria PRIMARY KEY,
-            ccliente NUMBER(4),
+            cpedido NUMBER(8) CONSTRAINT cpedido_clave_primaria PRIMARY KEY,
+            ccliente NUMBER(8),
             fecha_pedido DATE
         )""")
         
@@ -52,25 +102,13 @@ def crear_tablas(conn):
             cantidad NUMBER(4),
             CONSTRAINT clave_primaria PRIMARY KEY (cpedido, cproducto)
         )""")
+
+        # Para ver los pedidos más recientes sin recorrer todo el histórico
+        cursor.execute("CREATE INDEX pedido_fecha ON pedido (fecha_pedido)")
         
-        # Insertamos 10 tuplas predefinidas en la tabla Stock
-        cursor.executemany("""
-        INSERT INTO stock (cproducto, cantidad)
-        VALUES (:1, :2)""", 
-        [(1, 10), (2, 20), (3, 30), 
-         (4, 40), (5, 50), (6, 60),
-         (7, 70), (8, 80), (9, 90), 
-         (10, 100)])
-        
-        # Aqui estamos diciendo que a inserción de las 10 tuplas es una sola 
-        # transacción
-        # Pero conceptualmente se deberían hacer las 10 operaciones de inserción
-        # por separado
-        # Se debe hacer cada inserción con un commit
-
-        # conn.commit confirma los cambios realizados en la BD durante la sesión
-        # si no se ejecuta, los cmabios no se reflejan en la BD
-        conn.commit()
+        # Datos iniciales: por defecto las 10 tuplas de siempre en Stock
+        # (config.productos_iniciales y config.pedidos_iniciales cambian el tamaño)
+        poblar_tablas(conn, config.productos_iniciales, config.pedidos_iniciales)
         print("\nTablas creadas y datos insertados.")
 
     except oracledb.DatabaseError as e:
@@ -78,124 +116,233 @@ def crear_tablas(conn):
         conn.rollback()
 
 
+# Descuento atómico: una sola sentencia comprueba que queda stock suficiente y lo
+# descuenta, y devuelve lo que queda. Entre la comprobación y el descuento no puede
+# colarse otro terminal (la fila queda bloqueada por el propio UPDATE), así que el
+# stock nunca baja de cero, y basta un viaje a la BD por línea.
+SQL_DESCONTAR_STOCK = """
+        UPDATE stock SET cantidad = cantidad - :cantidad
+        WHERE cproducto = :cproducto AND cantidad >= :cantidad
+        RETURNING cantidad INTO :restante"""
+
+# Devuelve el stock que queda, o None si no había suficiente (o no existe el producto)
+def descontar_stock(cursor, cproducto, cantidad):
+    restante = cursor.var(int)
+    cursor.execute(SQL_DESCONTAR_STOCK, cantidad=cantidad, cproducto=cproducto, restante=restante)
+    valores = restante.getvalue()
+    return valores[0] if valores else None
+
+# Aplica un pedido completo en una única transacción corta: el pedido, el
+# descuento de stock de cada línea y sus detalles.
+# Cada línea usa el descuento atómico (SQL_DESCONTAR_STOCK), todas en un executemany.
+# Las líneas que no se pueden servir se devuelven como (cproducto, cantidad, motivo);
+# en ese caso no se guarda nada. Si todo va bien se muestra el stock que queda.
+# Devuelve None si el pedido no se ha podido registrar por otro error.
+def registrar_pedido(conn, cod, cli, lineas):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("INSERT INTO pedido (cpedido, ccliente, fecha_pedido) VALUES (:1, :2, SYSDATE)", (cod, cli))
+
+        filas = [{"cproducto": cproducto, "cantidad": cantidad} for cproducto, cantidad in lineas.items()]
+        if not filas:
+            # Pedido sin líneas
+            conn.commit()
+            return []
+
+        restante = cursor.var(int, arraysize=len(filas))
+        cursor.setinputsizes(restante=restante)
+        cursor.executemany(SQL_DESCONTAR_STOCK, filas, batcherrors=True)
+
+        # Líneas con error y líneas que no han devuelto ninguna fila
+        motivos = {error.offset: error.message for error in cursor.getbatcherrors()}
+        for i in range(len(filas)):
+            if not restante.getvalue(i) and i not in motivos:
+                motivos[i] = "Stock insuficiente o el producto no existe."
+
+        if motivos:
+            conn.rollback()
+            return [(filas[i]["cproducto"], filas[i]["cantidad"], motivo) for i, motivo in sorted(motivos.items())]
+
+        cursor.executemany("""
+        INSERT INTO detalle_pedido (cpedido, cproducto, cantidad) 
+        VALUES (:1, :2, :3)
+        """, [(cod, cproducto, cantidad) for cproducto, cantidad in lineas.items()])
+
+        # Se hacen permanentes los cambios
+        conn.commit()
+        for i, fila in enumerate(filas):
+            print(f"\tProducto {fila['cproducto']}: quedan {restante.getvalue(i)[0]} unidades")
+        return []
+
+    except oracledb.DatabaseError as e:
+        print("Error al procesar el pedido:", e)
+        conn.rollback()
+        return None
+
+    finally:
+        cursor.close()
+
 # Función para dar de alta un nuevo pedido
+# Modo carrito: mientras el usuario escribe, las líneas solo se guardan en memoria.
+# Al finalizar se aplican todas juntas con registrar_pedido, así las filas de
+# stock solo están bloqueadas lo que dura esa transacción y no mientras se teclea.
 def nuevo_pedido(conn):
-    try:
-        cursor = conn.cursor()
 
-        # Elimina el pedido y todos sus detalles
-        # Este safepoint en realidad no debería estar es innecesario, no es un punto intermedio
-        # Se bería hacer un rollback a secas
-        cursor.execute("SAVEPOINT savepoint1")
+    print("\nInserta los datos del pedido: ")
 
-        print("\nInserta los datos del pedido: ")
+    # Se pide la inserción del cod de l pedido hasta q sea numérico 
+    cod = input("Código del pedido (numérico): ")
+    while (not cod.isnumeric()):
+        print("\n Por favor, introduzca un número menor que 100000000: ")
+        cod = input("Código del pedido: ")
 
-        # Se pide la inserción del cod de l pedido hasta q sea numérico 
-        cod = input("Código del pedido (numérico): ")
-        while (not cod.isnumeric()):
-            print("\n Por favor, introduzca un número menor que 10000: ")
-            cod = input("Código del pedido: ")
+    # Se pide cod del cliente hasta que sea numérico
+    cli = input("Código del cliente (numérico): ")
+    while (not cli.isnumeric()):
+        print("\n Por favor, introduzca un número menor que 100000000: ")
+        cli = input("Código del cliente: ")
 
-        # Se pide cod del cliente hasta que sea numérico
-        cli = input("Código del cliente (numérico): ")
-        while (not cli.isnumeric()):
-            print("\n Por favor, introduzca un número menor que 10000: ")
-            cli = input("Código del cliente: ")
+    # Carrito: cproducto -> cantidad (el mismo producto dos veces se suma en una línea)
+    carrito = {}
 
-        cursor.execute("INSERT INTO pedido (cpedido, ccliente, fecha_pedido) VALUES (:1, :2, SYSDATE)", (cod, cli))
-        
-        # Savepoint para guardar el pedido pero borrar los detalles-pedido
-        cursor.execute("SAVEPOINT savepoint2")
-        
-        while True:
+    while True:
 
-            print("\n1. Añadir detalle de producto")
-            print("2. Eliminar todos los detalles de producto")
-            print("3. Cancelar pedido")
-            print("4. Finalizar pedido")
-            opcion = input("Seleccione una opción: ")
+        print("\n1. Añadir detalle de producto")
+        print("2. Eliminar todos los detalles de producto")
+        print("3. Cancelar pedido")
+        print("4. Finalizar pedido")
+        opcion = input("Seleccione una opción: ")
 
-            # Añadir detalle de producto
-            if opcion == '1':
+        # Añadir detalle de producto
+        if opcion == '1':
+            cproducto = input("Código del producto (numérico): ")
+            while (not cproducto.isnumeric()):
+                print("\n Por favor, introduzca un número menor que 100000000: ")
                 cproducto = input("Código del producto (numérico): ")
-                while (not cproducto.isnumeric()):
-                    print("\n Por favor, introduzca un número menor que 10000: ")
-                    cproducto = input("Código del producto (numérico): ")
-
-                cantidad = input("Cantidad (numérico): ")
-
-                while (not cantidad.isnumeric()):
-                    print("\n Por favor, introduzca un número menor que 10000: ")
-                    cantidad = input("Código del producto (numérico): ")
-                
-                cantidad = int(cantidad)
-                cursor.execute("SELECT cantidad FROM stock WHERE cproducto = :1", [cproducto])
-                # cortafuegos guarda los resultados del SELECT
-                cortafuegos = cursor.fetchone()
-
-                # Verifica si hay datos en el resultado
-                if cortafuegos is not None:
-                    # Guarda la cantidad del SELECT en stock disponible
-                    stock_disponible = cortafuegos[0] 
-                else:
-                    print("No se encontraron registros.")
-                    stock_disponible=0
-                
-                # Eliminamos la cantidad del stock si hay suficiente
-                if cantidad <= stock_disponible:
-                    cursor.execute("""
-                    INSERT INTO detalle_pedido (cpedido, cproducto, cantidad) 
-                    VALUES (:1, :2, :3)
-                    """, (cod, cproducto, cantidad))
-                    cursor.execute("UPDATE stock SET cantidad = cantidad - :1 WHERE cproducto = :2", (cantidad, cproducto))
-                    print("Producto añadido al pedido.")
-                else:
-                    print("Stock insuficiente.")
-
-            # Elimina detalles del pedido (pero el pedido no) 
-            elif opcion == '2':
-                print("Detalles del pedido eliminados.")
-                cursor.execute("ROLLBACK TO savepoint2")
-
-            # Eliminar pedido por completo
-            elif opcion == '3':
-                print("Pedido cancelado.")
-                # Se debe usar un ROLLBACK a secas 
-                # Un savepoint debe estar intermedio
-                cursor.execute("ROLLBACK TO savepoint1")
+
+            cantidad = input("Cantidad (numérico): ")
+
+            while (not cantidad.isnumeric()):
+                print("\n Por favor, introduzca un número menor que 10000: ")
+                cantidad = input("Código del producto (numérico): ")
+
+            cproducto = int(cproducto)
+            carrito[cproducto] = carrito.get(cproducto, 0) + int(cantidad)
+            print("Producto añadido al pedido.")
+
+        # Elimina detalles del pedido (pero el pedido no) 
+        elif opcion == '2':
+            carrito.clear()
+            print("Detalles del pedido eliminados.")
+
+        # Eliminar pedido por completo: no se ha escrito nada en la BD
+        elif opcion == '3':
+            print("Pedido cancelado.")
+            return
+        
+        # Se finaliza el pedido, se guarda
+        elif opcion == '4':
+            fallidas = registrar_pedido(conn, cod, cli, carrito)
+            if fallidas is None:
                 return
-            
-            # Se finaliza el pedido, se guarda
-            elif opcion == '4':
+            if not fallidas:
                 print("Pedido finalizado con éxito.")
-                # Se hacen permanentes los cambios
-                conn.commit()
                 return
-            else:
-                print("Opción no válida.")
 
-    except oracledb.DatabaseError as e:
-        print("Error al procesar el pedido:", e)
-        cursor.execute("ROLLBACK TO savepoint1")
+            # No se ha guardado nada: se quitan las líneas fallidas y se puede volver a finalizar
+            print("No se ha podido registrar el pedido. Líneas que no se pueden servir:")
+            for cproducto, cantidad, motivo in fallidas:
+                print(f"\tProducto {cproducto} (cantidad {cantidad}): {motivo}")
+                del carrito[cproducto]
+            print("Se han quitado del pedido. Revíselo y vuelva a finalizarlo.")
+        else:
+            print("Opción no válida.")
+
+# Tablas que se muestran: (nombre, columnas de la clave primaria, columnas a mostrar)
+TABLAS = [
+    ("stock", ["cproducto"], "cproducto, cantidad"),
+    ("pedido", ["cpedido"], "cpedido, ccliente, to_char(fecha_pedido, 'DD/MON/YYYY HH24:MI:SS')"),
+    ("detalle_pedido", ["cpedido", "cproducto"], "cpedido, cproducto, cantidad"),
+]
 
-# Mostrar el contenido de las tablas
-def mostrar_tablas(conn):
+# Filas cambiadas más recientemente: en stock por ORA_ROWSCN (la tabla tiene
+# ROWDEPENDENCIES, así que es por fila); en pedido por fecha (índice pedido_fecha)
+# y en detalle_pedido, los detalles de esos mismos pedidos (prefijo de la clave)
+SQL_RECIENTES = {
+    "stock": "SELECT cproducto, cantidad FROM stock ORDER BY ORA_ROWSCN DESC, cproducto FETCH FIRST :n ROWS ONLY",
+    "pedido": "SELECT cpedido, ccliente, to_char(fecha_pedido, 'DD/MON/YYYY HH24:MI:SS') FROM pedido "
+              "ORDER BY fecha_pedido DESC FETCH FIRST :n ROWS ONLY",
+    "detalle_pedido": "SELECT d.cpedido, d.cproducto, d.cantidad FROM detalle_pedido d "
+                      "JOIN (SELECT cpedido, fecha_pedido FROM pedido ORDER BY fecha_pedido DESC FETCH FIRST :n ROWS ONLY) p "
+                      "ON d.cpedido = p.cpedido "
+                      "ORDER BY p.fecha_pedido DESC, d.cproducto FETCH FIRST :n ROWS ONLY",
+}
+
+# Mostrar el contenido de las tablas: número de filas y las más recientes de cada una
+def mostrar_tablas(conn, recientes=None):
+    if recientes is None:
+        recientes = config.filas_recientes
     try:
         cursor = conn.cursor()
-        print("\nTabla Stock:")
-        cursor.execute("SELECT * FROM Stock")
-        for row in cursor:
-            print(row)
-        
-        print("\nTabla Pedido:")
-        cursor.execute("SELECT cpedido, ccliente, to_char(fecha_pedido, 'DD/MON/YYYY HH24:MI:SS') FROM Pedido")
-        for row in cursor:
-            print(row)
+        cursor.arraysize = recientes
+        cursor.prefetchrows = recientes + 1
+        for tabla, _, _ in TABLAS:
+            cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+            filas, = cursor.fetchone()
+            print(f"\nTabla {tabla}: {filas} filas. Últimas {min(recientes, filas)}:")
+            cursor.execute(SQL_RECIENTES[tabla], n=recientes)
+            for row in cursor:
+                print(row)
+        cursor.close()
 
-        print("\nTabla detalle_pedido:")
-        cursor.execute("SELECT * FROM detalle_pedido")
-        for row in cursor:
-            print(row)
+    except oracledb.DatabaseError as e:
+        print("Error al mostrar el contenido de las tablas:", e)
+
+# Recorre una tabla página a página por su clave primaria (keyset): cada página
+# empieza justo después de la última clave mostrada, así que cuesta lo mismo la
+# primera que la última y no se lee la tabla entera de golpe
+def pagina_siguiente(cursor, tabla, ultima, tam_pagina):
+    nombre, clave, columnas = next(t for t in TABLAS if t[0] == tabla)
+    if ultima is None:
+        condicion = "1 = 1"
+        parametros = {}
+    elif len(clave) == 1:
+        condicion = f"{clave[0]} > :c0"
+        parametros = {"c0": ultima[0]}
+    else:
+        condicion = f"({clave[0]} > :c0 OR ({clave[0]} = :c0 AND {clave[1]} > :c1))"
+        parametros = {"c0": ultima[0], "c1": ultima[1]}
+    cursor.arraysize = tam_pagina
+    cursor.prefetchrows = tam_pagina + 1
+    cursor.execute(f"""
+        SELECT {columnas} FROM {nombre}
+        WHERE {condicion}
+        ORDER BY {', '.join(clave)}
+        FETCH FIRST {tam_pagina} ROWS ONLY""", parametros)
+    return cursor.fetchall()
+
+def recorrer_tabla(conn, tam_pagina=None):
+    if tam_pagina is None:
+        tam_pagina = config.filas_por_pagina
+    tabla = input(f"Tabla ({', '.join(t[0] for t in TABLAS)}): ")
+    if tabla not in [t[0] for t in TABLAS]:
+        print("Tabla no válida.")
+        return
+    num_clave = len(next(t[1] for t in TABLAS if t[0] == tabla))
+    try:
+        cursor = conn.cursor()
+        ultima = None
+        while True:
+            filas = pagina_siguiente(cursor, tabla, ultima, tam_pagina)
+            for row in filas:
+                print(row)
+            if len(filas) < tam_pagina:
+                print("Fin de la tabla.")
+                break
+            ultima = filas[-1][:num_clave]
+            if input("Intro para seguir, 'q' para terminar: ").lower() == 'q':
+                break
+        cursor.close()
 
     except oracledb.DatabaseError as e:
         print("Error al mostrar el contenido de las tablas:", e)
@@ -208,7 +355,8 @@ def menu_principal(conn):
         print("1. Borrar y crear tablas")
         print("2. Dar de alta nuevo pedido")
         print("3. Mostrar contenido de las tablas")
-        print("4. Salir")
+        print("4. Recorrer una tabla por páginas")
+        print("5. Salir")
         opcion = input("Seleccione una opción: ")
 
         if opcion == '1':
@@ -220,6 +368,8 @@ def menu_principal(conn):
         elif opcion == '3':
             mostrar_tablas(conn)
         elif opcion == '4':
+            recorrer_tabla(conn)
+        elif opcion == '5':
             conn.close()
             print("Conexión cerrada. Salir del programa.")
             break
@@ -3,4 +3,11 @@ password = 'x9095945'
 dsn = 'oracle0.ugr.es'
 port = 1521
 encoding = 'UTF-8'
-service_name = 'practbd'
\ No newline at end of file
+service_name = 'practbd'
+# Tamaño de los datos iniciales de crear_tablas
+productos_iniciales = 10
+pedidos_iniciales = 0
+
+# mostrar_tablas: filas recientes de cada tabla y filas por página al recorrerlas
+filas_recientes = 5
+filas_por_pagina = 20